@@ -0,0 +1,150 @@
+# ============================================
+# batch_runner.py
+# Handles:
+# - Loading scripted sessions from JSONL
+# - Running them in parallel across a process pool
+# - Writing per-session transcripts + notes as JSONL
+#
+# Usage:
+#   python batch_runner.py examples/scripted_sessions.jsonl -o results.jsonl
+#   python batch_runner.py scripts.jsonl --workers 8 --repeat 1000 --backend stub
+#
+# Script format (one session per line):
+#   {"session_id": "s1", "steps": [
+#       {"suspect": "Rohit", "message": "Where were you at 11?"},
+#       {"investigate": "laptop"},
+#       {"accuse": "Rohit"}]}
+# Add "case": "<pack id or path>" to play a case pack (case_pack.py).
+# --transcript-log DIR appends every turn to a transcript log
+# (transcript_log.py); each worker writes its own segments.
+# ============================================
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import transcript_log
+from headless import HeadlessSession, make_backend
+
+# One backend per worker process, built by _init_worker.
+_backend = None
+
+
+def _init_worker(backend_name: str, latency: float, log_dir: str = None):
+    global _backend
+    options = {"latency": latency} if backend_name == "stub" else {}
+    _backend = make_backend(backend_name, **options)
+    if log_dir:
+        # Buffered; sealed when the worker exits (pool workers skip
+        # atexit, so through a multiprocessing finalizer).
+        from multiprocessing import util
+
+        transcript_log.enable(log_dir, writer=f"w{os.getpid()}", flush=False)
+        util.Finalize(None, transcript_log.disable, exitpriority=10)
+
+
+def _run_chunk(scripts) -> list:
+    """Runs a list of scripts inside one worker."""
+    return [
+        HeadlessSession(_backend, session_id=s.get("session_id", ""), case=_case(s)).run(s["steps"])
+        for s in scripts
+    ]
+
+
+def _case(script):
+    """The script's case pack (loaded once per worker), or None for the built-in case."""
+    if not script.get("case"):
+        return None
+    from case_pack import load_case
+
+    return load_case(script["case"])
+
+
+# --------------------------------------------
+# Loading
+# --------------------------------------------
+def load_scripts(path: str, repeat: int = 1) -> list:
+    """Reads JSONL scripts; `repeat` clones each one with a suffixed id."""
+    with open(path, encoding="utf-8") as f:
+        scripts = [json.loads(line) for line in f if line.strip()]
+
+    if repeat <= 1:
+        return scripts
+
+    return [
+        {**s, "session_id": f"{s.get('session_id', i)}#{r}"}
+        for r in range(repeat)
+        for i, s in enumerate(scripts)
+    ]
+
+
+# --------------------------------------------
+# Batch execution
+# --------------------------------------------
+def run_batch(
+    scripts, backend: str = "stub", workers: int = None, latency: float = 0.0, chunk_size: int = 50,
+    log_dir: str = None
+):
+    """
+    Runs every script and yields session results in input order.
+    workers=1 runs in-process (handy for debugging).
+    log_dir: append every turn to a transcript log there.
+    """
+    chunks = [scripts[i:i + chunk_size] for i in range(0, len(scripts), chunk_size)]
+
+    if workers == 1:
+        _init_worker(backend, latency, log_dir)
+        try:
+            for chunk in chunks:
+                yield from _run_chunk(chunk)
+        finally:
+            if log_dir:
+                transcript_log.disable()
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(backend, latency, log_dir),
+    ) as pool:
+        for results in pool.map(_run_chunk, chunks):
+            yield from results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scripted interrogations headlessly.")
+    parser.add_argument("scripts", help="JSONL file of scripted sessions")
+    parser.add_argument("-o", "--output", help="JSONL output path (default: stdout)")
+    parser.add_argument("--backend", default="stub", choices=["stub", "gemini"])
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=1, help="clone every script N times")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub latency per call, seconds")
+    parser.add_argument("--transcript-log", help="append every turn to a transcript log in this directory")
+    args = parser.parse_args(argv)
+
+    scripts = load_scripts(args.scripts, args.repeat)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    t0 = time.perf_counter()
+    turns = 0
+    try:
+        for result in run_batch(scripts, args.backend, args.workers, args.latency, log_dir=args.transcript_log):
+            turns += sum(1 for e in result["transcript"] if e["type"] == "ask")
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{len(scripts)} sessions, {turns} turns in {elapsed:.2f}s "
+        f"({len(scripts) / elapsed:,.0f} sessions/s, {turns / elapsed:,.0f} turns/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,15 @@
 # - Confrontation detection
 # - Emotional tier updates
 # - Prompt assembly using MASTER_TEMPLATE
+#   (static per-suspect prefix rendered once at import)
+# - Conversation history fitted into the prompt token budget
 # - Fully compatible with suspects.py structure
+# - Case packs (case_pack.py) in place of the built-in tables
 # ============================================
 
 import re
 from suspects import MASTER_TEMPLATE, SUSPECTS, CT_EFFECTS
+from conversation_memory import NO_HISTORY, PROMPT_TOKEN_BUDGET, estimate_tokens
 
 # ============================================
 # Confrontation Pattern Definitions
@@ -69,48 +73,149 @@ CT_PATTERNS = {
 }
 
 
+# ============================================
+# Compiled confrontation matcher
+# ============================================
+# Every CT pattern is folded into ONE regex, built once at import.
+# Each alternative sits inside a zero-width lookahead so the scan tests
+# every start position without consuming text (no match can hide another),
+# and the alternatives are ordered by CT so that, at a given position, the
+# lowest CT is the one reported. Taking the minimum over all positions
+# reproduces the original "lowest CT wins" loop exactly.
+
+def ct_matcher_source(ct_patterns: dict) -> tuple:
+    """
+    Source of the combined regex for a {ct: [patterns]} table.
+    Returns (pattern_string, {group_name: ct}).
+    """
+    group_to_ct = {}
+    branches = []
+
+    for ct in sorted(ct_patterns):
+        name = f"ct{ct}"
+        group_to_ct[name] = ct
+        branches.append(f"(?P<{name}>" + "|".join(f"(?:{p})" for p in ct_patterns[ct]) + ")")
+
+    return "(?=" + "|".join(branches) + ")", group_to_ct
+
+
+def compile_ct_matcher(ct_patterns: dict):
+    """
+    Builds a single combined regex for a {ct: [patterns]} table.
+    Returns (compiled_regex, {group_name: ct}).
+    """
+    source, group_to_ct = ct_matcher_source(ct_patterns)
+    return re.compile(source), group_to_ct
+
+
+_CT_MATCHER, _CT_GROUPS = compile_ct_matcher(CT_PATTERNS)
+_LOWEST_CT = min(CT_PATTERNS)
+
+
 # ============================================
 # Detect confrontation type
 # Returns CT number 0–5
 # ============================================
-def detect_confrontation(player_message: str) -> int:
-    """Identify confrontation type based on keywords/patterns."""
+def detect_confrontation(player_message: str, case=None) -> int:
+    """
+    Identify confrontation type based on keywords/patterns.
+    case: a case_pack.CasePack to use instead of the built-in CT_PATTERNS.
+    """
     msg = player_message.lower()
+    if case is None:
+        matcher, groups, lowest = _CT_MATCHER, _CT_GROUPS, _LOWEST_CT
+    else:
+        matcher, groups, lowest = case.ct_matcher, case.ct_groups, case.lowest_ct
 
-    for ct, patterns in CT_PATTERNS.items():
-        for pat in patterns:
-            if re.search(pat, msg):
-                return ct
+    best = 0
+    for m in matcher.finditer(msg):
+        ct = groups[m.lastgroup]
+        if best == 0 or ct < best:
+            best = ct
+            if ct == lowest:
+                break  # nothing can outrank the lowest CT
 
-    return 0  # Normal question
+    return best  # 0 = Normal question
 
 
 # ============================================
 # Emotional Tier Update
 # ============================================
-def update_emotional_tier(suspect_name: str, current_tier: int) -> int:
+def update_emotional_tier(suspect_name: str, current_tier: int, case=None) -> int:
     """Increase emotional tier by 1 up to suspect's max tier."""
-    max_tier = SUSPECTS[suspect_name]["max_tier"]
+    suspects = SUSPECTS if case is None else case.suspects
+    max_tier = suspects[suspect_name]["max_tier"]
     new_tier = min(current_tier + 1, max_tier)
     return new_tier
 
 
+# ============================================
+# Precompiled per-suspect prompt prefixes
+# ============================================
+# Everything in MASTER_TEMPLATE before the emotional tier line depends only
+# on the suspect (case background + character profile). It is rendered once
+# here; each turn only formats the short dynamic suffix.
+
+DYNAMIC_MARKER = "Emotional Tier: {CURRENT_EMOTIONAL_TIER}"
+
+
+def split_template(template: str) -> tuple:
+    """(static part, dynamic part) of a master template, split at DYNAMIC_MARKER."""
+    cut = template.index(DYNAMIC_MARKER)
+    return template[:cut], template[cut:]
+
+
+STATIC_TEMPLATE, DYNAMIC_TEMPLATE = split_template(MASTER_TEMPLATE)
+
+
+def render_static_prefix(suspect_name: str, suspects: dict = SUSPECTS, static_template: str = STATIC_TEMPLATE) -> str:
+    """Case background + character profile for one suspect."""
+    suspect = suspects[suspect_name]
+    return static_template.format(
+        SUSPECT_NAME=suspect_name,
+        ROLE=suspect["role"],
+        PERSONALITY_DESCRIPTION=suspect["personality"],
+        PUBLIC_MOTIVE=suspect["public_motive"],
+        HIDDEN_MOTIVES=suspect["hidden_motives"],
+        GUILTY_OR_INNOCENT="GUILTY" if suspect["is_killer"] else "INNOCENT",
+    )
+
+
+SUSPECT_PREFIXES = {name: render_static_prefix(name) for name in SUSPECTS}
+PREFIX_TOKENS = {name: estimate_tokens(p) for name, p in SUSPECT_PREFIXES.items()}
+
+
 # ============================================
 # Build Prompt for Gemini
 # ============================================
-def build_prompt(
+def build_prompt_parts(
     suspect_name: str,
     emotional_tier: int,
     ct: int,
-    player_message: str
-) -> str:
+    player_message: str,
+    memory=None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    case=None
+) -> tuple:
     """
-    Fills the MASTER_TEMPLATE with all necessary suspect information.
-    This function is extremely sensitive to template structure—
-    do NOT modify the variable names unless suspects.py changes.
+    Returns (static_prefix, dynamic_suffix); their concatenation is the
+    full prompt. The prefix is shared by every turn with this suspect.
+
+    memory: the suspect's ConversationMemory; its history gets whatever is
+    left of token_budget after the rest of the prompt.
+    case: a case_pack.CasePack to use instead of the built-in tables.
     """
 
-    suspect = SUSPECTS[suspect_name]
+    if case is None:
+        suspects, ct_effects, prefixes, prefix_tokens, dynamic_template = (
+            SUSPECTS, CT_EFFECTS, SUSPECT_PREFIXES, PREFIX_TOKENS, DYNAMIC_TEMPLATE
+        )
+    else:
+        suspects, ct_effects, prefixes, prefix_tokens, dynamic_template = (
+            case.suspects, case.ct_effects, case.prefixes, case.prefix_tokens, case.dynamic_template
+        )
+
+    suspect = suspects[suspect_name]
 
     # Emotional tier description
     tier_desc = suspect["tiers"][emotional_tier]
@@ -120,20 +225,38 @@ def build_prompt(
         ct_desc = "Normal question; respond in character without escalation."
     else:
         # Safe: CT_EFFECTS maps exactly {suspect_name: {ct: desc}}
-        ct_desc = CT_EFFECTS[suspect_name][ct]
+        ct_desc = ct_effects[suspect_name][ct]
 
-    # Fill master template safely — exact key names from suspects.py
-    prompt = MASTER_TEMPLATE.format(
+    # Fill the dynamic part — exact key names from suspects.py
+    fields = dict(
         SUSPECT_NAME=suspect_name,
-        ROLE=suspect["role"],
-        PERSONALITY_DESCRIPTION=suspect["personality"],
-        PUBLIC_MOTIVE=suspect["public_motive"],
-        HIDDEN_MOTIVES=suspect["hidden_motives"],
-        GUILTY_OR_INNOCENT="GUILTY" if suspect["is_killer"] else "INNOCENT",
         CURRENT_EMOTIONAL_TIER=emotional_tier,
         EMOTIONAL_TIER_DESCRIPTION=tier_desc,
         CONFRONTATION_BEHAVIOR_DESCRIPTION=ct_desc,
         PLAYER_MESSAGE=player_message
     )
+    suffix = dynamic_template.format(CONVERSATION_HISTORY=NO_HISTORY, **fields)
+
+    if memory:
+        left = token_budget - prefix_tokens[suspect_name] - estimate_tokens(suffix) + estimate_tokens(NO_HISTORY)
+        suffix = dynamic_template.format(CONVERSATION_HISTORY=memory.render(left), **fields)
 
-    return prompt
+    return prefixes[suspect_name], suffix
+
+
+def build_prompt(
+    suspect_name: str,
+    emotional_tier: int,
+    ct: int,
+    player_message: str,
+    memory=None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    case=None
+) -> str:
+    """
+    Fills the MASTER_TEMPLATE with all necessary suspect information.
+    This function is extremely sensitive to template structure—
+    do NOT modify the variable names unless suspects.py changes.
+    """
+    prefix, suffix = build_prompt_parts(suspect_name, emotional_tier, ct, player_message, memory, token_budget, case)
+    return prefix + suffix
@@ -0,0 +1,52 @@
+# ============================================
+# bench_broadcast.py
+# Wall-clock comparison for a three-suspect round:
+# - sequential asks vs game.broadcast_question
+# - uses stub_llm.StubClient with injected latency (no network)
+#
+# Run from the repo root:
+#   python benchmarks/bench_broadcast.py [latency_seconds]
+# ============================================
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["RESPONSE_CACHE"] = "0"  # time the stub round trips, not cache hits
+
+import game  # noqa: E402
+from stub_llm import StubClient  # noqa: E402
+
+SUSPECT_NAMES = ("Nisha", "Rohit", "Kabir")
+QUESTION = "Where were you at 11:15?"
+
+
+async def sequential(llm):
+    for name in SUSPECT_NAMES:
+        await game.ask_suspect_async(name, QUESTION, llm=llm)
+
+
+def main(latency: float = 0.2):
+    llm = StubClient(latency=latency)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        asyncio.run(sequential(llm))
+        seq = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        asyncio.run(game.broadcast_question(QUESTION, SUSPECT_NAMES, llm=llm))
+        par = time.perf_counter() - t0
+
+    print(f"latency per call : {latency * 1e3:8.0f} ms")
+    print(f"sequential round : {seq * 1e3:8.0f} ms")
+    print(f"broadcast round  : {par * 1e3:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2)
@@ -0,0 +1,114 @@
+# ============================================
+# bench_case_pack.py
+# Cold-load cost of case packs:
+# - compile from source (parse JSON + validate + build everything)
+# - load from the precompiled .casepack artifact
+# - first-turn cost of compiling the pack's regexes (lazy)
+# - a fresh interpreter: first load_case() (and, separately, the import)
+# Over many copies of the clinic pack, as a server hosting many cases.
+#
+# Run from the repo root:
+#   python benchmarks/bench_case_pack.py
+# ============================================
+
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import case_pack  # noqa: E402
+
+PACKS = 200
+# Loading one compiled pack must stay in the low milliseconds.
+LOAD_TARGET_MS = 5
+
+
+def make_packs(directory: Path, n: int) -> list:
+    """n copies of the clinic pack with distinct ids; returns their paths."""
+    source = case_pack.load_source(case_pack.CASES_DIR / "clinic.json")
+    paths = []
+    for i in range(n):
+        path = directory / f"case{i:04d}.json"
+        path.write_text(json.dumps({**source, "id": f"case{i:04d}"}), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def per_pack_ms(fn, paths) -> list:
+    samples = []
+    for path in paths:
+        t0 = time.perf_counter()
+        fn(path)
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return samples
+
+
+def summary(samples) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"median {statistics.median(samples):7.3f} ms  p99 {p99:7.3f} ms"
+
+
+def fresh_interpreter_ms(case: str, runs: int = 5) -> tuple:
+    """Median (import ms, first load_case ms) in a new process."""
+    code = (
+        "import time; t0 = time.perf_counter(); import case_pack; t1 = time.perf_counter(); "
+        f"case_pack.load_case({case!r}); t2 = time.perf_counter(); print((t1 - t0) * 1e3, (t2 - t1) * 1e3)"
+    )
+    imports, loads = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        import_ms, load_ms = map(float, out.split())
+        imports.append(import_ms)
+        loads.append(load_ms)
+    return statistics.median(imports), statistics.median(loads)
+
+
+def main():
+    # The pack copied below must still be the built-in case.
+    clinic = case_pack.load_source(case_pack.find_source(case_pack.BUILTIN_CASE))
+    assert not case_pack.builtin_differences(clinic), case_pack.builtin_differences(clinic)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_packs(Path(tmp), PACKS)
+
+        compile_ms = per_pack_ms(lambda p: case_pack.compile_source(case_pack.load_source(p)), paths)
+        for path in paths:
+            case_pack.compile_file(path)
+
+        case_pack._LOADED.clear()
+        load_ms = per_pack_ms(case_pack.load_case, paths)
+        packs = [case_pack.load_case(p) for p in paths]
+
+        # Every copy has the same patterns: empty re's cache so each pack
+        # pays the compile a genuinely different case would.
+        regex_ms = []
+        for pack in packs:
+            re.purge()
+            t0 = time.perf_counter()
+            pack.ct_matcher
+            pack.clue_engine
+            regex_ms.append((time.perf_counter() - t0) * 1e3)
+
+        size = paths[0].with_suffix(case_pack.ARTIFACT_SUFFIX).stat().st_size
+
+    print(f"{PACKS} packs, artifact {size / 1024:.1f} KiB each")
+    print(f"compile from source:   {summary(compile_ms)}")
+    print(f"load from artifact:    {summary(load_ms)}")
+    print(f"lazy regex compile:    {summary(regex_ms)}  (first turn only)")
+
+    import_ms, cold = fresh_interpreter_ms("clinic")
+    status = "OK" if cold <= LOAD_TARGET_MS else "OVER TARGET"
+    print(f"fresh process: load_case {cold:.2f} ms (target {LOAD_TARGET_MS} ms) {status}; import case_pack {import_ms:.1f} ms")
+    return 0 if status == "OK" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
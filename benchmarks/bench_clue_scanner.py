@@ -0,0 +1,87 @@
+# ============================================
+# bench_clue_scanner.py
+# Microbenchmark for clue extraction:
+# - legacy per-pattern re.search loop vs rule_engine.RuleEngine
+# - the shipped CLUE_RULES plus synthetic packs of growing size
+#
+# Run from the repo root:
+#   python benchmarks/bench_clue_scanner.py
+# ============================================
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notes_engine import CLUE_RULES  # noqa: E402
+from rule_engine import RuleEngine  # noqa: E402
+
+REPLIES = [
+    "I was at home at 11:05, I swear. I never went near the clinic.",
+    "Fine, I lied. I went back to the clinic around 11:20 and saw his body.",
+    "The CCTV was down that night, everyone knew that.",
+    "We argued, yes, he threatened to ruin me over the audit.",
+    "I don't know anything about a USB drive.",
+    "I panicked. I didn't say that earlier, you misunderstood me.",
+    "He was a good man. I just want to go home now.",
+]
+
+_WORDS = [
+    "alibi", "ledger", "scalpel", "corridor", "locker", "badge", "pager",
+    "invoice", "keycard", "stairwell", "receipt", "parking", "ward", "chart",
+    "prescription", "pharmacy", "voicemail", "umbrella", "taxi", "elevator",
+]
+
+
+def synthetic_rules(n: int, seed: int = 7) -> list:
+    """Generates n extra rules shaped like CLUE_RULES entries."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(n):
+        a, b = rng.sample(_WORDS, 2)
+        rules.append({
+            "category": "Synthetic",
+            "patterns": [rf"\b{a} {i}\b", rf"\bthe {b}{i}\b.*\bagain\b"],
+            "note_template": "{suspect} synthetic " + str(i),
+        })
+    return rules
+
+
+def legacy_scan(rules, reply: str) -> set:
+    """Original strategy: every pattern searched against the whole reply."""
+    low = reply.lower()
+    fired = set()
+    for idx, rule in enumerate(rules):
+        for pat in rule["patterns"]:
+            if re.search(pat, low):
+                fired.add(idx)
+    return fired
+
+
+def bench(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for r in REPLIES:
+            fn(r)
+    return rounds * len(REPLIES) / (time.perf_counter() - start)
+
+
+def main(rounds: int = 300):
+    print(f"{'rules':>6} {'legacy/s':>12} {'engine/s':>12} {'speedup':>8}")
+    for extra in (0, 100, 500, 1000):
+        rules = CLUE_RULES + synthetic_rules(extra)
+        engine = RuleEngine([r["patterns"] for r in rules])
+
+        for r in REPLIES:
+            assert legacy_scan(rules, r) == engine.scan(r.lower()), r
+
+        before = bench(lambda r: legacy_scan(rules, r), rounds)
+        after = bench(lambda r: engine.scan(r.lower()), rounds)
+        print(f"{len(rules):>6} {before:>12,.0f} {after:>12,.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
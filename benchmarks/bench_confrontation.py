@@ -0,0 +1,69 @@
+# ============================================
+# bench_confrontation.py
+# Microbenchmark for behavior_engine.detect_confrontation:
+# - legacy loop (re.search per CT pattern) vs compiled matcher
+# - verifies both agree on every message before timing
+#
+# Run from the repo root:
+#   python benchmarks/bench_confrontation.py
+# ============================================
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from behavior_engine import CT_PATTERNS, detect_confrontation  # noqa: E402
+
+MESSAGES = [
+    "Where were you at 11:15 last night?",
+    "Tell me about your relationship with Arjun.",
+    "We found your footprint near the window.",
+    "How do you know the CCTV was down?",
+    "Earlier you said you went home at ten.",
+    "You killed him, didn't you?",
+    "Did you like working at the hospital?",
+    "What did you have for dinner?",
+    "Your timeline doesn't add up and the laptop proves it.",
+    "You did it. The USB drive was in your bag.",
+    "Be honest with me, what was your marriage like?",
+    "Who else had keys to the clinic?",
+]
+
+
+def legacy_detect_confrontation(player_message: str) -> int:
+    """The original implementation, kept here as the baseline."""
+    msg = player_message.lower()
+    for ct, patterns in CT_PATTERNS.items():
+        for pat in patterns:
+            if re.search(pat, msg):
+                return ct
+    return 0
+
+
+def bench(fn, messages, rounds: int) -> float:
+    """Returns messages/second for fn over `rounds` passes of messages."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for m in messages:
+            fn(m)
+    elapsed = time.perf_counter() - start
+    return rounds * len(messages) / elapsed
+
+
+def main(rounds: int = 20000):
+    for m in MESSAGES:
+        assert legacy_detect_confrontation(m) == detect_confrontation(m), m
+
+    before = bench(legacy_detect_confrontation, MESSAGES, rounds)
+    after = bench(detect_confrontation, MESSAGES, rounds)
+
+    print(f"legacy loop      : {before:12,.0f} msgs/s")
+    print(f"compiled matcher : {after:12,.0f} msgs/s")
+    print(f"speedup          : {after / before:12.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
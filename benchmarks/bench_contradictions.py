@@ -0,0 +1,106 @@
+# ============================================
+# bench_contradictions.py
+# Contradiction checks (contradictions.ContradictionDetector):
+# - claim extraction: µs per reply over the stub / corpus replies
+# - checking one new reply as claims accumulate (1k .. 100k claims per
+#   suspect, spread over the night): ContradictionDetector.check (time
+#   buckets + topics) vs. the same rules over every earlier claim and
+#   fact (cost should follow the claims that overlap in time, not the
+#   total; here every overlapping claim elsewhere is a conflict, noted
+#   once per kind)
+#
+# Run from the repo root:
+#   python benchmarks/bench_contradictions.py
+# ============================================
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import contradictions  # noqa: E402
+from contradictions import (  # noqa: E402
+    NIGHT_END, NIGHT_START, Claim, ContradictionDetector, _evidence_conflict, _self_conflict, extract_claims,
+)
+from investigation_engine import examine  # noqa: E402
+from session import GameSession  # noqa: E402
+
+SUSPECTS = ("Nisha", "Rohit", "Kabir")
+REPLIES = (
+    "I was in the ward until 11:00 and then I went home. It's all in the duty log.",
+    "I never touched his laptop. Someone must have used my login.",
+    "I was at home that night, I swear. I only drove past near the clinic once.",
+    "I left at ten. Well, I went back to the clinic around 11:25, but he was already on the floor.",
+    "Nobody came into the clinic after 11, I was in the corridor the whole time.",
+    "I don't remember much about that evening, honestly.",
+)
+PLACES = ("ward", "canteen", "parking", "car", "clinic", "corridor")  # not "home": the checked reply says home
+SIZES = (1_000, 10_000, 100_000)
+REPEATS = 200
+
+
+def detector(size: int) -> ContradictionDetector:
+    """size distinct timed claims per suspect across the night, plus the case's findings."""
+    rng = random.Random(25)
+    session = GameSession("bench", announce=False)
+    for area in session.evidence_graph.areas:
+        examine(area, session)
+    found = session.contradictions
+    for suspect in SUSPECTS:
+        claims = []
+        for i in range(size):
+            start = rng.randrange(NIGHT_START, NIGHT_END - 30)
+            end = start + rng.choice((10, 20, 30))
+            claims.append(Claim(suspect, "self", True, rng.choice(PLACES), None, start, end, True, f"claim #{i}"))
+        found.add_claims(claims, check=False)
+    return found
+
+
+def linear(found: ContradictionDetector, claims: list) -> int:
+    """The same rules over every stored claim and fact, no index."""
+    everything = found.export_claims()
+    facts = [f for bucket in found.facts.buckets.values() for f in bucket] + found.facts.spanning
+    hits = 0
+    for claim in claims:
+        for old in everything:
+            if old.suspect == claim.suspect and old.start < claim.end and claim.start < old.end:
+                hits += _self_conflict(claim, old) is not None
+        for fact in facts:
+            if fact.start < claim.end and claim.start < fact.end:
+                hits += _evidence_conflict(claim, fact, found.links.get(fact.area, frozenset())) is not None
+    return hits
+
+
+def main():
+    contradictions.enable()
+    t0 = time.perf_counter()
+    n = 0
+    for _ in range(REPEATS):
+        for reply in REPLIES:
+            n += len(extract_claims("Rohit", reply))
+    per_reply = (time.perf_counter() - t0) / (REPEATS * len(REPLIES)) * 1e6
+    print(f"extraction: {per_reply:.1f} µs/reply ({n / REPEATS / len(REPLIES):.1f} claims/reply)\n")
+
+    reply = "I was at home at 11:14, I never touched his laptop."
+    print(f"checking {reply!r}")
+    print(f"{'claims/suspect':>15}{'index µs':>12}{'linear µs':>12}")
+    for size in SIZES:
+        found = detector(size)
+        claims = extract_claims("Rohit", reply)
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            hits = sum(1 for claim in claims for _ in found.check(claim))
+        indexed = (time.perf_counter() - t0) / REPEATS * 1e6
+        repeats = max(1, REPEATS * 1_000 // size // 10)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            assert linear(found, claims) == hits
+        scanned = (time.perf_counter() - t0) / repeats * 1e6
+        noted = found.add_claims(claims)
+        print(f"{size:>15,}{indexed:>12.1f}{scanned:>12.1f}   ({hits:,} conflicts, {len(noted)} noted)")
+
+
+if __name__ == "__main__":
+    main()
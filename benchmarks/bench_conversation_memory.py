@@ -0,0 +1,101 @@
+# ============================================
+# bench_conversation_memory.py
+# Prompt size and build time versus turn count, per strategy:
+# - none:     current question only (no memory)
+# - full:     every earlier turn appended verbatim (grows linearly)
+# - bounded:  ConversationMemory (recent turns + rolling summary,
+#             capped at PROMPT_TOKEN_BUDGET)
+# Plus end-to-end turn latency through the stub LLM for the bounded one.
+#
+# Run from the repo root:
+#   python benchmarks/bench_conversation_memory.py
+# ============================================
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["RESPONSE_CACHE"] = "0"
+
+import game  # noqa: E402
+import llm_backend  # noqa: E402
+from behavior_engine import build_prompt  # noqa: E402
+from conversation_memory import PROMPT_TOKEN_BUDGET, ConversationMemory, estimate_tokens  # noqa: E402
+from session import GameSession  # noqa: E402
+from stub_llm import StubClient, stub_reply  # noqa: E402
+
+CHECKPOINTS = (1, 5, 10, 25, 50, 100, 200)
+QUESTIONS = [
+    "Where were you at 11:10 that night?",
+    "Why was your login used on his laptop?",
+    "Earlier you said you went home. Who saw you?",
+    "Tell me about the duty log.",
+    "How do you know the CCTV was down?",
+]
+
+
+class FullHistory:
+    """Naive memory: everything, verbatim."""
+
+    def __init__(self):
+        self.turns = []
+
+    def add(self, player, reply):
+        self.turns.append((player, reply))
+
+    def render(self, max_tokens):
+        return "\n".join(f"Detective: {p}\nYou: {r}" for p, r in self.turns)
+
+    def __len__(self):
+        return len(self.turns)
+
+
+def measure(memory, turns: int):
+    """Returns {turn: (prompt tokens, build µs)} at each checkpoint."""
+    out = {}
+    for turn in range(1, turns + 1):
+        question = QUESTIONS[turn % len(QUESTIONS)] + f" ({turn})"
+        t0 = time.perf_counter()
+        prompt = build_prompt("Rohit", 2, 1, question, memory)
+        build_us = (time.perf_counter() - t0) * 1e6
+        if turn in CHECKPOINTS:
+            out[turn] = (estimate_tokens(prompt), build_us)
+        if memory is not None:
+            memory.add(question, stub_reply(prompt))
+    return out
+
+
+async def turn_latency(turns: int, latency: float):
+    """Mean ms per full turn (prompt, stub LLM, memory, clue scan)."""
+    llm = StubClient(latency=latency)
+    session = GameSession(announce=False)
+    t0 = time.perf_counter()
+    for turn in range(turns):
+        await game.ask_suspect_async("Rohit", QUESTIONS[turn % len(QUESTIONS)] + f" ({turn})", llm=llm, session=session)
+    return (time.perf_counter() - t0) / turns * 1e3
+
+
+def main():
+    llm_backend.CONTEXT_CACHING = False
+    turns = max(CHECKPOINTS)
+    results = {
+        "none": measure(None, turns),
+        "full": measure(FullHistory(), turns),
+        "bounded": measure(ConversationMemory(), turns),
+    }
+
+    print(f"prompt tokens / build µs by turn (budget {PROMPT_TOKEN_BUDGET} tokens)")
+    print(f"{'turn':>6}" + "".join(f"{name:>20}" for name in results))
+    for turn in CHECKPOINTS:
+        row = "".join(f"{results[name][turn][0]:>11,d} {results[name][turn][1]:>7.1f}µs" for name in results)
+        print(f"{turn:>6}{row}")
+
+    for n in (10, 100):
+        print(f"bounded turn latency over {n:>3} turns (stub LLM 5 ms): {asyncio.run(turn_latency(n, 0.005)):.2f} ms/turn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# ============================================
+# bench_evidence_graph.py
+# Evidence graphs with hundreds to thousands of areas:
+# - incremental EvidenceState updates (examine / note events)
+# - versus re-evaluating every locked area's conditions after each event
+# - is_available() lookups
+# A seeded random DAG (1–3 required areas, some "any of" groups and note
+# thresholds) is played to the end: examine any available area, add a
+# note now and then.
+#
+# Run from the repo root:
+#   python benchmarks/bench_evidence_graph.py
+# ============================================
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from evidence_graph import EvidenceGraph, EvidenceState  # noqa: E402
+
+SIZES = (100, 500, 2000)
+CATEGORIES = ("Timeline", "Evidence", "Motive", "Contradiction")
+
+
+def random_spec(n: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    spec = {}
+    for i in range(n):
+        node = {"label": f"Area {i}"}
+        if i >= 10:
+            earlier = [f"a{j}" for j in rng.sample(range(i), 3)]
+            node["requires"] = earlier[:rng.randint(1, 3)]
+            if rng.random() < 0.2:
+                node["requires_any"] = [f"a{j}" for j in rng.sample(range(i), 3)]
+            if rng.random() < 0.1:
+                node["requires_notes"] = {rng.choice(CATEGORIES): rng.randint(1, 5)}
+        spec[f"a{i}"] = node
+    return spec
+
+
+class Recompute:
+    """Baseline: after every event, re-check every still-locked area."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.examined = set()
+        self.notes = {}
+        self.unlocked = {a: False for a, node in spec.items() if len(node) > 1}
+
+    def _refresh(self):
+        for area, on in self.unlocked.items():
+            if on:
+                continue
+            node = self.spec[area]
+            self.unlocked[area] = (
+                all(r in self.examined for r in node.get("requires", ()))
+                and (not node.get("requires_any") or any(r in self.examined for r in node["requires_any"]))
+                and all(self.notes.get(c, 0) >= k for c, k in node.get("requires_notes", {}).items())
+            )
+
+    def is_available(self, area):
+        return self.unlocked.get(area, True)
+
+    def mark_examined(self, area):
+        self.examined.add(area)
+        self._refresh()
+
+    def record_note(self, category):
+        self.notes[category] = self.notes.get(category, 0) + 1
+        self._refresh()
+
+
+def playthrough(state, areas, seed: int = 11) -> tuple:
+    """Plays until nothing new opens. Returns (events, lookups, seconds)."""
+    rng = random.Random(seed)
+    events = lookups = 0
+    done = set()
+    t0 = time.perf_counter()
+    while True:
+        progressed = False
+        for area in areas:
+            lookups += 1
+            if area in done or not state.is_available(area):
+                continue
+            state.mark_examined(area)
+            done.add(area)
+            events += 1
+            progressed = True
+            if rng.random() < 0.5:
+                state.record_note(rng.choice(CATEGORIES))
+                events += 1
+        if not progressed:
+            return events, lookups, time.perf_counter() - t0
+
+
+def main():
+    playthrough(EvidenceState(EvidenceGraph(random_spec(50))), list(random_spec(50)))  # warm-up
+    print(f"{'areas':>6} {'events':>7} {'incremental µs/event':>21} {'recompute µs/event':>19} {'lookup ns':>10}")
+    for n in SIZES:
+        spec = random_spec(n)
+        graph = EvidenceGraph(spec)
+        areas = list(spec)
+
+        events, _, inc = playthrough(EvidenceState(graph), areas)
+        baseline_events, _, rec = playthrough(Recompute(spec), areas)
+        assert events == baseline_events
+
+        state = EvidenceState(graph)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            for area in areas:
+                state.is_available(area)
+        lookup_ns = (time.perf_counter() - t0) / (20 * n) * 1e9
+
+        # Playthrough time includes the menu scans (one lookup per area per pass).
+        print(f"{n:>6} {events:>7} {inc / events * 1e6:>21.2f} {rec / events * 1e6:>19.2f} {lookup_ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# ============================================
+# bench_note_dedup.py
+# Insert benchmark for the note/clue dedup indexes:
+# - notes_engine.add_note with 100k unique notes (+ duplicate re-inserts)
+# - notes_engine.add_note with 100k notes + a paraphrase of each
+#   (near-duplicate merging via near_duplicates.py), and the same check
+#   done as a linear scan over the notebook for comparison
+# - clues.Notebook.add_clue with 100k unique clues
+# - per-block timings should stay flat (linear total cost)
+#
+# Run from the repo root:
+#   python benchmarks/bench_note_dedup.py
+# ============================================
+
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("NOTE_DEDUP_THRESHOLD", "0.5")  # merging is opt-in
+
+import notes_engine  # noqa: E402
+from clues import Notebook  # noqa: E402
+from near_duplicates import jaccard, shingles  # noqa: E402
+
+BLOCK = 10_000
+
+
+def run(label: str, insert, total: int):
+    """Times `insert(i)` in blocks and prints the cost per block."""
+    print(f"\n{label}")
+    print(f"{'inserted':>10} {'block ms':>10} {'us/insert':>10}")
+    start = time.perf_counter()
+    for block_start in range(0, total, BLOCK):
+        t0 = time.perf_counter()
+        for i in range(block_start, block_start + BLOCK):
+            insert(i)
+        dt = time.perf_counter() - t0
+        print(f"{block_start + BLOCK:>10,} {dt * 1e3:>10.1f} {dt / BLOCK * 1e6:>10.2f}")
+    print(f"total: {time.perf_counter() - start:.2f}s")
+
+
+def main(total: int = 100_000):
+    notes_engine.clear_notes()
+    sink = io.StringIO()
+
+    def add(i):
+        # add_note announces every new clue; keep the console quiet
+        with contextlib.redirect_stdout(sink):
+            notes_engine.add_note(f"Clue number {i} about the clinic.", "Evidence")
+            notes_engine.add_note(f"clue number {i}  about the clinic.", "Evidence")  # duplicate
+        sink.seek(0)
+        sink.truncate()
+
+    run("notes_engine.add_note (unique + normalized duplicate)", add, total)
+    assert len(notes_engine.NOTES) == total
+    notes_engine.clear_notes()
+
+    def add_paraphrased(i):
+        with contextlib.redirect_stdout(sink):
+            notes_engine.add_note(f"Clue number {i}: muddy footprints lead to the window.", "Evidence")
+            notes_engine.add_note(f"Muddy footprints near the window, clue number {i}.", "Evidence")  # paraphrase
+        sink.seek(0)
+        sink.truncate()
+
+    run("notes_engine.add_note (unique + paraphrase, LSH)", add_paraphrased, total)
+    assert len(notes_engine.NOTES) == total
+    notes_engine.clear_notes()
+
+    stored = []
+
+    def linear(i):
+        for text in (f"Clue number {i}: muddy footprints lead to the window.",
+                     f"Muddy footprints near the window, clue number {i}."):
+            words, anchors = shingles(text)
+            tokens = words | anchors
+            if not any(a == anchors and jaccard(t, tokens) >= 0.5 for t, a in stored):
+                stored.append((tokens, anchors))
+
+    run("same near-duplicate check as a linear scan (first 10k)", linear, min(total, 10_000))
+
+    book = Notebook()
+
+    def add_clue(i):
+        book.add_clue("Rohit", f"Summary {i}")
+        book.add_clue("Rohit", f"SUMMARY {i}")  # duplicate
+
+    run("clues.Notebook.add_clue (unique + case duplicate)", add_clue, total)
+    assert len(book.clues) == total and book.clues[-1].id == total
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,131 @@
+# ============================================
+# bench_note_memory.py
+# Memory per note / clue (tracemalloc), many sessions in one process:
+# - notes as the old dicts ({"text", "category", "timestamp": datetime})
+#   vs. clues.Note (interned text, category code, integer timestamp)
+# - clues as a plain dataclass vs. the slotted clues.Clue
+# - clues.ColumnarNotebook (typed arrays + interned summaries)
+# - filter-by-category / filter-by-source: list scan vs. columns
+# Note texts are formatted inside each build from the clue-rule
+# templates, like detect_notes does, so every representation pays for
+# its strings. Notes are distinct within a session (as after dedup).
+#
+# Run from the repo root:
+#   python benchmarks/bench_note_memory.py [sessions] [notes per session]
+# ============================================
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clues import Clue, ColumnarNotebook, Note  # noqa: E402
+from notes_engine import CLUE_RULES  # noqa: E402
+
+SUSPECTS = ("Nisha", "Rohit", "Kabir")
+FILTER_REPEATS = 20
+
+
+@dataclass
+class PlainClue:
+    """clues.Clue before __slots__ / interning."""
+    id: int
+    source: str
+    summary: str
+
+
+def rows(sessions: int, per_session: int):
+    """(session, suspect, category, note template), distinct per session, seeded."""
+    rng = random.Random(23)
+    pairs = [(suspect, rule) for rule in CLUE_RULES for suspect in SUSPECTS]
+    for s in range(sessions):
+        for suspect, rule in rng.sample(pairs, per_session):
+            yield s, suspect, rule["category"], rule["note_template"]
+
+
+def measure(build, total: int):
+    """(bytes per item, built object) of what build() keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / total, kept
+
+
+def main(sessions: int = 4000, per_session: int = 25):
+    total = sessions * per_session
+    data = list(rows(sessions, per_session))
+    print(f"{sessions:,} sessions x {per_session} notes = {total:,} notes\n")
+
+    def dict_notes():
+        books = [[] for _ in range(sessions)]
+        for s, suspect, category, template in data:
+            text = template.format(suspect=suspect)
+            books[s].append({"text": text, "category": category, "timestamp": datetime.now()})
+        return books
+
+    def slotted_notes():
+        books = [[] for _ in range(sessions)]
+        for s, suspect, category, template in data:
+            books[s].append(Note(template.format(suspect=suspect), category))
+        return books
+
+    def plain_clues():
+        books = [[] for _ in range(sessions)]
+        for s, suspect, _, template in data:
+            books[s].append(PlainClue(len(books[s]) + 1, "".join(suspect), template.format(suspect=suspect)))
+        return books
+
+    def slotted_clues():
+        books = [[] for _ in range(sessions)]
+        for s, suspect, _, template in data:
+            books[s].append(Clue(len(books[s]) + 1, "".join(suspect), sys.intern(template.format(suspect=suspect))))
+        return books
+
+    def columnar():
+        books = [ColumnarNotebook() for _ in range(sessions)]
+        for s, suspect, category, template in data:
+            books[s].add_clue(suspect, template.format(suspect=suspect), category)
+        return books
+
+    print(f"{'representation':<44}{'bytes/note':>12}")
+    results = {}
+    for label, build in (
+        ("notes: dict + datetime", dict_notes),
+        ("notes: clues.Note", slotted_notes),
+        ("clues: plain dataclass", plain_clues),
+        ("clues: slotted clues.Clue", slotted_clues),
+        ("clues: ColumnarNotebook", columnar),
+    ):
+        per_note, kept = measure(build, total)
+        results[label] = kept
+        print(f"{label:<44}{per_note:>12.0f}")
+
+    dict_books = results["notes: dict + datetime"]
+    column_books = results["clues: ColumnarNotebook"]
+    print(f"\nfilter one category and one source in every session ({FILTER_REPEATS} passes)")
+    for label, run in (
+        ("dict notes, list scan", lambda: [
+            [n for n in book if n["category"] == "Timeline"] for book in dict_books
+        ]),
+        ("ColumnarNotebook.rows(category=...)", lambda: [book.rows(category="Timeline") for book in column_books]),
+        ("ColumnarNotebook.rows(source=...)", lambda: [book.rows(source="Rohit") for book in column_books]),
+    ):
+        t0 = time.perf_counter()
+        for _ in range(FILTER_REPEATS):
+            run()
+        elapsed = time.perf_counter() - t0
+        print(f"  {label:<42}{elapsed / FILTER_REPEATS / sessions * 1e6:8.2f} µs/session")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
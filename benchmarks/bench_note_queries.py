@@ -0,0 +1,78 @@
+# ============================================
+# bench_note_queries.py
+# Notebook queries and rendering (clues.NoteCatalog):
+# - "notes about Rohit in Timeline", one category, one source, a time
+#   window: catalog query vs. a linear scan of session.notes, as the
+#   notebook grows (query cost should follow the result count, not n)
+# - rendering: one page from the cached lines vs. formatting every note,
+#   and the cost of rendering again after a note was added
+#
+# Run from the repo root:
+#   python benchmarks/bench_note_queries.py
+# ============================================
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notes_engine import CLUE_RULES, add_note, find_notes  # noqa: E402
+from session import GameSession  # noqa: E402
+
+SOURCES = ("Nisha", "Rohit", "Kabir", "laptop", "footprints", "corridor_camera")
+SIZES = (1_000, 10_000, 100_000)
+REPEATS = 200
+
+
+def notebook(size: int) -> GameSession:
+    rng = random.Random(24)
+    session = GameSession("bench", announce=False)
+    session.near_dups.threshold = 0  # unique texts; measure the indexes, not dedup
+    for i in range(size):
+        rule = rng.choice(CLUE_RULES)
+        add_note(f"{rule['note_template']} #{i}", rule["category"], session, source=rng.choice(SOURCES))
+    return session
+
+
+def per_call(fn) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - t0) / REPEATS * 1e6, result
+
+
+def main():
+    print(f"{'notes':>8}  {'query':<28}{'results':>8}{'catalog µs':>12}{'scan µs':>12}")
+    for size in SIZES:
+        session = notebook(size)
+        notes = session.notes
+        window = (notes[size // 2].ts, notes[size // 2 + 50].ts)
+        for label, kwargs, scan in (
+            ("Rohit + Timeline", {"category": "Timeline", "source": "Rohit"},
+             lambda: [n for n in notes if n.source == "Rohit" and n.category == "Timeline"]),
+            ("category Motive", {"category": "Motive"}, lambda: [n for n in notes if n.category == "Motive"]),
+            ("source laptop", {"source": "laptop"}, lambda: [n for n in notes if n.source == "laptop"]),
+            ("50-note time window", {"since": window[0], "until": window[1]},
+             lambda: [n for n in notes if window[0] <= n.ts < window[1]]),
+        ):
+            indexed, found = per_call(lambda: find_notes(session=session, **kwargs))
+            scanned, expected = per_call(scan)
+            assert found == expected
+            print(f"{size:>8,}  {label:<28}{len(found):>8,}{indexed:>12.1f}{scanned:>12.1f}")
+
+        catalog = session.catalog
+        catalog.render()  # warm the line cache
+        page, _ = per_call(lambda: catalog.render(catalog.query("Timeline", "Rohit"), page=-1))
+        rebuild, _ = per_call(lambda: [f"{i}. [{n.category}] {n.text}" for i, n in enumerate(notes, start=1)])
+        add_note(f"one more note #{size}", "Timeline", session, source="Rohit")
+        t0 = time.perf_counter()
+        catalog.render(page=-1)
+        after_add = (time.perf_counter() - t0) * 1e6
+        print(f"{'':>8}  render: last page {page:.1f} µs, after one new note {after_add:.1f} µs, "
+              f"rebuilding every line {rebuild:.0f} µs\n")
+
+
+if __name__ == "__main__":
+    main()
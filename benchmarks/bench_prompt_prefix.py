@@ -0,0 +1,88 @@
+# ============================================
+# bench_prompt_prefix.py
+# Prompt construction cost:
+# - full MASTER_TEMPLATE.format per turn vs precompiled prefix + suffix
+# - input characters sent per turn with and without context caching
+#
+# Run from the repo root:
+#   python benchmarks/bench_prompt_prefix.py
+# ============================================
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RESPONSE_CACHE", "0")
+
+from behavior_engine import build_prompt  # noqa: E402
+from conversation_memory import NO_HISTORY  # noqa: E402
+from suspects import CT_EFFECTS, MASTER_TEMPLATE, SUSPECTS  # noqa: E402
+
+TURNS = [
+    ("Rohit", 2, 1, "Where were you at 11:15?"),
+    ("Kabir", 1, 2, "Explain the footprints."),
+    ("Nisha", 0, 0, "Tell me about your husband."),
+]
+
+
+def legacy_build_prompt(suspect_name, emotional_tier, ct, player_message):
+    """The original single-format implementation."""
+    suspect = SUSPECTS[suspect_name]
+    ct_desc = "Normal question; respond in character without escalation." if ct == 0 else CT_EFFECTS[suspect_name][ct]
+    return MASTER_TEMPLATE.format(
+        SUSPECT_NAME=suspect_name,
+        ROLE=suspect["role"],
+        PERSONALITY_DESCRIPTION=suspect["personality"],
+        PUBLIC_MOTIVE=suspect["public_motive"],
+        HIDDEN_MOTIVES=suspect["hidden_motives"],
+        GUILTY_OR_INNOCENT="GUILTY" if suspect["is_killer"] else "INNOCENT",
+        CURRENT_EMOTIONAL_TIER=emotional_tier,
+        EMOTIONAL_TIER_DESCRIPTION=suspect["tiers"][emotional_tier],
+        CONFRONTATION_BEHAVIOR_DESCRIPTION=ct_desc,
+        CONVERSATION_HISTORY=NO_HISTORY,
+        PLAYER_MESSAGE=player_message
+    )
+
+
+def bench(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for t in TURNS:
+            fn(*t)
+    return rounds * len(TURNS) / (time.perf_counter() - start)
+
+
+def sent_chars_per_turn(context_caching: bool, turns: int = 20) -> float:
+    import game
+    import llm_backend
+    from stub_llm import StubClient
+
+    llm_backend.CONTEXT_CACHING = context_caching
+    llm = StubClient()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(turns):
+            asyncio.run(game.ask_suspect_async("Rohit", f"Question {i}", llm=llm))
+    return llm.sent_chars / turns
+
+
+def main(rounds: int = 50000):
+    for t in TURNS:
+        assert legacy_build_prompt(*t) == build_prompt(*t)
+
+    before = bench(legacy_build_prompt, rounds)
+    after = bench(build_prompt, rounds)
+    print(f"full format     : {before:12,.0f} prompts/s")
+    print(f"prefix + suffix : {after:12,.0f} prompts/s")
+
+    full = sent_chars_per_turn(False)
+    cached = sent_chars_per_turn(True)
+    print(f"input chars/turn: {full:8.0f} full prompt, {cached:8.0f} with cached prefix")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,156 @@
+# ============================================
+# bench_resilience.py
+# Tail latency of interrogation turns against a flaky backend:
+# - most requests answer after `latency`
+# - a few hang for a long time, a few fail with a 503
+# Compares unguarded calls with llm_backend's resilience layer
+# (per-attempt timeout, jittered retries, circuit breaker, fallback),
+# then takes the backend down entirely to show the breaker short-circuiting,
+# and checks that a half-open trial call that is cancelled (or a trial
+# stream closed early, e.g. a WebSocket client leaving) lets the breaker
+# try again instead of leaving it stuck half-open.
+#
+# Run from the repo root:
+#   python benchmarks/bench_resilience.py
+# ============================================
+
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["RESPONSE_CACHE"] = "0"
+
+import llm_backend  # noqa: E402
+from resilience import CannedReply, CircuitBreaker, ResilientCaller  # noqa: E402
+from stub_llm import StubClient  # noqa: E402
+
+TURNS = 400
+LATENCY = 0.02
+HANG = 2.0          # seconds a hung request takes
+HANG_RATE = 0.03
+ERROR_RATE = 0.03
+
+
+class ServiceUnavailable(Exception):
+    code = 503
+
+
+class FlakyClient(StubClient):
+    """StubClient whose async calls sometimes hang or fail."""
+
+    def __init__(self, hang_rate=HANG_RATE, error_rate=ERROR_RATE, seed=7):
+        super().__init__(latency=LATENCY)
+        self.hang_rate = hang_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        real = self.aio.models.generate_content
+
+        async def generate_content(model, contents, config=None):
+            roll = self.rng.random()
+            if roll < self.error_rate:
+                await asyncio.sleep(LATENCY)
+                raise ServiceUnavailable("503 model overloaded")
+            if roll < self.error_rate + self.hang_rate:
+                await asyncio.sleep(HANG)
+            return await real(model, contents, config)
+
+        self.aio.models.generate_content = generate_content
+
+
+async def turns(llm, n=TURNS, concurrency=20):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, failures, fallbacks = [], 0, 0
+
+    async def one(i):
+        nonlocal failures, fallbacks
+        async with gate:
+            t0 = time.perf_counter()
+            try:
+                reply = await llm_backend.call_gemini_async(f"Now respond as Rohit. q{i}", llm=llm, suspect="Rohit", tier=2)
+                fallbacks += isinstance(reply, CannedReply)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    latencies.sort()
+    return latencies, failures, fallbacks
+
+
+def report(label, result):
+    latencies, failures, fallbacks = result
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3  # noqa: E731
+    print(f"{label:>10}: p50 {p(0.5):6.0f} ms  p99 {p(0.99):6.0f} ms  max {latencies[-1] * 1e3:6.0f} ms"
+          f"  errors {failures:3d}  fallbacks {fallbacks:3d}")
+
+
+async def abandoned_trials() -> list:
+    """Breaker states after cancelling / closing the half-open trial, then after a good call."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    guard = ResilientCaller(timeout=1.0, breaker=breaker)
+    states = []
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def stream():
+        yield "I was "
+        await asyncio.sleep(10)
+        yield "at home."
+
+    async def ok():
+        return "fine"
+
+    # Cancelled trial call
+    breaker.record_failure()
+    await asyncio.sleep(0.02)
+    task = asyncio.create_task(guard.call_async(hang, "Rohit", 1))
+    await asyncio.sleep(0.01)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    states.append(breaker.state)
+    await asyncio.sleep(0.02)
+    states.append(await guard.call_async(ok, "Rohit", 1))
+
+    # Trial stream closed after its first chunk
+    breaker.record_failure()
+    await asyncio.sleep(0.02)
+    chunks = guard.stream_async(stream, "Rohit", 1)
+    await chunks.__anext__()
+    await chunks.aclose()
+    states.append(breaker.state)
+    await asyncio.sleep(0.02)
+    states.append(await guard.call_async(ok, "Rohit", 1))
+    states.append(breaker.state)
+    return states
+
+
+def main():
+    llm_backend.CONTEXT_CACHING = False
+
+    llm_backend.RESILIENCE = None
+    report("unguarded", asyncio.run(turns(FlakyClient())))
+
+    guard = ResilientCaller(timeout=0.25, deadline=1.0, attempts=3, base_delay=0.02, max_delay=0.2)
+    llm_backend.RESILIENCE = guard
+    report("guarded", asyncio.run(turns(FlakyClient())))
+    print(f"            {guard.stats.counters}")
+
+    guard = ResilientCaller(timeout=0.25, deadline=1.0, attempts=3, base_delay=0.02, max_delay=0.2,
+                            breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30.0))
+    llm_backend.RESILIENCE = guard
+    report("outage", asyncio.run(turns(FlakyClient(hang_rate=0.0, error_rate=1.0))))
+    print(f"            breaker {guard.breaker.state}, {guard.stats.counters}")
+
+    states = asyncio.run(abandoned_trials())
+    assert states == ["open", "fine", "open", "fine", "closed"], states
+    print(f"abandoned half-open trials: {' -> '.join(states)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# ============================================
+# bench_scheduler.py
+# LLM request scheduler against a fake backend that charges a fixed
+# overhead per request plus a small cost per prompt, with a capped
+# number of concurrent requests (like a connection pool):
+# - direct calls vs single-flight + micro-batching
+# - interactive vs background latency under a rate limit
+# - check: streamed replies (llm_backend.stream_gemini_async) pay the
+#   rate limit too
+#
+# Run from the repo root:
+#   python benchmarks/bench_scheduler.py
+# ============================================
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler  # noqa: E402
+
+
+class FakeBatchBackend:
+    """Each request costs `overhead` seconds plus `per_item` per prompt."""
+
+    def __init__(self, overhead=0.02, per_item=0.001, pool=4):
+        self.overhead = overhead
+        self.per_item = per_item
+        self.pool = asyncio.Semaphore(pool)
+        self.requests = 0
+        self.prompts = 0
+
+    async def dispatch(self, batch):
+        async with self.pool:
+            self.requests += 1
+            self.prompts += len(batch)
+            await asyncio.sleep(self.overhead + self.per_item * len(batch))
+        return [f"reply to {prompt}" for prompt, _ in batch]
+
+    async def call(self, prompt):
+        return (await self.dispatch([(prompt, None)]))[0]
+
+
+def workload(n=400, distinct=250):
+    """n prompts, with repeats (players asking stock questions)."""
+    return [f"prompt {i % distinct}" for i in range(n)]
+
+
+async def direct(prompts):
+    backend = FakeBatchBackend()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(backend.call(p) for p in prompts))
+    return time.perf_counter() - t0, backend.requests, backend.prompts, None
+
+
+async def scheduled(prompts, max_batch=16):
+    backend = FakeBatchBackend()
+    sched = LLMScheduler(backend.dispatch, max_batch=max_batch, max_delay=0.002)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(sched.submit(p) for p in prompts))
+    return time.perf_counter() - t0, backend.requests, backend.prompts, sched.stats()
+
+
+async def streams(n=20, rate=50.0):
+    """Seconds for n concurrent streamed replies through a rate-limited scheduler."""
+    import llm_backend
+    from stub_llm import StubClient
+
+    llm_backend.enable_scheduler(max_batch=1, rate=rate, burst=1)
+    llm = StubClient()
+
+    async def one(i):
+        return "".join([c async for c in llm_backend.stream_gemini_async(f"stream {i}", llm=llm)])
+
+    try:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        return time.perf_counter() - t0, llm_backend.SCHEDULER.stats()["streams"]
+    finally:
+        llm_backend.SCHEDULER = None
+
+
+async def priorities(rate=200.0):
+    """Background burst queued first, interactive turns arriving right after."""
+    backend = FakeBatchBackend(overhead=0.005, pool=16)
+    sched = LLMScheduler(backend.dispatch, max_batch=4, max_delay=0.001, rate=rate, burst=4)
+    latencies = {INTERACTIVE: [], BACKGROUND: []}
+
+    async def one(prompt, prio):
+        t0 = time.perf_counter()
+        await sched.submit(prompt, prio)
+        latencies[prio].append(time.perf_counter() - t0)
+
+    bg = [asyncio.create_task(one(f"summary {i}", BACKGROUND)) for i in range(200)]
+    await asyncio.sleep(0.01)
+    fg = [asyncio.create_task(one(f"turn {i}", INTERACTIVE)) for i in range(40)]
+    await asyncio.gather(*bg, *fg)
+    return {p: statistics.median(v) for p, v in latencies.items()}
+
+
+def main():
+    prompts = workload()
+    for label, runner in (("direct", direct), ("scheduled", scheduled)):
+        elapsed, requests, billed, stats = asyncio.run(runner(prompts))
+        print(f"{label:>9}: {elapsed * 1e3:7.0f} ms, {requests:4d} backend requests, {billed:4d} prompts billed")
+        if stats:
+            print(f"           {stats}")
+
+    med = asyncio.run(priorities())
+    print(f"rate-limited median latency: interactive {med[INTERACTIVE] * 1e3:.0f} ms, "
+          f"background {med[BACKGROUND] * 1e3:.0f} ms")
+
+    elapsed, started = asyncio.run(streams())
+    print(f"20 streams at 50/s: {elapsed * 1e3:.0f} ms, {started} admitted by the rate limit")
+    assert started == 20 and elapsed >= 19 / 50 * 0.9, "streams bypass the rate limit"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# ============================================
+# bench_session_memory.py
+# Memory cost of hosting many sessions in one process:
+# - bytes per idle session.GameSession (tracemalloc)
+# - bytes per session after a short scripted game
+#
+# Run from the repo root:
+#   python benchmarks/bench_session_memory.py [sessions]
+# ============================================
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from headless import HeadlessSession, StubBackend  # noqa: E402
+from session import GameSession  # noqa: E402
+
+SCRIPT = [
+    {"suspect": "Rohit", "message": "Where were you at 11:10?"},
+    {"suspect": "Kabir", "message": "What time did you leave the clinic?"},
+    {"investigate": "laptop"},
+]
+
+
+def measure(build, count: int) -> float:
+    """Average traced bytes per object built by `build(i)`."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    keep = [build(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del keep
+    return used / count
+
+
+def played(i):
+    h = HeadlessSession(backend, session_id=f"s{i}")
+    h.run(SCRIPT)
+    return h.state
+
+
+backend = StubBackend()
+
+
+def main(count: int = 10_000):
+    idle = measure(lambda i: GameSession(f"s{i}", announce=False), count)
+    busy = measure(played, count)
+    print(f"idle session   : {idle:8.0f} bytes")
+    print(f"after 3 steps  : {busy:8.0f} bytes (notes dominate)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
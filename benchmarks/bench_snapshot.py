@@ -0,0 +1,120 @@
+# ============================================
+# bench_snapshot.py
+# Session snapshots (snapshot.py):
+# - bytes per session: one session per snapshot vs. a bulk file with a
+#   shared string table, compressed and not
+# - checkpoint latency: snapshot.save() of one session after a turn
+# - bulk write / read of every session
+# - checks: round trip, and notes taken after a restore sort after the
+#   restored ones
+# Sessions are seeded random games (areas examined, interrogation turns
+# with corpus replies run through detect_notes), so the same count gives
+# the same data on every machine.
+#
+# Run from the repo root:
+#   python benchmarks/bench_snapshot.py [sessions]   (default 3,000: seconds)
+#   python benchmarks/bench_snapshot.py --large      (100,000: a server's
+#                                                     worth, takes minutes)
+# ============================================
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import snapshot  # noqa: E402
+from corpora import player_messages, suspect_replies  # noqa: E402
+from investigation_engine import area_names, examine  # noqa: E402
+from notes_engine import add_note, detect_notes  # noqa: E402
+from session import GameSession  # noqa: E402
+
+MESSAGES = player_messages(2000)
+REPLIES = suspect_replies(2000)
+CHECKPOINTS = 2000
+SESSIONS = 3_000
+LARGE = 100_000
+
+
+def played(i: int, rng: random.Random) -> GameSession:
+    session = GameSession(f"s{i:06d}", announce=False)
+    suspects = list(session.suspects)
+    for area in rng.sample(area_names(session), rng.randint(1, 5)):
+        examine(area, session)
+    for suspect in rng.sample(suspects, rng.randint(1, len(suspects))):
+        for _ in range(rng.randint(1, 6)):
+            message, reply = rng.choice(MESSAGES), rng.choice(REPLIES)
+            session.memory(suspect).add(message, reply)
+            session.usage.record_turn(suspect, message * 20, reply)
+            detect_notes(suspect, reply, session=session)
+        session.tiers[suspect] = rng.randint(0, 3)
+    return session
+
+
+def state(s: GameSession) -> tuple:
+    """Everything a restore must bring back, for the round-trip check."""
+    return (
+        s.session_id, dict(s.tiers), s.notes, sorted(s.evidence.examined), dict(s.unlocked),
+        {k: (list(m.recent), m.summary, m.turns) for k, m in s.memories.items()}, s.usage.report(),
+    )
+
+
+def percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def main(count: int = SESSIONS):
+    rng = random.Random(5)
+    t0 = time.perf_counter()
+    sessions = [played(i, rng) for i in range(count)]
+    notes = sum(len(s.notes) for s in sessions)
+    print(f"{count:,} sessions, {notes / count:.1f} notes each (built in {time.perf_counter() - t0:.1f}s)\n")
+
+    sample = sessions[:: max(1, count // CHECKPOINTS)]
+    for s in sample[:200]:
+        assert state(snapshot.loads(snapshot.dumps(s))) == state(s)
+    # A snapshot from a host whose clock is ahead: new notes still sort last.
+    ahead = sessions[0].notes[0]
+    ahead.ts += 3600 * 10**6
+    restored = snapshot.loads(snapshot.dumps(sessions[0]))
+    ahead.ts -= 3600 * 10**6
+    add_note("A note taken after the restore.", "Timeline", restored)
+    assert restored.notes[-1].ts > max(n.ts for n in restored.notes[:-1])
+
+    print(f"{'bytes/session':<34}{'raw':>10}{'zlib':>10}")
+    single = [sum(len(snapshot.dumps(s, compress=c)) for s in sample) / len(sample) for c in (False, True)]
+    print(f"{'one session per snapshot':<34}{single[0]:>10.0f}{single[1]:>10.0f}")
+    bulk = [len(snapshot.dumps_many(sessions, compress=c)) / count for c in (False, True)]
+    print(f"{'bulk file (shared string table)':<34}{bulk[0]:>10.0f}{bulk[1]:>10.0f}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        latencies = []
+        for s in sample:
+            path = os.path.join(tmp, f"{s.session_id}.snap")
+            t0 = time.perf_counter()
+            snapshot.save(s, path)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+        print(f"checkpoint (save one session): median {statistics.median(latencies):.0f} µs, "
+              f"p99 {percentile(latencies, 0.99):.0f} µs")
+
+        path = os.path.join(tmp, "all.snap")
+        t0 = time.perf_counter()
+        snapshot.save_many(sessions, path)
+        write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        restored = snapshot.load_many(path)
+        read = time.perf_counter() - t0
+
+    assert len(restored) == count and state(restored[-1]) == state(sessions[-1])
+    print(f"bulk write: {write:6.2f} s ({write / count * 1e6:5.1f} µs/session)")
+    print(f"bulk read : {read:6.2f} s ({read / count * 1e6:5.1f} µs/session, rebuilds the note indexes)")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else None
+    main(LARGE if arg == "--large" else int(arg) if arg else SESSIONS)
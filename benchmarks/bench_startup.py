@@ -0,0 +1,75 @@
+# ============================================
+# bench_startup.py
+# Startup cost of the console game:
+# - `python -X importtime -c "import game"`: slowest imports
+# - time-to-menu: launch game.py, reach the menu, quit (no network)
+#
+# Run from the repo root:
+#   python benchmarks/bench_startup.py
+# ============================================
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Launch -> menu -> quit, without any LLM call, must stay under this.
+TIME_TO_MENU_TARGET_MS = 150
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(top: int = 10):
+    """Returns (total_us, [(cumulative_us, module)]) for `import game`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import game"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if not m:
+            continue
+        cumulative, indent, module = int(m.group(2)), len(m.group(3)), m.group(4)
+        rows.append((cumulative, module))
+        if indent == 1:  # top-level imports
+            total += cumulative
+    rows.sort(reverse=True)
+    return total, rows[:top]
+
+
+def time_to_menu(runs: int = 10) -> float:
+    """Median ms to start game.py, print the menu and quit via option 5."""
+    env = {k: v for k, v in os.environ.items() if k != "GOOGLE_API_KEY"}
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "game.py"], cwd=ROOT, env=env,
+            input="5\n", capture_output=True, text=True,
+        )
+        samples.append((time.perf_counter() - t0) * 1e3)
+        assert "Choose an option" in proc.stdout, proc.stderr
+    return statistics.median(samples)
+
+
+def main():
+    total, rows = import_profile()
+    print(f"import game: {total / 1e3:.1f} ms (self+children of top-level imports)")
+    for cumulative, module in rows:
+        print(f"  {cumulative / 1e3:8.1f} ms  {module}")
+
+    ttm = time_to_menu()
+    status = "OK" if ttm <= TIME_TO_MENU_TARGET_MS else "OVER TARGET"
+    print(f"time-to-menu: {ttm:.0f} ms (target {TIME_TO_MENU_TARGET_MS} ms) {status}")
+    return 0 if status == "OK" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# ============================================
+# bench_streaming.py
+# Time-to-first-character for a suspect reply:
+# - buffered reply (call_gemini_async) vs streamed (stream_gemini_async)
+# - uses stub_llm.StubClient with first-token and per-chunk delays
+#
+# Run from the repo root:
+#   python benchmarks/bench_streaming.py
+# ============================================
+
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["RESPONSE_CACHE"] = "0"  # time the stub round trips, not cache hits
+
+import game  # noqa: E402
+from stub_llm import StubClient  # noqa: E402
+
+QUESTION = "Where were you at 11:15?"
+
+
+class FirstReplyCharClock:
+    """stdout sink that records when the suspect's reply text starts."""
+
+    def __init__(self, name: str):
+        self.prefix = f"{name}: "
+        self.buffer = ""
+        self.first_char_at = None
+
+    def write(self, s: str):
+        self.buffer += s
+        if self.first_char_at is None:
+            start = self.buffer.find(self.prefix)
+            if start != -1 and len(self.buffer) > start + len(self.prefix):
+                self.first_char_at = time.perf_counter()
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+def measure(llm, stream_source) -> tuple:
+    clock = FirstReplyCharClock("Rohit")
+    with contextlib.redirect_stdout(clock):
+        t0 = time.perf_counter()
+        asyncio.run(game.ask_suspect_async("Rohit", QUESTION, llm=llm, echo=True, stream_source=stream_source))
+        done = time.perf_counter()
+    return clock.first_char_at - t0, done - t0
+
+
+def main():
+    llm = StubClient(latency=0.15, chunk_delay=0.04)
+    for label, source in (("buffered", None), ("streamed", game.stream_gemini_async)):
+        first, total = measure(llm, source)
+        print(f"{label:9}: first char {first * 1e3:6.0f} ms, full reply {total * 1e3:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
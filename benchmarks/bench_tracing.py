@@ -0,0 +1,105 @@
+# ============================================
+# bench_tracing.py
+# Cost of the tracing layer on one interrogation turn (stub LLM):
+# - baseline: the same stages with no instrumentation at all
+# - disabled: instrumented pipeline, tracing off (the default)
+# - enabled:  spans + counters collected in memory
+# - jsonl:    enabled, every span also written to a JSONL file
+# Plus the bare cost of one disabled span.
+#
+# Run from the repo root:
+#   python benchmarks/bench_tracing.py
+# ============================================
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["RESPONSE_CACHE"] = "0"
+
+import notes_engine  # noqa: E402
+import tracing  # noqa: E402
+from behavior_engine import build_prompt, detect_confrontation, update_emotional_tier  # noqa: E402
+from headless import HeadlessSession, StubBackend  # noqa: E402
+
+TURNS = 2000
+ROUNDS = 5
+MESSAGES = [
+    ("Rohit", "Where were you at 11:10?"),
+    ("Kabir", "Explain the footprints near the desk."),
+    ("Nisha", "Earlier you said you were home."),
+    ("Rohit", "You killed him."),
+]
+
+
+def plain_turn(session, suspect, message):
+    """HeadlessSession.ask's stages with no tracing calls."""
+    state = session.state
+    tiers = state.tiers
+    ct = detect_confrontation(message)
+    tiers[suspect] = update_emotional_tier(suspect, tiers[suspect])
+    memory = state.memory(suspect)
+    prompt = build_prompt(suspect, tiers[suspect], ct, message, memory)
+    reply = session.backend.reply(prompt, suspect, tiers[suspect], state.usage)
+    memory.add(message, reply)
+    state.usage.record_turn(suspect, prompt, reply)
+    notes_engine.fired_rules(reply)
+    notes_engine.detect_notes(suspect, reply, session=state)
+
+
+def traced_turn(session, suspect, message):
+    session.ask(suspect, message)
+
+
+def per_turn_us(turn) -> float:
+    """Best of ROUNDS, µs per turn; fresh session each round."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        session = HeadlessSession(StubBackend())
+        t0 = time.perf_counter()
+        for i in range(TURNS):
+            suspect, message = MESSAGES[i % len(MESSAGES)]
+            turn(session, suspect, message)
+        best = min(best, (time.perf_counter() - t0) / TURNS * 1e6)
+    return best
+
+
+def noop_span_ns(n=1_000_000) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with tracing.span("x"):
+            pass
+    spans = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        pass
+    empty = time.perf_counter() - t0
+    return (spans - empty) / n * 1e9
+
+
+def main():
+    tracing.disable()
+    baseline = per_turn_us(plain_turn)
+    disabled = per_turn_us(traced_turn)
+
+    tracing.enable()
+    enabled = per_turn_us(traced_turn)
+    tracing.disable()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracing.enable(os.path.join(tmp, "spans.jsonl"))
+        jsonl = per_turn_us(traced_turn)
+        tracing.disable()
+    tracing.reset()
+
+    print(f"{'baseline':>9}: {baseline:7.1f} µs/turn")
+    for label, value in (("disabled", disabled), ("enabled", enabled), ("jsonl", jsonl)):
+        print(f"{label:>9}: {value:7.1f} µs/turn  ({(value - baseline) / baseline:+.1%})")
+    print(f"one disabled span: {noop_span_ns():.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ============================================
+# bench_transcript_log.py
+# Transcript log (transcript_log.py):
+# - append throughput and bytes per turn
+# - full memory-mapped scan of every turn
+# - indexed reads of one session / one (session, suspect)
+# - opening the log again (sealed indexes vs. rescanning)
+# - replay: detect_notes over every logged reply
+# - peak RSS after each stage, to show reads stay out of RAM (mapped
+#   segment pages count toward RSS but are page cache, not heap)
+# Turns are seeded corpus messages and replies, so the same count gives
+# the same log on every machine.
+#
+# Run from the repo root:
+#   python benchmarks/bench_transcript_log.py [turns]
+# ============================================
+
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import transcript_log  # noqa: E402
+from behavior_engine import detect_confrontation  # noqa: E402
+from corpora import player_messages, suspect_replies  # noqa: E402
+from notes_engine import fired_rules  # noqa: E402
+from transcript_log import TranscriptLog, Turn  # noqa: E402
+
+MESSAGES = player_messages(2000)
+REPLIES = suspect_replies(2000)
+SUSPECTS = ("Nisha", "Rohit", "Kabir")
+TURNS_PER_SESSION = 20
+LOOKUPS = 1000
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def turns(count: int):
+    rng = random.Random(22)
+    # Rules and CTs per distinct text, so generation is not what is timed.
+    fired = {r: tuple(sorted(fired_rules(r))) for r in REPLIES}
+    cts = {m: detect_confrontation(m) for m in MESSAGES}
+    for i in range(count):
+        message, reply = rng.choice(MESSAGES), rng.choice(REPLIES)
+        yield Turn(
+            f"s{i // TURNS_PER_SESSION:07d}", rng.choice(SUSPECTS), "", rng.randint(0, 3), cts[message],
+            transcript_log.prompt_hash(message), message, reply, fired[reply], 0.2, 800.0, 1.7e9 + i,
+        )
+
+
+def timed(label: str, fn, count: int):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<30}{elapsed:8.2f} s  {count / elapsed:>12,.0f} turns/s   peak RSS {peak_rss_mb():7.1f} MB")
+    return result
+
+
+def main(count: int = 1_000_000):
+    sessions = max(1, count // TURNS_PER_SESSION)
+    print(f"{count:,} turns in {sessions:,} sessions (peak RSS at start {peak_rss_mb():.1f} MB)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = TranscriptLog(tmp, flush=False)
+
+        def write():
+            for turn in turns(count):
+                log.append(turn)
+            log.close()
+
+        timed("append (buffered)", write, count)
+        size = sum(p.stat().st_size for p in log.segments())
+        print(f"{'':<30}{size / count:8.0f} bytes/turn in {len(log.segments())} segments")
+
+        log = TranscriptLog(tmp)
+        timed("open + session index", lambda: len(log.sessions()), count)
+        scanned = timed("full scan (mmap)", lambda: sum(1 for _ in log.turns()), count)
+        assert scanned == count
+
+        rng = random.Random(1)
+        picks = [f"s{rng.randrange(sessions):07d}" for _ in range(LOOKUPS)]
+        for label, suspect in (("one session", None), ("one session + suspect", "Rohit")):
+            latencies = []
+            for sid in picks:
+                t0 = time.perf_counter()
+                found = list(log.turns(sid, suspect))
+                latencies.append((time.perf_counter() - t0) * 1e6)
+                assert all(t.session_id == sid for t in found)
+            print(f"{'indexed read, ' + label:<36}median {statistics.median(latencies):7.0f} µs")
+
+        replayed = timed("replay (detect_notes)", lambda: transcript_log.replay(log), count)
+        assert replayed["turns"] == count and replayed["changed"] == 0
+        log.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,109 @@
+# ============================================
+# corpora.py
+# Deterministic benchmark corpora (seeded, no network, no files):
+# - player messages: neutral questions mixed with every confrontation type
+# - suspect replies: filler with clue phrases sprinkled in
+# - scripted turns: (suspect, message) pairs for full-turn runs
+#
+# The same seed gives the same corpus on every machine, so timings from
+# benchmarks/suite.py are comparable against a stored baseline.
+# ============================================
+
+import random
+
+SUSPECTS = ("Nisha", "Rohit", "Kabir")
+
+NEUTRAL_QUESTIONS = [
+    "Tell me about your relationship with Arjun.",
+    "How long have you worked at Silverline Hospital?",
+    "What did you have for dinner that night?",
+    "Did Arjun have any enemies?",
+    "How would you describe him as a colleague?",
+    "Is there anything else you want to tell me?",
+    "Who else visits the clinic regularly?",
+    "What were you doing earlier that evening?",
+]
+
+CONFRONTATIONS = [
+    "Where were you at 11:{minute:02d}?",
+    "Your timeline doesn't hold up.",
+    "What time did you leave the ward?",
+    "We found your footprint near the desk.",
+    "The laptop was accessed at 11:14.",
+    "Explain the CCTV outage.",
+    "The USB drive is still missing.",
+    "How do you know the camera was down?",
+    "Only the killer would know that.",
+    "Earlier you said you went home.",
+    "You're changing your story again.",
+    "You killed him.",
+    "You did it, didn't you?",
+]
+
+FILLER = [
+    "I don't know what you want me to say.",
+    "He was a good man, whatever people think.",
+    "The hospital has been under a lot of pressure lately.",
+    "I just want to go home, detective.",
+    "I've told the officers everything already.",
+    "Nobody tells me anything in that place.",
+    "It was an ordinary night until the phone rang.",
+]
+
+CLUE_PHRASES = [
+    "I was at home at 11:{minute:02d}, I swear.",
+    "I went back to the clinic around 11:{minute:02d}.",
+    "I found his body on the floor.",
+    "The CCTV was down that night.",
+    "Someone logged in on his laptop.",
+    "I don't know anything about a USB drive.",
+    "That's not what I said, you misunderstood me.",
+    "I panicked when I saw the blood.",
+    "We argued about the audit.",
+    "He threatened to ruin me.",
+]
+
+
+def _fill(rng, template: str) -> str:
+    return template.format(minute=rng.randrange(60))
+
+
+def player_messages(n: int = 5000, seed: int = 17, confrontation_rate: float = 0.6) -> list:
+    """Player questions; about `confrontation_rate` of them trigger a CT."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        if rng.random() < confrontation_rate:
+            msg = _fill(rng, rng.choice(CONFRONTATIONS))
+            if rng.random() < 0.3:
+                msg = rng.choice(NEUTRAL_QUESTIONS) + " " + msg
+        else:
+            msg = rng.choice(NEUTRAL_QUESTIONS)
+        out.append(msg)
+    return out
+
+
+def suspect_replies(n: int = 5000, seed: int = 23, clue_rate: float = 0.4, sentences: int = 4) -> list:
+    """2–5 sentence replies; each sentence is a clue phrase with probability clue_rate."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(2, sentences + 1)):
+            pool = CLUE_PHRASES if rng.random() < clue_rate else FILLER
+            parts.append(_fill(rng, rng.choice(pool)))
+        out.append(" ".join(parts))
+    return out
+
+
+def scripted_turns(n: int = 500, seed: int = 31) -> list:
+    """(suspect, message) pairs, as a headless script would send them."""
+    rng = random.Random(seed)
+    messages = player_messages(n, seed=seed)
+    return [(rng.choice(SUSPECTS), msg) for msg in messages]
+
+
+def note_texts(n: int = 50_000, seed: int = 41) -> list:
+    """Distinct note texts, for growing a notebook."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUSPECTS)} mentioned detail #{i} ({_fill(rng, rng.choice(CLUE_PHRASES))})" for i in range(n)]
@@ -0,0 +1,171 @@
+# ============================================
+# load_test.py
+# Load test for server.py:
+# - N concurrent virtual players, each on one keep-alive connection
+# - every player creates a session, interrogates, investigates,
+#   reads notes and accuses (HTTP), plus optional WebSocket streaming
+# - reports p50/p99 latency per action and sessions/second
+#
+# By default it starts an in-process server backed by the stub LLM:
+#   python benchmarks/load_test.py --players 200 --latency 0.05
+# Or point it at a running server:
+#   python benchmarks/load_test.py --url 127.0.0.1:8080
+# ============================================
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RESPONSE_CACHE", "0")
+
+from server import GameServer, serve, ws_frame, ws_read_frame  # noqa: E402
+from stub_llm import StubClient  # noqa: E402
+
+QUESTIONS = [
+    ("Rohit", "Where were you at 11:10?"),
+    ("Kabir", "Why did you go back to the clinic?"),
+    ("Nisha", "Tell me about your marriage."),
+]
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 JSON client."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, method: str, path: str, body: dict = None) -> dict:
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: x\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        status = int(head.split(" ", 2)[1])
+        length = next(int(line.split(":", 1)[1]) for line in head.split("\r\n") if line.lower().startswith("content-length"))
+        payload = json.loads(await self.reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"{method} {path} -> {status}: {payload}")
+        return payload
+
+    def close(self):
+        self.writer.close()
+
+
+async def ws_interrogate(host, port, session_id: str, suspect: str, message: str):
+    """Streams one interrogation over a WebSocket; returns (first_chunk_s, total_s)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        f"GET /sessions/{session_id}/ws HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\n"
+        f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+    )
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+
+    t0 = time.perf_counter()
+    first = None
+    writer.write(ws_frame(json.dumps({"action": "interrogate", "suspect": suspect, "message": message}).encode(), mask=True))
+    await writer.drain()
+    while True:
+        _, payload = await ws_read_frame(reader)
+        msg = json.loads(payload)
+        if msg["type"] == "chunk" and first is None:
+            first = time.perf_counter() - t0
+        if msg["type"] in ("done", "error"):
+            break
+    total = time.perf_counter() - t0
+    writer.write(ws_frame(b"", opcode=0x8, mask=True))
+    writer.close()
+    return first if first is not None else total, total
+
+
+async def player(host, port, timings, use_ws: bool):
+    conn = await Connection.open(host, port)
+    try:
+        async def timed(label, coro):
+            t0 = time.perf_counter()
+            result = await coro
+            timings[label].append(time.perf_counter() - t0)
+            return result
+
+        sid = (await timed("create", conn.request("POST", "/sessions")))["session_id"]
+        for suspect, message in QUESTIONS:
+            await timed("interrogate", conn.request("POST", f"/sessions/{sid}/interrogate", {"suspect": suspect, "message": message}))
+        await timed("investigate", conn.request("POST", f"/sessions/{sid}/investigate", {"area": "laptop"}))
+        await timed("notes", conn.request("GET", f"/sessions/{sid}/notes"))
+        if use_ws:
+            first, total = await ws_interrogate(host, port, sid, "Rohit", "You killed him.")
+            timings["ws first chunk"].append(first)
+            timings["ws interrogate"].append(total)
+        await timed("accuse", conn.request("POST", f"/sessions/{sid}/accuse", {"suspect": "Rohit"}))
+    finally:
+        conn.close()
+
+
+def pct(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(args):
+    server_task = None
+    if args.url:
+        host, port = args.url.rsplit(":", 1)
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", args.port
+        server = GameServer(llm=StubClient(latency=args.latency, chunk_delay=args.latency / 10), max_inflight=args.max_inflight)
+        server_task = asyncio.create_task(serve(host, port, server))
+        await asyncio.sleep(0.2)
+
+    timings = defaultdict(list)
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def one():
+        async with gate:
+            await player(host, port, timings, not args.no_ws)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.players)))
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.players} sessions in {elapsed:.2f}s -> {args.players / elapsed:,.1f} sessions/s "
+          f"(concurrency {args.concurrency})")
+    print(f"{'action':>16} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, values in timings.items():
+        print(f"{label:>16} {len(values):>7} {pct(values, 0.5) * 1e3:>8.1f} "
+              f"{pct(values, 0.99) * 1e3:>8.1f} {statistics.mean(values) * 1e3:>8.1f}")
+
+    if server_task:
+        server_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game server.")
+    parser.add_argument("--url", help="host:port of a running server (default: start one with the stub LLM)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM first-token latency, seconds")
+    parser.add_argument("--max-inflight", type=int, default=64)
+    parser.add_argument("--no-ws", action="store_true", help="skip the WebSocket streaming step")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# ============================================
+# suite.py
+# Reproducible benchmark suite for the engines and the prompt pipeline:
+# - detect_confrontation over a player-message corpus
+# - detect_notes over a suspect-reply corpus
+# - build_prompt throughput (fresh and with conversation memory)
+# - add_note as the notebook grows
+# - a full headless turn with the stub LLM
+# Compares against a stored baseline and flags regressions.
+#
+# Run from the repo root:
+#   python benchmarks/suite.py                  # compare with baseline.json
+#   python benchmarks/suite.py --save           # record a new baseline
+#   python benchmarks/suite.py --only build_prompt --threshold 0.10
+#
+# Exit status 1 if any benchmark is slower than baseline by more than
+# --threshold. Each round is paired with a fixed calibration loop and
+# compared as a ratio to it, so a baseline from a faster or slower machine
+# (or a busy moment on this one) still compares sensibly.
+# ============================================
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+os.environ["RESPONSE_CACHE"] = "0"
+
+import corpora  # noqa: E402
+import notes_engine  # noqa: E402
+from behavior_engine import build_prompt, detect_confrontation  # noqa: E402
+from conversation_memory import ConversationMemory  # noqa: E402
+from headless import HeadlessSession, StubBackend  # noqa: E402
+from session import GameSession  # noqa: E402
+from suspects import CT_EFFECTS, SUSPECTS  # noqa: E402
+
+BASELINE = HERE / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_ROUNDS = 5
+
+
+def best_of(rounds: int, run) -> tuple:
+    """
+    Runs `run()` (µs/op) `rounds` times, each right after the calibration
+    loop. Returns (fastest µs/op, median µs/op per calibration ms).
+    """
+    raw, normalized = [], []
+    for _ in range(rounds):
+        calibration = bench_calibration()
+        value = run()
+        raw.append(value)
+        normalized.append(value / calibration)
+    return min(raw), statistics.median(normalized)
+
+
+def timed(fn, items) -> float:
+    """µs per item for fn(item) over items."""
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - t0) / len(items) * 1e6
+
+
+# --------------------------------------------
+# Benchmarks (each returns µs per operation)
+# --------------------------------------------
+def bench_calibration() -> float:
+    """Fixed pure-Python workload (ms); used to scale results across machines."""
+    t0 = time.perf_counter()
+    total = 0
+    for i in range(200_000):
+        total += i * i % 7
+    return (time.perf_counter() - t0) * 1e3
+
+
+def bench_detect_confrontation() -> float:
+    return timed(detect_confrontation, MESSAGES)
+
+
+def bench_detect_notes() -> float:
+    session = GameSession(announce=False)
+    names = corpora.SUSPECTS
+    t0 = time.perf_counter()
+    for i, reply in enumerate(REPLIES):
+        notes_engine.detect_notes(names[i % 3], reply, session=session)
+    return (time.perf_counter() - t0) / len(REPLIES) * 1e6
+
+
+def _prompt_args():
+    combos = [(name, tier, ct) for name in SUSPECTS for tier in SUSPECTS[name]["tiers"] for ct in [0, *CT_EFFECTS[name]]]
+    return [(*combos[i % len(combos)], msg) for i, msg in enumerate(MESSAGES[:2000])]
+
+
+def bench_build_prompt() -> float:
+    return timed(lambda args: build_prompt(*args), PROMPT_ARGS)
+
+
+def bench_build_prompt_memory() -> float:
+    memory = ConversationMemory()
+    for msg, reply in zip(MESSAGES[:20], REPLIES[:20]):
+        memory.add(msg, reply)
+    return timed(lambda args: build_prompt(*args, memory), PROMPT_ARGS)
+
+
+def bench_add_note_growth() -> float:
+    """µs per add_note over the last 5k of 50k notes (flat if adds are O(1))."""
+    session = GameSession(announce=False)
+    texts = NOTE_TEXTS
+    for text in texts[:-5000]:
+        notes_engine.add_note(text, "Evidence", session=session)
+    return timed(lambda text: notes_engine.add_note(text, "Evidence", session=session), texts[-5000:])
+
+
+def bench_full_turn() -> float:
+    session = HeadlessSession(StubBackend())
+    return timed(lambda turn: session.ask(*turn), TURNS)
+
+
+BENCHMARKS = {
+    "detect_confrontation": bench_detect_confrontation,
+    "detect_notes": bench_detect_notes,
+    "build_prompt": bench_build_prompt,
+    "build_prompt_memory": bench_build_prompt_memory,
+    "add_note@50k": bench_add_note_growth,
+    "full_turn": bench_full_turn,
+}
+
+MESSAGES = corpora.player_messages()
+REPLIES = corpora.suspect_replies()
+TURNS = corpora.scripted_turns()
+NOTE_TEXTS = corpora.note_texts()
+PROMPT_ARGS = _prompt_args()
+
+
+# --------------------------------------------
+# Baseline handling
+# --------------------------------------------
+def load_baseline(path: Path):
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: dict):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results_us": {name: round(raw, 4) for name, (raw, _) in results.items()},
+        "normalized": {name: round(norm, 6) for name, (_, norm) in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns [(name, µs/op, baseline µs/op or None, relative change or None, regressed)]."""
+    rows = []
+    for name, (raw, norm) in results.items():
+        base_norm = baseline["normalized"].get(name) if baseline else None
+        if base_norm is None:
+            rows.append((name, raw, None, None, False))
+            continue
+        change = norm / base_norm - 1
+        rows.append((name, raw, baseline["results_us"][name], change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    args = parser.parse_args()
+
+    if args.save and args.only:
+        parser.error("--save records the whole suite; drop --only")
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {sorted(unknown)}; choose from {sorted(BENCHMARKS)}")
+
+    # A baseline is kept for a long time: sample it harder than a check run.
+    rounds = args.rounds * 3 if args.save else args.rounds
+    results = {name: best_of(rounds, BENCHMARKS[name]) for name in names}
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    if baseline is None and not args.save:
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+
+    print(f"{'benchmark':<22} {'µs/op':>10} {'baseline':>10} {'change':>8}")
+    regressed = False
+    for name, value, base, change, bad in compare(results, baseline, args.threshold):
+        base_s = f"{base:>10.3f}" if base is not None else f"{'-':>10}"
+        change_s = f"{change:>+8.1%}" if change is not None else f"{'-':>8}"
+        print(f"{name:<22} {value:>10.3f} {base_s} {change_s}" + ("  REGRESSION" if bad else ""))
+        regressed |= bad
+
+    if regressed:
+        print(f"\nSlower than baseline by more than {args.threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+# ============================================
+# case_pack.py
+# Handles:
+# - Case packs: a whole case (template, suspects, tiers, confrontation
+#   patterns and effects, clue rules, evidence graph, menu text) as one
+#   JSON source file (YAML too, if PyYAML is installed)
+# - Validating a pack and compiling it into a precompiled artifact
+# - Loading artifacts lazily, recompiling when the source changed
+# - Checking that cases/clinic.json still matches the built-in case
+# - CLI: compile / check / check-builtin / list
+#
+# Usage:
+#   python case_pack.py compile cases/clinic.json
+#   python case_pack.py check my_case.yaml
+#   python case_pack.py check-builtin                 # clinic.json == built-in tables
+#   python case_pack.py list
+# ============================================
+#
+# The artifact (<source>.casepack next to the source, like a .pyc) is a
+# marshal dump of plain data — no pickle, so loading one never runs code.
+# It holds everything that is expensive to derive from the source: the
+# combined confrontation regex, the clue-rule trie and literal index
+# (rule_engine.build_plan), every suspect's rendered prompt prefix and
+# token count, and the evidence graph (evidence_graph.py), already
+# validated (no unknown areas, no cycles). Regex objects cannot be
+# stored without pickle, so the prebuilt pattern strings are compiled on
+# first use; a pack that is only listed or validated never compiles one.
+#
+# Sessions pick a case with GameSession(case=load_case("clinic")); the
+# engines use the built-in suspects.py / notes_engine / investigation
+# tables when session.case is None.
+
+import marshal
+import os
+import re
+import sys
+from pathlib import Path
+
+from evidence_graph import EvidenceGraph
+
+CASES_DIR = Path(__file__).resolve().parent / "cases"
+SOURCE_SUFFIXES = (".json", ".yaml", ".yml")
+ARTIFACT_SUFFIX = ".casepack"
+
+# Bump when the compiled layout changes; older artifacts are recompiled.
+FORMAT_VERSION = 2
+_MAGIC = b"CASEPACK"
+
+_SUSPECT_FIELDS = ("role", "personality", "public_motive", "hidden_motives", "tiers")
+_AREA_FIELDS = ("title", "label", "clues")
+
+# Loaded packs by resolved source path.
+_LOADED = {}
+
+
+# --------------------------------------------
+# Source files
+# --------------------------------------------
+def load_source(path) -> dict:
+    """Reads a pack source (.json, or .yaml/.yml with PyYAML installed)."""
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".json":
+            import json
+
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError(f"{path.name}: YAML case packs need PyYAML (pip install pyyaml)") from None
+        return yaml.safe_load(f)
+
+
+def _template_text(template) -> str:
+    """Templates may be written as one string or a list of lines."""
+    return "\n".join(template) if isinstance(template, list) else template
+
+
+def validate(source: dict) -> list:
+    """
+    Returns a list of problems with a pack source; empty if it is usable.
+    Raises ValueError if the source is not a mapping at all.
+    """
+    from behavior_engine import DYNAMIC_MARKER
+
+    if not isinstance(source, dict):
+        raise ValueError(f"case pack source must be a mapping, not {type(source).__name__}")
+    problems = []
+    for key in ("id", "title", "template", "suspects", "confrontations", "clue_rules", "evidence"):
+        if key not in source:
+            problems.append(f"missing top-level key {key!r}")
+    if problems:
+        return problems
+    for key, entry in (("suspects", dict), ("confrontations", list), ("evidence", dict)):
+        section = source[key]
+        if not isinstance(section, dict) or not all(isinstance(v, entry) for v in section.values()):
+            problems.append(f"{key!r} must map names to {'mappings' if entry is dict else 'lists'}")
+    if not isinstance(source["clue_rules"], list) or not all(isinstance(r, dict) for r in source["clue_rules"]):
+        problems.append("'clue_rules' must be a list of rules")
+    if problems:
+        return problems
+
+    template = _template_text(source["template"])
+    if DYNAMIC_MARKER not in template:
+        problems.append(f"template has no {DYNAMIC_MARKER!r} line")
+
+    cts = set()
+    for ct, patterns in source["confrontations"].items():
+        if not str(ct).isdigit() or int(ct) == 0:
+            problems.append(f"confrontation type {ct!r} must be a positive integer")
+            continue
+        cts.add(int(ct))
+        for pat in patterns:
+            problems.extend(_check_regex(f"confrontation {ct}", pat))
+
+    suspects = source["suspects"]
+    if not suspects:
+        problems.append("no suspects")
+    if sum(bool(s.get("is_killer")) for s in suspects.values()) != 1:
+        problems.append("exactly one suspect must have is_killer: true")
+    for name, suspect in suspects.items():
+        missing = [f for f in _SUSPECT_FIELDS if f not in suspect]
+        if missing:
+            problems.append(f"suspect {name!r} is missing {missing}")
+        elif not suspect["tiers"]:
+            problems.append(f"suspect {name!r} has no emotional tiers")
+        effects = suspect.get("confrontation_effects", {})
+        for ct in effects:
+            if not str(ct).isdigit() or int(ct) not in cts:
+                problems.append(f"suspect {name!r} has an effect for unknown confrontation {ct!r}")
+        uncovered = sorted(cts - {int(ct) for ct in effects if str(ct).isdigit()})
+        if uncovered:
+            problems.append(f"suspect {name!r} has no confrontation_effects for {uncovered}")
+
+    for i, rule in enumerate(source["clue_rules"]):
+        for key in ("category", "patterns", "note_template"):
+            if key not in rule:
+                problems.append(f"clue rule {i} is missing {key!r}")
+        for pat in rule.get("patterns", ()):
+            problems.extend(_check_regex(f"clue rule {i}", pat))
+
+    evidence = source["evidence"]
+    for area, spec in evidence.items():
+        missing = [f for f in _AREA_FIELDS if f not in spec]
+        if missing:
+            problems.append(f"evidence area {area!r} is missing {missing}")
+    try:
+        graph = EvidenceGraph(_graph_spec(evidence))
+    except ValueError as exc:
+        problems.extend(str(exc).split("\n  ")[1:])
+    else:
+        if not graph.base:
+            problems.append("every evidence area is locked; nothing can be investigated first")
+
+    return problems
+
+
+def _graph_spec(evidence: dict) -> dict:
+    """The evidence_graph.EvidenceGraph spec of a pack's evidence areas."""
+    return {
+        area: {key: spec[key] for key in ("label", "requires", "requires_any", "requires_notes") if key in spec}
+        for area, spec in evidence.items()
+    }
+
+
+def _check_regex(where: str, pattern: str) -> list:
+    try:
+        re.compile(pattern)
+    except re.error as exc:
+        return [f"{where}: bad pattern {pattern!r} ({exc})"]
+    return []
+
+
+# --------------------------------------------
+# The built-in case
+# --------------------------------------------
+# cases/clinic.json is the built-in case (suspects.py, behavior_engine,
+# notes_engine, session / investigation_engine tables) as a pack. The
+# built-in tables stay in code so that importing the game never reads a
+# pack; this check keeps the two from drifting apart.
+BUILTIN_CASE = "clinic"
+
+
+def builtin_differences(source: dict) -> list:
+    """
+    Returns every way a pack source differs from the built-in case's
+    tables; empty if the pack plays the same game.
+    """
+    from behavior_engine import CT_PATTERNS
+    from game import suspect_names
+    from investigation_engine import EVIDENCE_AREAS
+    from notes_engine import CLUE_RULES
+    from session import EVIDENCE_GRAPH, GameSession
+    from suspects import CT_EFFECTS, MASTER_TEMPLATE, SUSPECTS
+
+    problems = []
+    if _template_text(source["template"]) != MASTER_TEMPLATE:
+        problems.append("template differs from suspects.MASTER_TEMPLATE")
+    if {int(ct): list(p) for ct, p in source["confrontations"].items()} != CT_PATTERNS:
+        problems.append("confrontations differ from behavior_engine.CT_PATTERNS")
+
+    suspects = source["suspects"]
+    if list(suspects) != suspect_names():
+        problems.append(f"suspects {list(suspects)} differ from the built-in menu {suspect_names()}")
+    for name, builtin in SUSPECTS.items():
+        suspect = suspects.get(name)
+        if suspect is None:
+            continue
+        for field in ("role", "personality", "public_motive", "hidden_motives", "is_killer"):
+            if suspect.get(field) != builtin[field]:
+                problems.append(f"suspect {name!r}: {field} differs from suspects.SUSPECTS")
+        if list(suspect["tiers"]) != [builtin["tiers"][t] for t in sorted(builtin["tiers"])]:
+            problems.append(f"suspect {name!r}: tiers differ from suspects.SUSPECTS")
+        effects = {int(ct): text for ct, text in suspect.get("confrontation_effects", {}).items()}
+        if effects != CT_EFFECTS[name]:
+            problems.append(f"suspect {name!r}: confrontation_effects differ from suspects.CT_EFFECTS")
+
+    rules = [{key: rule.get(key) for key in ("category", "patterns", "note_template")} for rule in source["clue_rules"]]
+    builtin_rules = [{key: rule[key] for key in ("category", "patterns", "note_template")} for rule in CLUE_RULES]
+    if rules != builtin_rules:
+        problems.append("clue_rules differ from notes_engine.CLUE_RULES")
+
+    evidence = source["evidence"]
+    shape = lambda g: (g.areas, g.labels, g.need, g.on_examine, g.on_examine_any, g.on_note)  # noqa: E731
+    if shape(EvidenceGraph(_graph_spec(evidence))) != shape(EVIDENCE_GRAPH):
+        problems.append("evidence areas / unlocks differ from session.EVIDENCE_GRAPH")
+    for area, check in EVIDENCE_AREAS.items():
+        if area in evidence:
+            session = GameSession(announce=False)
+            check(session)
+            if [tuple(clue) for clue in evidence[area]["clues"]] != [(n.text, n.category) for n in session.notes]:
+                problems.append(f"evidence area {area!r}: clues differ from investigation_engine")
+    return problems
+
+
+# --------------------------------------------
+# Compiler
+# --------------------------------------------
+def compile_source(source: dict) -> dict:
+    """
+    Turns a validated pack source into the artifact's plain data.
+    Raises ValueError listing every problem if the source is invalid.
+    """
+    from behavior_engine import ct_matcher_source, render_static_prefix, split_template
+    from conversation_memory import estimate_tokens
+    from rule_engine import build_plan
+
+    problems = validate(source)
+    if problems:
+        raise ValueError(f"case pack {source.get('id', '?')!r} is invalid:\n  " + "\n  ".join(problems))
+
+    suspects, ct_effects, menu = {}, {}, []
+    for name, spec in source["suspects"].items():
+        tiers = dict(enumerate(spec["tiers"]))
+        suspects[name] = {
+            "role": spec["role"],
+            "personality": spec["personality"],
+            "public_motive": spec["public_motive"],
+            "hidden_motives": spec["hidden_motives"],
+            "is_killer": bool(spec.get("is_killer")),
+            "max_tier": max(tiers),
+            "tiers": tiers,
+        }
+        ct_effects[name] = {int(ct): desc for ct, desc in spec.get("confrontation_effects", {}).items()}
+        menu.append((name, spec.get("full_name", name), spec.get("menu_label", spec["role"])))
+
+    static_template, dynamic_template = split_template(_template_text(source["template"]))
+    prefixes = {name: render_static_prefix(name, suspects, static_template) for name in suspects}
+
+    ct_patterns = {int(ct): list(patterns) for ct, patterns in source["confrontations"].items()}
+    ct_pattern, ct_groups = ct_matcher_source(ct_patterns)
+
+    rules = source["clue_rules"]
+    evidence = {
+        area: {"title": spec["title"], "label": spec["label"], "clues": [tuple(clue) for clue in spec["clues"]]}
+        for area, spec in source["evidence"].items()
+    }
+
+    return {
+        "id": source["id"],
+        "title": source["title"],
+        "brief": list(source.get("brief", ())),
+        "menu": menu,
+        "suspects": suspects,
+        "ct_effects": ct_effects,
+        "prefixes": prefixes,
+        "prefix_tokens": {name: estimate_tokens(p) for name, p in prefixes.items()},
+        "dynamic_template": dynamic_template,
+        "ct_pattern": ct_pattern,
+        "ct_groups": ct_groups,
+        "clue_rules": [
+            {"category": r["category"], "patterns": list(r["patterns"]), "note_template": r["note_template"]}
+            for r in rules
+        ],
+        "clue_plan": build_plan([r["patterns"] for r in rules]),
+        "evidence": evidence,
+        "evidence_graph": _graph_spec(source["evidence"]),
+    }
+
+
+# --------------------------------------------
+# Artifacts
+# --------------------------------------------
+def _stamp(source_path: Path) -> tuple:
+    st = source_path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def write_artifact(data: dict, path, stamp: tuple = (0, 0)):
+    """Writes compiled pack data; `stamp` is the source's (mtime_ns, size)."""
+    payload = marshal.dumps((FORMAT_VERSION, sys.implementation.cache_tag, *stamp, data))
+    tmp = Path(f"{path}.tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + payload)
+    os.replace(tmp, path)
+
+
+def read_artifact(path, stamp: tuple = None):
+    """
+    Compiled pack data from `path`, or None if it is missing, from another
+    format/interpreter, or (when `stamp` is given) older than its source.
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    if not raw.startswith(_MAGIC):
+        return None
+    try:
+        version, tag, mtime_ns, size, data = marshal.loads(raw[len(_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != FORMAT_VERSION or tag != sys.implementation.cache_tag:
+        return None
+    if stamp is not None and (mtime_ns, size) != stamp:
+        return None
+    return data
+
+
+def compile_file(source_path, artifact_path=None) -> Path:
+    """Compiles one pack source; returns the artifact path."""
+    source_path = Path(source_path)
+    artifact_path = Path(artifact_path) if artifact_path else source_path.with_suffix(ARTIFACT_SUFFIX)
+    write_artifact(compile_source(load_source(source_path)), artifact_path, _stamp(source_path))
+    return artifact_path
+
+
+# --------------------------------------------
+# Loaded pack
+# --------------------------------------------
+class CasePack:
+    """
+    One compiled case. Attribute names mirror the built-in module tables
+    (suspects, ct_effects, prefixes, ...) so the engines can take either.
+    Regexes and the evidence graph are built the first time a session
+    needs them.
+    """
+
+    def __init__(self, data: dict):
+        self.case_id = data["id"]
+        self.title = data["title"]
+        self.brief = data["brief"]
+        self.menu = data["menu"]                  # [(name, full name, menu label)]
+        self.suspects = data["suspects"]
+        self.ct_effects = data["ct_effects"]
+        self.prefixes = data["prefixes"]
+        self.prefix_tokens = data["prefix_tokens"]
+        self.dynamic_template = data["dynamic_template"]
+        self.ct_groups = data["ct_groups"]
+        self.lowest_ct = min(self.ct_groups.values())
+        self.clue_rules = data["clue_rules"]
+        self.evidence = data["evidence"]              # area -> title, label, clues
+        self.killer = next(name for name, s in self.suspects.items() if s["is_killer"])
+        self._ct_pattern = data["ct_pattern"]
+        self._clue_plan = data["clue_plan"]
+        self._graph_spec = data["evidence_graph"]
+        self._ct_matcher = None
+        self._clue_engine = None
+        self._evidence_graph = None
+
+    @property
+    def ct_matcher(self):
+        if self._ct_matcher is None:
+            self._ct_matcher = re.compile(self._ct_pattern)
+        return self._ct_matcher
+
+    @property
+    def clue_engine(self):
+        if self._clue_engine is None:
+            from rule_engine import RuleEngine
+
+            self._clue_engine = RuleEngine.from_plan(self._clue_plan)
+        return self._clue_engine
+
+    @property
+    def evidence_graph(self):
+        if self._evidence_graph is None:
+            self._evidence_graph = EvidenceGraph(self._graph_spec)
+        return self._evidence_graph
+
+    def __repr__(self):
+        return f"CasePack({self.case_id!r}, suspects={list(self.suspects)})"
+
+
+def find_source(name_or_path) -> Path:
+    """A pack source by path, or by id under CASES_DIR."""
+    path = Path(name_or_path)
+    if path.suffix in SOURCE_SUFFIXES and path.exists():
+        return path.resolve()
+    for suffix in SOURCE_SUFFIXES:
+        candidate = CASES_DIR / f"{name_or_path}{suffix}"
+        if candidate.exists():
+            return candidate
+    raise ValueError(f"Unknown case {str(name_or_path)!r}; available: {available_cases()}")
+
+
+def load_case(name_or_path) -> CasePack:
+    """
+    Returns the CasePack for a case id (under CASES_DIR) or a source path.
+    Uses the compiled artifact when it is up to date, otherwise compiles
+    the source and (if the directory is writable) saves the artifact.
+    Each pack is loaded once per process.
+    """
+    source_path = find_source(name_or_path)
+    pack = _LOADED.get(source_path)
+    if pack is not None:
+        return pack
+
+    artifact_path = source_path.with_suffix(ARTIFACT_SUFFIX)
+    stamp = _stamp(source_path)
+    data = read_artifact(artifact_path, stamp)
+    if data is None:
+        data = compile_source(load_source(source_path))
+        try:
+            write_artifact(data, artifact_path, stamp)
+        except OSError:
+            pass  # read-only install: keep the compiled data in memory only
+
+    pack = _LOADED[source_path] = CasePack(data)
+    return pack
+
+
+def available_cases() -> list:
+    """Ids of the packs under CASES_DIR."""
+    if not CASES_DIR.is_dir():
+        return []
+    return sorted({p.stem for p in CASES_DIR.iterdir() if p.suffix in SOURCE_SUFFIXES})
+
+
+# --------------------------------------------
+# CLI
+# --------------------------------------------
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile and check case packs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = sub.add_parser("compile", help="compile pack sources to .casepack artifacts")
+    compile_cmd.add_argument("sources", nargs="*", help="pack sources (default: every pack in cases/)")
+    check_cmd = sub.add_parser("check", help="validate pack sources without writing anything")
+    check_cmd.add_argument("sources", nargs="+")
+    builtin_cmd = sub.add_parser("check-builtin", help=f"compare cases/{BUILTIN_CASE}.json with the built-in case")
+    builtin_cmd.add_argument("source", nargs="?", help=f"pack source (default: cases/{BUILTIN_CASE}.json)")
+    sub.add_parser("list", help="list the packs in cases/")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for case_id in available_cases():
+            pack = load_case(case_id)
+            print(f"{case_id:<16} {pack.title}  ({len(pack.suspects)} suspects, {len(pack.evidence)} evidence areas)")
+        return
+    if args.command == "check-builtin":
+        source = args.source or find_source(BUILTIN_CASE)
+        problems = validate(load_source(source)) or builtin_differences(load_source(source))
+        for problem in problems:
+            print(f"{source}: {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"{source}: same as the built-in case")
+        return
+
+    sources = args.sources or [find_source(c) for c in available_cases()]
+    failed = False
+    for source in sources:
+        try:
+            if args.command == "check":
+                problems = validate(load_source(source))
+                if problems:
+                    raise ValueError("\n  ".join(problems))
+                print(f"{source}: ok")
+            else:
+                print(f"{source} -> {compile_file(source)}")
+        except (OSError, ValueError, RuntimeError) as exc:
+            print(f"{source}: {exc}", file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
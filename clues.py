@@ -1,21 +1,274 @@
 # clues.py
+#
+# Compact note and clue records, shared by every session in a process:
+# - Note: a slotted notes_engine note (text, category / source codes,
+#   timestamp)
+# - NoteCatalog: a session's notes indexed by category, source and time,
+#   with rendered lines cached for paginated views
+# - Clue / Notebook: clues from suspect conversations
+# - ColumnarNotebook: the same notebook stored as parallel columns
+# Repeated strings are stored once: note texts and clue sources are
+# interned, and categories / sources become small integer codes
+# (CATEGORIES / SOURCES). Timestamps are integer microseconds since the
+# epoch, strictly increasing within the process, so notes appended in
+# discovery order are also sorted by time.
 
+import sys
+import time
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 
+# --------------------------------------------
+# Interned codes
+# --------------------------------------------
+class Codebook:
+    """Assigns each distinct name a small integer code, for the life of the process."""
+
+    __slots__ = ("_codes", "names")
+
+    def __init__(self):
+        self._codes = {}
+        self.names = []
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return code
+
+    def find(self, name: str) -> Optional[int]:
+        """The code of an already seen name, or None."""
+        return self._codes.get(name)
+
+    def __len__(self):
+        return len(self.names)
+
+
+# Note / clue categories ("Timeline", "Motive", ...) and sources (the
+# suspect questioned or the area investigated; "" = unknown).
+CATEGORIES = Codebook()
+SOURCES = Codebook()
+
+# Lines per page in paginated notebook views.
+PAGE_SIZE = 20
+
+_last_ts = 0
+
+
+def next_timestamp() -> int:
+    """Wall-clock microseconds since the epoch, never equal to or below the previous one."""
+    global _last_ts
+    ts = time.time_ns() // 1000
+    if ts <= _last_ts:
+        ts = _last_ts + 1
+    _last_ts = ts
+    return ts
+
+
+def advance_timestamps(ts: int):
+    """Makes next_timestamp() return more than ts (e.g. a restored note's)."""
+    global _last_ts
+    if ts > _last_ts:
+        _last_ts = ts
+
+
+# --------------------------------------------
+# Notes (notes_engine)
+# --------------------------------------------
+class Note:
+    """
+    One collected note. `ts` is microseconds since the epoch
+    (next_timestamp()); `source` is the suspect or area it came from.
+    """
+
+    __slots__ = ("text", "code", "src", "ts")
+
+    def __init__(self, text: str, category: str = "General", ts: int = None, source: str = ""):
+        self.text = sys.intern(text)
+        self.code = CATEGORIES.code(category)
+        self.src = SOURCES.code(source)
+        self.ts = next_timestamp() if ts is None else ts
+
+    @property
+    def category(self) -> str:
+        return CATEGORIES.names[self.code]
+
+    @property
+    def source(self) -> str:
+        return SOURCES.names[self.src]
+
+    @property
+    def timestamp(self) -> datetime:
+        """Local time of discovery."""
+        return datetime.fromtimestamp(self.ts / 1e6)
+
+    def __eq__(self, other):
+        if not isinstance(other, Note):
+            return NotImplemented
+        return (self.text, self.code, self.src, self.ts) == (other.text, other.code, other.src, other.ts)
+
+    __hash__ = None  # mutable: merges reword `text`
+
+    def __repr__(self):
+        return f"Note({self.text!r}, {self.category!r}, ts={self.ts}, source={self.source!r})"
+
+
+def page_slice(total: int, page: int = None, per_page: int = None) -> slice:
+    """Rows of 1-based `page` (None = everything); negative pages count from the end."""
+    if page is None:
+        return slice(0, total)
+    per_page = per_page or PAGE_SIZE
+    pages = max(1, -(-total // per_page))
+    if page < 0:
+        page += pages + 1
+    start = (max(1, page) - 1) * per_page
+    return slice(start, start + per_page)
+
+
+def _bisect_ts(positions, ts, value: int) -> int:
+    """First index into `positions` whose timestamp is >= value."""
+    lo, hi = 0, len(positions)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if ts[positions[mid]] < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class NoteCatalog:
+    """
+    Secondary indexes over a session's notes, as positions in
+    session.notes: by category, by source, by (source, category), and
+    the timestamp column (ascending, so time ranges are binary searches).
+    Queries cost O(log n + results). Notes are indexed when the next
+    query or render needs them, not when they are added, so adding a
+    note costs nothing here. Display lines are rendered the first time
+    they are shown and cached; later renders only format the notes added
+    since, and merges re-render only the reworded note.
+
+    notes: the session's note list, which the indexes catch up with.
+    notes_engine tells the catalog about merges (_merge) and clears it
+    with the notes (clear_notes).
+    """
+
+    __slots__ = ("notes", "by_category", "by_source", "by_pair", "ts", "lines")
+
+    def __init__(self, notes: list):
+        self.notes = notes
+        self.by_category = {}  # category code -> array of positions
+        self.by_source = {}    # source code -> array of positions
+        self.by_pair = {}      # (source code, category code) -> array of positions
+        self.ts = array("q")
+        self.lines = []        # "N. [category] text" of the first len(lines) notes
+
+    def _sync(self):
+        """Indexes the notes added since the last query."""
+        notes = self.notes
+        for pos in range(len(self.ts), len(notes)):
+            note = notes[pos]
+            for index, key in ((self.by_category, note.code), (self.by_source, note.src),
+                               (self.by_pair, (note.src, note.code))):
+                positions = index.get(key)
+                if positions is None:
+                    positions = index[key] = array("I")
+                positions.append(pos)
+            self.ts.append(note.ts)
+
+    def changed(self, pos: int, note: Note):
+        """A note's text changed in place (near-duplicate merge)."""
+        if pos < len(self.lines):
+            self.lines[pos] = self._line(pos, note)
+
+    @staticmethod
+    def _line(pos: int, note: Note) -> str:
+        return f"{pos + 1}. [{note.category}] {note.text}"
+
+    def clear(self):
+        self.by_category.clear()
+        self.by_source.clear()
+        self.by_pair.clear()
+        del self.ts[:]
+        self.lines.clear()
+
+    def query(self, category: str = None, source: str = None, since: int = None, until: int = None):
+        """
+        Positions of the notes matching every given filter, in discovery
+        order. since / until bound the timestamp (µs, until exclusive).
+        """
+        self._sync()
+        cat = None if category is None else CATEGORIES.find(category)
+        src = None if source is None else SOURCES.find(source)
+        if (category is not None and cat is None) or (source is not None and src is None):
+            return ()
+        if cat is not None and src is not None:
+            positions = self.by_pair.get((src, cat), ())
+        elif cat is not None:
+            positions = self.by_category.get(cat, ())
+        elif src is not None:
+            positions = self.by_source.get(src, ())
+        else:
+            positions = range(len(self.ts))
+        if since is None and until is None:
+            return positions
+        lo = 0 if since is None else _bisect_ts(positions, self.ts, since)
+        hi = len(positions) if until is None else _bisect_ts(positions, self.ts, until)
+        return positions[lo:hi]
+
+    def render(self, positions=None, page: int = None, per_page: int = None) -> list:
+        """Cached display lines for `positions` (default: every note), one page of them if asked."""
+        self._sync()
+        lines = self.lines
+        for pos in range(len(lines), len(self.ts)):
+            lines.append(self._line(pos, self.notes[pos]))
+        if positions is None:
+            return lines[page_slice(len(lines), page, per_page)]
+        return [lines[p] for p in positions[page_slice(len(positions), page, per_page)]]
+
+    def __len__(self):
+        return len(self.notes)
+
+
+# --------------------------------------------
+# Clues
+# --------------------------------------------
 @dataclass
 class Clue:
     """Represents a single clue extracted from a suspect conversation."""
+    __slots__ = ("id", "source", "summary")
     id: int
     source: str  # e.g. suspect name: "Kabir Rao"
     summary: str  # short, human-readable note
 
+    def __post_init__(self):
+        self.source = sys.intern(self.source)
+
 
 @dataclass
 class Notebook:
     """Stores and formats all clues discovered by the player."""
     clues: List[Clue] = field(default_factory=list)
+    # (source, casefolded summary) -> Clue, kept in sync with `clues`
+    _index: Dict[Tuple[str, str], Clue] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # source -> its clues, and each clue's display line, in `clues` order
+    _by_source: Dict[str, List[Clue]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _lines: List[str] = field(default_factory=list, init=False, repr=False, compare=False)
+    _next_id: int = field(default=1, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for c in self.clues:
+            self._index[(c.source, c.summary.casefold())] = c
+            self._track(c)
+            self._next_id = max(self._next_id, c.id + 1)
+
+    def _track(self, clue: Clue):
+        self._by_source.setdefault(clue.source, []).append(clue)
+        self._lines.append(f"{clue.id}. ({clue.source}) {clue.summary}")
 
     def add_clue(self, source: str, summary: str) -> Optional[Clue]:
         """Add a new clue if it's non-empty and not already present."""
@@ -27,25 +280,132 @@ class Notebook:
             return None
 
         # Avoid duplicates based on (source, summary)
-        for c in self.clues:
-            if c.source == source and c.summary.lower() == summary.lower():
-                # Already have this clue
-                return None
+        key = (source, summary.casefold())
+        if key in self._index:
+            # Already have this clue
+            return None
 
-        clue = Clue(id=len(self.clues) + 1, source=source, summary=summary)
+        clue = Clue(id=self._next_id, source=source, summary=summary)
+        self._next_id += 1
         self.clues.append(clue)
+        self._index[key] = clue
+        self._track(clue)
         return clue
 
+    def by_source(self, source: str) -> List[Clue]:
+        """Clues from `source`, in discovery order."""
+        return list(self._by_source.get(source, ()))
+
     def is_empty(self) -> bool:
         return len(self.clues) == 0
 
-    def format_notes(self) -> str:
-        """Return a nicely formatted notebook view to print in the console."""
+    def format_notes(self, source: str = None, page: int = None, per_page: int = None) -> str:
+        """
+        Return a nicely formatted notebook view to print in the console:
+        every clue, or only `source`'s, or one page of them (see page_slice).
+        """
         if not self.clues:
             return "\n[Notes] You have no clues recorded yet. Keep interrogating.\n"
 
+        if source is None:
+            lines = self._lines[page_slice(len(self._lines), page, per_page)]
+        else:
+            clues = self._by_source.get(source, ())
+            lines = [f"{c.id}. ({c.source}) {c.summary}" for c in clues[page_slice(len(clues), page, per_page)]]
+        return "\n".join(["\n=== Detective Notebook ===", *lines, "==========================\n"])
+
+
+class ColumnarNotebook:
+    """
+    Notebook stored as columns: summaries (interned str), and source /
+    category codes and timestamps in typed arrays. Row i has id i + 1.
+    Rows are indexed by source and category code, so filters cost
+    O(results); clues are built on demand.
+    """
+
+    __slots__ = ("summaries", "sources", "categories", "timestamps", "_seen", "_by_source", "_by_category")
+
+    def __init__(self):
+        self.summaries = []
+        self.sources = array("H")
+        self.categories = array("H")
+        self.timestamps = array("q")
+        self._seen = {}  # source code -> {interned casefolded summary}
+        self._by_source = {}    # source code -> array of rows
+        self._by_category = {}  # category code -> array of rows
+
+    def add_clue(self, source: str, summary: str, category: str = "General") -> Optional[Clue]:
+        """Add a new clue if it's non-empty and not already present."""
+        summary = (summary or "").strip()
+        if not summary:
+            return None
+        src = SOURCES.code(source)
+        key = summary.casefold()
+        seen = self._seen.get(src)
+        if seen is None:
+            seen = self._seen[src] = set()
+        elif key in seen:
+            return None
+        seen.add(sys.intern(key))
+        row = len(self.summaries)
+        cat = CATEGORIES.code(category)
+        self.summaries.append(sys.intern(summary))
+        self.sources.append(src)
+        self.categories.append(cat)
+        self.timestamps.append(next_timestamp())
+        for index, code in ((self._by_source, src), (self._by_category, cat)):
+            rows = index.get(code)
+            if rows is None:
+                rows = index[code] = array("I")
+            rows.append(row)
+        return self.clue(row)
+
+    def clue(self, row: int) -> Clue:
+        return Clue(id=row + 1, source=SOURCES.names[self.sources[row]], summary=self.summaries[row])
+
+    def category(self, row: int) -> str:
+        return CATEGORIES.names[self.categories[row]]
+
+    def rows(self, source: str = None, category: str = None) -> List[int]:
+        """Row numbers matching every given filter, in insertion order."""
+        src = None if source is None else SOURCES.find(source)
+        self._sync()
+        cat = None if category is None else CATEGORIES.find(category)
+        if (source is not None and src is None) or (category is not None and cat is None):
+            return []
+        if cat is None:
+            if src is None:
+                return list(range(len(self.summaries)))
+            return list(self._by_source.get(src, ()))
+        rows = self._by_category.get(cat, ())
+        if src is None:
+            return list(rows)
+        # Walk the shorter list, check the other column.
+        by_source = self._by_source.get(src, ())
+        if len(by_source) < len(rows):
+            categories = self.categories
+            return [i for i in by_source if categories[i] == cat]
+        sources = self.sources
+        return [i for i in rows if sources[i] == src]
+
+    def filter(self, source: str = None, category: str = None) -> List[Clue]:
+        return [self.clue(i) for i in self.rows(source, category)]
+
+    def is_empty(self) -> bool:
+        return not self.summaries
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def format_notes(self, source: str = None, category: str = None, page: int = None, per_page: int = None) -> str:
+        """Return a nicely formatted notebook view (optionally filtered / one page) to print in the console."""
+        if not self.summaries:
+            return "\n[Notes] You have no clues recorded yet. Keep interrogating.\n"
+
+        names = SOURCES.names
+        rows = self.rows(source, category)
         lines = ["\n=== Detective Notebook ==="]
-        for c in self.clues:
-            lines.append(f"{c.id}. ({c.source}) {c.summary}")
+        for i in rows[page_slice(len(rows), page, per_page)]:
+            lines.append(f"{i + 1}. ({names[self.sources[i]]}) {self.summaries[i]}")
         lines.append("==========================\n")
         return "\n".join(lines)
@@ -0,0 +1,654 @@
+# ============================================
+# contradictions.py
+# Handles:
+# - Extracting structured claims from suspect replies (no LLM):
+#   who (the suspect, or "nobody"), present / absent, place, object,
+#   and a time interval ("until 11:00", "around 11:25", "that night")
+# - Extracting facts from investigation findings (times, places,
+#   objects, suspects named in them: "Rohit's credentials")
+# - Indexing claims by suspect and time window, facts by time window
+#   (IntervalIndex: fixed-width buckets, so a check only looks at
+#   claims that can overlap)
+# - Flagging conflicts:
+#   * a suspect in two places at once, or saying X and not X
+#   * an alibi elsewhere while evidence naming the suspect puts
+#     someone at the scene (the 11:14 PM laptop access + Rohit's login)
+#   * denying an object or the scene that evidence ties them to
+#   * "nobody came in" against a timed sighting at the scene
+#     (the 11:12 PM corridor shadow)
+#
+# notes_engine feeds every reply and investigation_engine every finding
+# into the session's ContradictionDetector; new conflicts become
+# "Contradiction" notes. Off by default (a claim extraction per reply
+# roughly doubles detect_notes): CONTRADICTIONS=1, or enable() before
+# play starts.
+#
+# Usage:
+#   python contradictions.py claims "I was in the ward until 11:00 and then I went home."
+#   python contradictions.py log logs/ [--evidence]   # conflicts in a transcript log
+# ============================================
+#
+# Times are minutes after midnight of the day of the murder; hours
+# without am/pm are read as evening / night times (11:14 -> 23:14,
+# 12:10 -> 24:10). Claims without a time cover the whole night.
+
+import os
+import re
+
+ENABLED = os.environ.get("CONTRADICTIONS", "0") == "1"
+
+# The night everything happened in (18:00 - 06:00); untimed claims span it.
+NIGHT_START = 18 * 60
+NIGHT_END = 30 * 60
+
+# Places and objects the extractor recognises (lowercase regexes).
+# SCENE_PLACES are where the murder happened; being there is not an alibi.
+PLACES = {
+    "clinic": r"clinic|his office|his cabin|the scene",
+    "corridor": r"corridor|hallway",
+    "ward": r"ward|icu|emergency",
+    "home": r"home|my (?:house|flat|apartment|place)",
+    "car": r"my car|the car",
+    "parking": r"parking(?: lot)?|car park",
+    "canteen": r"canteen|cafeteria",
+    "admin": r"admin(?:istration)? (?:office|block)",
+}
+SCENE_PLACES = frozenset({"clinic", "corridor"})
+OBJECTS = {
+    "laptop": r"laptop|computer",
+    "usb": r"usb|pen[- ]?drive|flash drive",
+    "mug": r"coffee|mug",
+    "window": r"window",
+    "photo": r"photo|frame|picture",
+    "records": r"records|files",
+    "drawer": r"drawer",
+    "cctv": r"cctv|cameras?",
+}
+
+# Interval widths (minutes) for the different ways of giving a time.
+_EXACT, _HOUR, _APPROX, _OPEN = 5, 15, 10, 60
+BUCKET_MINUTES = 30
+# Intervals longer than this are kept in one list instead of many buckets.
+_SPANNING = 4 * BUCKET_MINUTES
+
+_HOUR_WORDS = {"six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12}
+_T = r"\d{1,2}(?::\d{2})?(?:\s*[ap]\.?m\b\.?)?|six|seven|eight|nine|ten|eleven|twelve|midnight"
+_TIME_RE = re.compile(
+    rf"\b(?:(?P<range>between|from)\s+(?P<a>{_T})(?:\s+o['’]clock)?\s+(?:and|to|till|until)\s+(?P<b>{_T})"
+    rf"|(?:(?P<prep>at|around|about|roughly|approximately|by|until|till|before|after|since|from|past)\s+)?"
+    rf"(?P<t>{_T})(?:\s+o['’]clock)?)"
+)
+_WHOLE_NIGHT_RE = re.compile(r"\b(?:that|all|the whole|last) (?:night|evening)\b")
+_SENTENCE_RE = re.compile(r"[^.!?;]+")
+_CLAUSE_SPLIT_RE = re.compile(r"\s*(,\s*(?:and\s+)?then\b|\band then\b|\bthen\b|\bafter that\b|,|\bbut\b)\s*")
+_SELF_RE = re.compile(r"\b(?:i|we)\b")
+_NOBODY_RE = re.compile(r"\b(?:no ?one|no-one|nobody)\b")
+_NEGATION_RE = re.compile(r"n['’]t\b|\b(?:never|not|no longer)\b")
+_LEAVE_RE = re.compile(r"\b(?:left|leave|leaving)\b")
+# Wishes and plans are not claims about the night ("I just want to go home").
+_WISH_RE = re.compile(r"\b(?:want|wanted|wanna|wish|gonna|going to|will|need to|have to|if)\b|['’]ll\b")
+# A clause starting with one of these is about someone else.
+_OTHER_SUBJECTS = frozenset(("he", "she", "they", "someone", "somebody", "it", "you", "there", "the", "his", "her",
+                             "that", "this", "who"))
+_HANDLE_RE = re.compile(
+    r"\b(?:touch(?:ed)?|use[d]?|open(?:ed)?|log(?:ged)? ?(?:in|on)|access(?:ed)?|took|take|handled?|moved?|hid|"
+    r"hide|plug(?:ged)?|went through|broke|threw)\b"
+)
+# A place right after one of these is not where the speaker was.
+_NOT_THERE = ("near", "past", "outside", "toward", "towards", "from", "of", "about", "behind", "drove")
+_PLACE_RES = {name: re.compile(rf"\b(?:{pattern})") for name, pattern in PLACES.items()}
+_OBJECT_RES = {name: re.compile(rf"\b(?:{pattern})") for name, pattern in OBJECTS.items()}
+_TOPIC_RE = re.compile(rf"\b(?:{'|'.join((*PLACES.values(), *OBJECTS.values()))})")
+
+
+# --------------------------------------------
+# Times
+# --------------------------------------------
+def _minutes(token: str) -> int:
+    """A clock time as minutes after midnight of the murder night."""
+    token = token.strip().rstrip(".")
+    if token == "midnight":
+        return 24 * 60
+    if token in _HOUR_WORDS:
+        hour, minute, ampm = _HOUR_WORDS[token], 0, None
+    else:
+        clock = re.match(r"(\d{1,2})(?::(\d{2}))?\s*([ap])?", token)
+        hour, minute, ampm = int(clock.group(1)), int(clock.group(2) or 0), clock.group(3)
+    if ampm == "p":
+        hour = hour % 12 + 12
+    elif ampm == "a":
+        hour = hour % 12 + (24 if hour % 12 < 6 else 0)
+    elif hour == 12:
+        hour = 24
+    elif hour < 6:
+        hour += 24
+    elif hour < 12:
+        hour += 12
+    return hour * 60 + minute
+
+
+def _is_clock(token: str, prep: str = None) -> bool:
+    """Bare numbers only count as times with a preposition, a colon or am/pm ("two sets" is not a time)."""
+    return bool(prep) or not token[0].isdigit() or ":" in token or token[-1] in "m."
+
+
+def time_interval(text: str):
+    """
+    (start, end, timed) of the first time expression in lowercase text,
+    or None. "that night" spans the whole night.
+    """
+    for m in _TIME_RE.finditer(text):
+        if m.group("range"):
+            a, b = _minutes(m.group("a")), _minutes(m.group("b"))
+            return (a, b, True) if a < b else (b, a, True)
+        token, prep = m.group("t"), m.group("prep")
+        if not _is_clock(token, prep):
+            continue
+        t = _minutes(token)
+        if prep in ("until", "till", "before", "by"):
+            return t - _OPEN, t, True
+        if prep in ("after", "since", "from", "past"):
+            return t, t + _OPEN, True
+        width = _APPROX if prep in ("around", "about", "roughly", "approximately") else (
+            _EXACT if ":" in token else _HOUR
+        )
+        return t - width, t + width, True
+    if _WHOLE_NIGHT_RE.search(text):
+        return NIGHT_START, NIGHT_END, True
+    return None
+
+
+def format_minutes(minutes: int) -> str:
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+# --------------------------------------------
+# Claims and facts
+# --------------------------------------------
+class Claim:
+    """
+    One statement by `suspect`. subject: "self" or "nobody". present:
+    the subject was at `place` / handled `obj` (False = denial or left).
+    [start, end) in minutes; timed is False for claims without a time.
+    """
+
+    __slots__ = ("suspect", "subject", "present", "place", "obj", "start", "end", "timed", "quote")
+
+    def __init__(self, suspect, subject, present, place, obj, start, end, timed, quote):
+        self.suspect = suspect
+        self.subject = subject
+        self.present = present
+        self.place = place
+        self.obj = obj
+        self.start = start
+        self.end = end
+        self.timed = timed
+        self.quote = quote
+
+    def key(self) -> tuple:
+        return (self.suspect, self.subject, self.present, self.place, self.obj, self.start, self.end)
+
+    def __repr__(self):
+        what = self.place or self.obj
+        span = f"{format_minutes(self.start)}-{format_minutes(self.end)}" if self.timed else "untimed"
+        return f"Claim({self.suspect!r}, {self.subject}, {'+' if self.present else '-'}{what}, {span})"
+
+
+class Fact:
+    """One investigation finding with a place, objects and (maybe) a time."""
+
+    __slots__ = ("area", "place", "objects", "start", "end", "timed", "text")
+
+    def __init__(self, area, place, objects, start, end, timed, text):
+        self.area = area
+        self.place = place
+        self.objects = objects
+        self.start = start
+        self.end = end
+        self.timed = timed
+        self.text = text
+
+    def __repr__(self):
+        return f"Fact({self.area!r}, {self.place}, {sorted(self.objects)}, timed={self.timed})"
+
+
+def _place(clause: str, presence: bool = True):
+    """The first place in the clause; with presence, only places the speaker was at."""
+    for name, regex in _PLACE_RES.items():
+        for m in regex.finditer(clause):
+            before = [word for word in clause[:m.start()].split() if word != "the"]
+            if presence and before and before[-1] in _NOT_THERE:
+                continue
+            return name
+    return None
+
+
+def _objects(clause: str) -> list:
+    return [name for name, regex in _OBJECT_RES.items() if regex.search(clause)]
+
+
+def extract_claims(suspect: str, reply: str) -> list:
+    """Claims about where the speaker (or nobody) was and what they handled, and when."""
+    claims = []
+    text = reply.lower()
+    topics = [m.start() for m in _TOPIC_RE.finditer(text)]
+    if not topics:
+        return claims  # no place or object: nothing to claim
+    for m in _SENTENCE_RE.finditer(text):
+        if not any(m.start() <= pos < m.end() for pos in topics):
+            continue
+        lower = m.group()
+        quote = (reply[m.start():m.end()] if len(text) == len(reply) else lower).strip()
+        parts = _CLAUSE_SPLIT_RE.split(lower)
+        previous_end = subject = None
+        sentence_time = False  # not computed yet
+        for i in range(0, len(parts), 2):
+            clause = parts[i]
+            after_then = i > 0 and ("then" in parts[i - 1] or "after that" in parts[i - 1])
+            if _NOBODY_RE.search(clause):
+                subject = "nobody"
+            elif _SELF_RE.search(clause):
+                subject = "self"
+            elif subject is None or not clause or clause.split(None, 1)[0] in _OTHER_SUBJECTS:
+                subject = None
+                continue
+            # else: "I was in the ward and then went home" keeps the subject
+
+            has_topic = _TOPIC_RE.search(clause) is not None
+            span = time_interval(clause) if has_topic or i + 1 < len(parts) else None
+            if span is None and after_then and previous_end is not None:
+                span = (previous_end, previous_end + _OPEN, True)
+            if span is not None:
+                previous_end = span[1]
+            if not has_topic or _WISH_RE.search(clause):
+                continue
+            negated = subject == "nobody" or bool(_NEGATION_RE.search(clause))
+            place = _place(clause)
+
+            if place is not None and span is None:
+                if sentence_time is False:
+                    sentence_time = time_interval(lower)
+                if sentence_time and sentence_time[0] == NIGHT_START:
+                    span = sentence_time  # "I was at home that night, ..."
+            if place is not None and _LEAVE_RE.search(clause):
+                if span is None:
+                    continue
+                # Left X at T: not at X from T on.
+                span = (span[1] if span[1] - span[0] > 2 * _EXACT else (span[0] + span[1]) // 2, NIGHT_END, True)
+                negated = not negated
+            start, end, timed = span if span is not None else (NIGHT_START, NIGHT_END, False)
+
+            if place is not None:
+                claims.append(Claim(suspect, subject, not negated, place, None, start, end, timed, quote))
+            if _HANDLE_RE.search(clause):
+                for obj in _objects(clause):
+                    claims.append(Claim(suspect, subject, not negated, None, obj, start, end, timed, quote))
+    return claims
+
+
+def extract_facts(area: str, texts) -> list:
+    """One Fact per finding of an investigation area (at the clinic unless it names a place)."""
+    facts = []
+    for text in texts:
+        lower = text.lower()
+        span = time_interval(lower)
+        start, end, timed = span if span is not None else (NIGHT_START, NIGHT_END, False)
+        facts.append(Fact(area, _place(lower, presence=False) or "clinic", frozenset(_objects(lower)),
+                          start, end, timed, text))
+    return facts
+
+
+def _linked(texts, suspects) -> frozenset:
+    """Suspects a finding names in the possessive ("traced to Rohit's credentials")."""
+    names = {name.lower(): name for name in suspects}
+    found = set()
+    for text in texts:
+        for m in re.finditer(r"\b(\w+)['’]s\b", text.lower()):
+            if m.group(1) in names:
+                found.add(names[m.group(1)])
+    return frozenset(found)
+
+
+# --------------------------------------------
+# Interval index
+# --------------------------------------------
+class IntervalIndex:
+    """
+    Items with .start / .end (minutes) in fixed-width time buckets. An
+    overlap query visits only the buckets it covers; long intervals (the
+    whole night, untimed claims) sit in one list checked by every query.
+    """
+
+    __slots__ = ("width", "buckets", "spanning", "count")
+
+    def __init__(self, width: int = BUCKET_MINUTES):
+        self.width = width
+        self.buckets = {}
+        self.spanning = []
+        self.count = 0
+
+    def add(self, item):
+        self.count += 1
+        if item.end - item.start > _SPANNING:
+            self.spanning.append(item)
+            return
+        for b in range(item.start // self.width, (item.end - 1) // self.width + 1):
+            bucket = self.buckets.get(b)
+            if bucket is None:
+                bucket = self.buckets[b] = []
+            bucket.append(item)
+
+    def overlapping(self, start: int, end: int):
+        """Items whose interval overlaps [start, end)."""
+        seen = set()
+        if end - start <= _SPANNING:
+            for b in range(start // self.width, (end - 1) // self.width + 1):
+                for item in self.buckets.get(b, ()):
+                    if item.start < end and start < item.end and id(item) not in seen:
+                        seen.add(id(item))
+                        yield item
+        else:
+            for bucket in self.buckets.values():
+                for item in bucket:
+                    if item.start < end and start < item.end and id(item) not in seen:
+                        seen.add(id(item))
+                        yield item
+        for item in self.spanning:
+            if item.start < end and start < item.end:
+                yield item
+
+    def __len__(self):
+        return self.count
+
+
+# --------------------------------------------
+# Conflicts
+# --------------------------------------------
+class Conflict:
+    """kind: "two_places", "self", "alibi", "denial" or "nobody"; other is a Claim or a Fact."""
+
+    __slots__ = ("kind", "suspect", "claim", "other", "text")
+
+    def __init__(self, kind, suspect, claim, other, text):
+        self.kind = kind
+        self.suspect = suspect
+        self.claim = claim
+        self.other = other
+        self.text = text
+
+    def __repr__(self):
+        return f"Conflict({self.kind!r}, {self.suspect!r})"
+
+
+def _topic(claim: Claim) -> str:
+    """What a claim is about; the scene's places count as one."""
+    if claim.obj:
+        return claim.obj
+    return "scene" if claim.place in SCENE_PLACES else claim.place
+
+
+def _compatible(a: str, b: str) -> bool:
+    return a == b or (a in SCENE_PLACES and b in SCENE_PLACES)
+
+
+def _self_conflict(new: Claim, old: Claim):
+    if new.subject != "self" or old.subject != "self":
+        return None
+    if new.place and old.place:
+        if new.present and old.present and new.timed and old.timed and not _compatible(new.place, old.place):
+            return "two_places"
+        if new.present != old.present and _compatible(new.place, old.place):
+            return "self"
+    elif new.obj and new.obj == old.obj and new.present != old.present:
+        return "self"
+    return None
+
+
+def _evidence_conflict(claim: Claim, fact: Fact, linked: frozenset):
+    if claim.subject == "nobody":
+        if fact.timed and (claim.place is None or claim.place in SCENE_PLACES):
+            return "nobody"
+        return None
+    if claim.suspect not in linked:
+        return None
+    if claim.present:
+        if claim.place and claim.place not in SCENE_PLACES and claim.timed and fact.timed:
+            return "alibi"
+        return None
+    if claim.obj and claim.obj in fact.objects:
+        return "denial"
+    if claim.place in SCENE_PLACES and fact.timed:
+        return "denial"
+    return None
+
+
+# (area, findings, suspects) -> (facts, linked suspects). A case's findings
+# are fixed texts, so every session shares the parsed (read-only) facts.
+_FINDINGS = {}
+
+
+class ContradictionDetector:
+    """
+    Per-session claim and evidence store. observe_reply() and
+    observe_evidence() return the conflicts the new input creates, each
+    flagged once.
+
+    suspects: the case's suspect names (to link evidence to suspects).
+    """
+
+    __slots__ = ("suspects", "claims", "topics", "facts", "links", "conflicts", "_claim_keys", "_flagged", "_pending")
+
+    def __init__(self, suspects=()):
+        self.suspects = tuple(suspects)
+        self.claims = {}   # suspect -> IntervalIndex of Claims
+        self.topics = {}   # (suspect, topic) -> Claims, for untimed checks
+        self.facts = IntervalIndex()
+        self.links = {}    # area -> suspects the area's findings name
+        self.conflicts = []
+        self._claim_keys = set()
+        self._flagged = set()
+        # area -> findings restored without checks; turned into facts on first use
+        self._pending = {}
+
+    def clear(self):
+        self.claims.clear()
+        self.topics.clear()
+        self.facts = IntervalIndex()
+        self.links.clear()
+        self.conflicts.clear()
+        self._claim_keys.clear()
+        self._flagged.clear()
+        self._pending.clear()
+
+    def _load_pending(self):
+        pending, self._pending = self._pending, {}
+        for area, texts in pending.items():
+            self._add_facts(area, texts, check=False)
+
+    # ---- checks ----
+    def check(self, claim: Claim):
+        """
+        (kind, other) for every stored claim or fact `claim` conflicts
+        with. Timed claims look up what overlaps in time; untimed ones
+        can only contradict the same place / object, so they look up
+        that topic instead of the whole night.
+        """
+        if self._pending:
+            self._load_pending()
+        if claim.timed:
+            index = self.claims.get(claim.suspect)
+            olds = () if index is None else index.overlapping(claim.start, claim.end)
+        else:
+            olds = self.topics.get((claim.suspect, _topic(claim)), ())
+        for old in olds:
+            kind = _self_conflict(claim, old)
+            if kind:
+                yield kind, old
+        for fact in self.facts.overlapping(claim.start, claim.end):
+            kind = _evidence_conflict(claim, fact, self.links.get(fact.area, frozenset()))
+            if kind:
+                yield kind, fact
+
+    def check_fact(self, fact: Fact):
+        """Stored claims `fact` conflicts with; untimed facts only matter to object denials by linked suspects."""
+        linked = self.links.get(fact.area, frozenset())
+        if fact.timed:
+            claims = (claim for index in self.claims.values() for claim in index.overlapping(fact.start, fact.end))
+        else:
+            claims = (claim for suspect in linked for obj in fact.objects
+                      for claim in self.topics.get((suspect, obj), ()))
+        for claim in claims:
+            kind = _evidence_conflict(claim, fact, linked)
+            if kind:
+                yield kind, claim
+
+    # ---- input ----
+    def add_claims(self, claims, check: bool = True) -> list:
+        """Indexes new claims (repeats are ignored) and returns the conflicts they create."""
+        found = []
+        for claim in claims:
+            key = claim.key()
+            if key in self._claim_keys:
+                continue
+            self._claim_keys.add(key)
+            if check:
+                kinds = set()
+                for kind, other in self.check(claim):
+                    # One note per way a claim contradicts the suspect's own words; every piece of evidence.
+                    if isinstance(other, Claim):
+                        if kind in kinds:
+                            continue
+                        kinds.add(kind)
+                    self._flag(found, kind, claim, other)
+            index = self.claims.get(claim.suspect)
+            if index is None:
+                index = self.claims[claim.suspect] = IntervalIndex()
+            index.add(claim)
+            topic = (claim.suspect, _topic(claim))
+            same = self.topics.get(topic)
+            if same is None:
+                same = self.topics[topic] = []
+            same.append(claim)
+        return found
+
+    def observe_reply(self, suspect: str, reply: str) -> list:
+        return self.add_claims(extract_claims(suspect, reply))
+
+    def observe_evidence(self, area: str, texts, check: bool = True) -> list:
+        """
+        Indexes an investigated area's findings (once per area) and
+        returns the conflicts they create. check=False (restoring a
+        saved game) defers the parsing until the next check.
+        """
+        if area in self.links or area in self._pending:
+            return []
+        if not check:
+            self._pending[area] = list(texts)
+            return []
+        return self._add_facts(area, list(texts), check)
+
+    def _add_facts(self, area: str, texts: list, check: bool) -> list:
+        key = (area, tuple(texts), self.suspects)
+        parsed = _FINDINGS.get(key)
+        if parsed is None:
+            parsed = _FINDINGS[key] = (tuple(extract_facts(area, texts)), _linked(texts, self.suspects))
+        facts, self.links[area] = parsed
+        found = []
+        for fact in facts:
+            self.facts.add(fact)
+            if check:
+                for kind, claim in self.check_fact(fact):
+                    self._flag(found, kind, claim, fact)
+        return found
+
+    # ---- output ----
+    def _flag(self, found: list, kind: str, claim: Claim, other):
+        key = (kind, claim.key(), other.key() if isinstance(other, Claim) else (other.area, other.text))
+        if key in self._flagged:
+            return
+        self._flagged.add(key)
+        conflict = Conflict(kind, claim.suspect, claim, other, _describe(kind, claim, other))
+        self.conflicts.append(conflict)
+        found.append(conflict)
+
+    def export_claims(self) -> list:
+        """Every indexed claim (for snapshots); add_claims(..., check=False) restores them."""
+        return [claim for claims in self.topics.values() for claim in claims]
+
+
+def _short(quote: str, limit: int = 90) -> str:
+    return quote if len(quote) <= limit else quote[:limit - 1].rstrip() + "…"
+
+
+def _describe(kind: str, claim: Claim, other) -> str:
+    said = f'"{_short(claim.quote)}"'
+    if isinstance(other, Claim):
+        if kind == "two_places":
+            return f'{claim.suspect} put themselves in two places at once: {said} vs "{_short(other.quote)}".'
+        return f'{claim.suspect} contradicted themselves: {said} vs "{_short(other.quote)}".'
+    return f"{claim.suspect} said {said}, but evidence shows: {other.text}"
+
+
+# --------------------------------------------
+# On / off
+# --------------------------------------------
+def enable():
+    """Checks replies and findings of every session from now on."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+# --------------------------------------------
+# CLI
+# --------------------------------------------
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Claim extraction and contradiction checks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    claims = sub.add_parser("claims", help="show the claims extracted from a reply")
+    claims.add_argument("reply")
+    claims.add_argument("--suspect", default="Suspect")
+    scan = sub.add_parser("log", help="replay a transcript log and list the conflicts in each session")
+    scan.add_argument("directory")
+    scan.add_argument("--session")
+    scan.add_argument("--evidence", action="store_true",
+                      help="examine every investigation area first (logs hold replies only)")
+    args = parser.parse_args(argv)
+
+    if args.command == "claims":
+        for claim in extract_claims(args.suspect, args.reply):
+            print(claim)
+        return
+
+    import transcript_log
+    from investigation_engine import examine
+
+    enable()
+    log = transcript_log.TranscriptLog(args.directory)
+    total = 0
+    try:
+        ids = None if args.session is None else (args.session,)
+        for session_id, state in transcript_log.replay_sessions(log, ids):
+            pending = list(state.evidence_graph.areas) if args.evidence else []
+            while pending:  # locked areas open once what unlocks them is examined
+                left = [area for area in pending if not examine(area, state)]
+                if len(left) == len(pending):
+                    break
+                pending = left
+            for conflict in state.contradictions.conflicts:
+                total += 1
+                print(f"{session_id}: [{conflict.kind}] {conflict.text}")
+    finally:
+        log.close()
+    print(f"{total:,} conflicts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# ============================================
+# conversation_memory.py
+# Handles:
+# - Per-suspect conversation memory
+#   * ring buffer of the most recent turns, verbatim
+#   * rolling summary of older turns (pluggable summarizer)
+# - Rendering the history into a prompt within a token budget
+# - Rough token estimates for prompt text
+# - Async (LLM) summarizers run as background tasks, off the turn's path
+# ============================================
+
+import inspect
+import re
+from collections import deque
+
+# Upper bound for a whole prompt (prefix + turn + history), in estimated
+# tokens. History gets whatever the rest of the prompt leaves over.
+PROMPT_TOKEN_BUDGET = 1000
+
+# Verbatim turns kept per suspect before older ones are summarized.
+RECENT_TURNS = 4
+
+# Cap on the rolling summary, in estimated tokens.
+SUMMARY_TOKENS = 200
+
+NO_HISTORY = "(This is the first time the detective has questioned you.)"
+
+
+# --------------------------------------------
+# Token estimate
+# --------------------------------------------
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, the usual rule of thumb for Gemini/English."""
+    return (len(text) + 3) // 4
+
+
+# --------------------------------------------
+# Summarizers
+# --------------------------------------------
+# A summarizer is `(summary, turns, max_tokens) -> new summary`: it folds
+# turns that fell out of the ring buffer into the existing summary. It may
+# also be an async function; ConversationMemory then runs it as a
+# background task and shows the waiting turns extractively meanwhile.
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def _clip(text: str, words: int) -> str:
+    parts = text.split()
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
+
+def trim_lines(text: str, max_tokens: int) -> str:
+    """Drops whole lines from the front until `text` fits in max_tokens."""
+    lines = text.splitlines()
+    while lines and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def extractive_summarizer(summary: str, turns: list, max_tokens: int) -> str:
+    """
+    Local, free summarizer: one line per turn with the question and the
+    first sentence of the answer; the oldest lines go first when full.
+    """
+    lines = [summary] if summary else []
+    for player, reply in turns:
+        said = _SENTENCE_RE.split(reply.strip(), 1)[0]
+        lines.append(f'- Asked "{_clip(player, 14)}"; you said "{_clip(said, 24)}"')
+    return trim_lines("\n".join(lines), max_tokens)
+
+
+def llm_summarizer(call=None):
+    """
+    Async summarizer that asks the LLM to compress the history. `call` is
+    an async prompt -> text function (default: llm_backend.call_gemini_async
+    at BACKGROUND priority, so summaries queue behind players' turns).
+    Falls back to extractive_summarizer if the call fails.
+    """
+
+    async def summarize(summary: str, turns: list, max_tokens: int) -> str:
+        nonlocal call
+        if call is None:
+            from llm_backend import call_gemini_async
+            from llm_scheduler import BACKGROUND
+
+            def call(prompt):
+                return call_gemini_async(prompt, priority=BACKGROUND)
+        transcript = "\n".join(f"Detective: {p}\nSuspect: {r}" for p, r in turns)
+        prompt = (
+            "Update this summary of a police interrogation. Keep every claim the "
+            "suspect made about times, places and people. Write in the second "
+            f"person (\"you said ...\"), at most {max_tokens * 3 // 4} words.\n\n"
+            f"Summary so far:\n{summary or '(none)'}\n\nNew exchanges:\n{transcript}\n"
+        )
+        try:
+            text = await call(prompt)
+        except Exception:
+            text = None
+        from resilience import CannedReply
+        if not text or isinstance(text, CannedReply):
+            return extractive_summarizer(summary, turns, max_tokens)
+        return trim_lines(text.strip(), max_tokens)
+
+    return summarize
+
+
+# --------------------------------------------
+# Conversation memory
+# --------------------------------------------
+class ConversationMemory:
+    """
+    What one suspect remembers of the interrogation.
+
+    recent_turns:   verbatim (player, reply) turns kept in the ring buffer
+    summary_tokens: cap on the rolling summary of older turns
+    summarizer:     see "Summarizers" above (default: extractive)
+
+    With an async summarizer, turns leaving the ring buffer wait in
+    `pending` while one background task folds them in (several at a time
+    if they pile up); outside an event loop they are folded extractively.
+    """
+
+    __slots__ = ("recent", "summary", "turns", "summary_tokens", "summarizer", "pending", "_task")
+
+    def __init__(self, recent_turns: int = RECENT_TURNS, summary_tokens: int = SUMMARY_TOKENS, summarizer=None):
+        self.recent = deque(maxlen=recent_turns)
+        self.summary = ""
+        self.turns = 0
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or extractive_summarizer
+        self.pending = []
+        self._task = None
+
+    def add(self, player_message: str, reply: str):
+        """Records a finished turn; the oldest verbatim turn is summarized."""
+        if len(self.recent) == self.recent.maxlen:
+            self._summarize(self.recent[0])
+        self.recent.append((player_message, reply))
+        self.turns += 1
+
+    def _summarize(self, turn: tuple):
+        if not inspect.iscoroutinefunction(self.summarizer):
+            self.summary = self.summarizer(self.summary, [turn], self.summary_tokens)
+            return
+        import asyncio  # only for async summarizers; kept off the game's startup
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.summary = extractive_summarizer(self.summary, [turn], self.summary_tokens)
+            return
+        self.pending.append(turn)
+        if self._task is None:
+            self._task = loop.create_task(self._fold())
+
+    async def _fold(self):
+        """Background task: folds pending turns into the summary until none are left."""
+        import asyncio
+
+        try:
+            while self.pending:
+                turns = list(self.pending)
+                self.summary = await self.summarizer(self.summary, turns, self.summary_tokens)
+                del self.pending[:len(turns)]
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    def current_summary(self) -> str:
+        """The summary including turns still waiting for an async summarizer."""
+        if not self.pending:
+            return self.summary
+        return extractive_summarizer(self.summary, self.pending, self.summary_tokens)
+
+    def clear(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.pending.clear()
+        self.recent.clear()
+        self.summary = ""
+        self.turns = 0
+
+    def render(self, max_tokens: int) -> str:
+        """
+        History text for the prompt, at most max_tokens. The summary gets up
+        to a third of the budget; the newest turns fill the rest (whole turns
+        only, newest first).
+        """
+        if not self.turns:
+            return NO_HISTORY
+        if max_tokens <= 0:
+            return ""
+
+        summary = self.current_summary()
+        summary = trim_lines(summary, max_tokens // 3) if summary else ""
+        used = estimate_tokens(summary) + 8  # + headings
+
+        kept = []
+        for player, reply in reversed(self.recent):
+            turn = f"Detective: {player}\nYou: {reply}"
+            cost = estimate_tokens(turn) + 1
+            if used + cost > max_tokens:
+                break
+            kept.append(turn)
+            used += cost
+
+        parts = []
+        if summary:
+            parts.append("Earlier in the interrogation:\n" + summary)
+        if kept:
+            parts.append("Most recent exchanges:\n" + "\n".join(reversed(kept)))
+        return "\n\n".join(parts)
+
+    def __len__(self):
+        return self.turns
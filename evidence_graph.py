@@ -0,0 +1,173 @@
+# ============================================
+# evidence_graph.py
+# Handles:
+# - Declarative evidence graphs: investigation areas as nodes, unlock
+#   conditions as edges
+#   * requires:       every listed area has been examined
+#   * requires_any:   at least one listed area has been examined
+#   * requires_notes: at least N notes of a category ({"Timeline": 2})
+# - Validation (unknown areas, cycles)
+# - Per-session state with the available set kept up to date
+#   incrementally
+# ============================================
+#
+# How it works:
+# Each locked area counts its unmet conditions (each requires area, the
+# requires_any group as a whole, each requires_notes category). The graph
+# indexes which areas wait on which fact, so examining an area or adding
+# a note only touches the areas that depend on it: the cost of an event is
+# its out-degree, not the size of the case. An area becomes available when
+# its count reaches zero, and availability is a dict lookup.
+
+
+class EvidenceGraph:
+    """
+    Static unlock graph of one case, shared by every session playing it.
+
+    spec: {area: {"label": str, "requires": [...], "requires_any": [...],
+    "requires_notes": {category: count}}} in menu order; areas without
+    conditions are available from the start.
+    """
+
+    def __init__(self, spec: dict):
+        self.areas = list(spec)
+        self.index = {area: i for i, area in enumerate(self.areas)}
+        self.labels = {area: node.get("label", area) for area, node in spec.items()}
+
+        problems = self._check(spec)
+        if problems:
+            raise ValueError("invalid evidence graph:\n  " + "\n  ".join(problems))
+
+        self.need = [0] * len(self.areas)   # unmet conditions per area at game start
+        self.on_examine = {}                # area -> [idx] (requires)
+        self.on_examine_any = {}            # area -> [idx] (requires_any)
+        self.on_note = {}                   # category -> {count: [idx]}
+
+        for area, node in spec.items():
+            idx = self.index[area]
+            for req in node.get("requires", ()):
+                self.on_examine.setdefault(req, []).append(idx)
+                self.need[idx] += 1
+            if node.get("requires_any"):
+                for req in node["requires_any"]:
+                    self.on_examine_any.setdefault(req, []).append(idx)
+                self.need[idx] += 1
+            for category, count in node.get("requires_notes", {}).items():
+                self.on_note.setdefault(category, {}).setdefault(count, []).append(idx)
+                self.need[idx] += 1
+
+        self.locked = tuple(area for area, n in zip(self.areas, self.need) if n)
+        self.base = tuple(area for area, n in zip(self.areas, self.need) if not n)
+
+    def _check(self, spec: dict) -> list:
+        """Unknown prerequisites and cycles."""
+        problems = []
+        edges = {}
+        for area, node in spec.items():
+            deps = [*node.get("requires", ()), *node.get("requires_any", ())]
+            for dep in deps:
+                if dep not in self.index:
+                    problems.append(f"{area!r} requires unknown area {dep!r}")
+            for category, count in node.get("requires_notes", {}).items():
+                if not isinstance(count, int) or count < 1:
+                    problems.append(f"{area!r} needs a positive note count for {category!r}")
+            edges[area] = [dep for dep in deps if dep in self.index]
+        if problems:
+            return problems
+
+        # Kahn's algorithm: whatever cannot be ordered sits on a cycle.
+        waiting = {area: len(deps) for area, deps in edges.items()}
+        dependents = {}
+        for area, deps in edges.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(area)
+        ready = [area for area, n in waiting.items() if n == 0]
+        while ready:
+            for nxt in dependents.get(ready.pop(), ()):
+                waiting[nxt] -= 1
+                if waiting[nxt] == 0:
+                    ready.append(nxt)
+        cyclic = [area for area, n in waiting.items() if n]
+        if cyclic:
+            problems.append(f"unlock conditions form a cycle through {cyclic}")
+        return problems
+
+    def __len__(self):
+        return len(self.areas)
+
+
+class EvidenceState:
+    """
+    One session's progress through an EvidenceGraph.
+
+    unlocked: {locked area: bool}, updated in place (the same dict object
+    for the whole game, so module aliases stay valid).
+    """
+
+    __slots__ = ("graph", "unlocked", "examined", "_remaining", "_any_met", "_note_counts")
+
+    def __init__(self, graph: EvidenceGraph):
+        self.graph = graph
+        self.unlocked = dict.fromkeys(graph.locked, False)
+        self.examined = set()
+        self._remaining = list(graph.need)
+        self._any_met = set()
+        self._note_counts = {}
+
+    def is_available(self, area: str) -> bool:
+        """True if `area` exists and can be investigated now."""
+        if area in self.unlocked:
+            return self.unlocked[area]
+        return area in self.graph.index
+
+    def available(self) -> list:
+        """Unlocked areas in graph (menu) order."""
+        index = self.graph.index
+        return sorted((area for area, on in self.unlocked.items() if on), key=index.__getitem__)
+
+    def _satisfy(self, indices, newly: list):
+        remaining = self._remaining
+        for idx in indices:
+            remaining[idx] -= 1
+            if remaining[idx] == 0:
+                area = self.graph.areas[idx]
+                self.unlocked[area] = True
+                newly.append(area)
+
+    def mark_examined(self, area: str) -> list:
+        """Records an investigation; returns the areas it unlocked."""
+        newly = []
+        if area in self.examined:
+            return newly
+        self.examined.add(area)
+        graph = self.graph
+        self._satisfy(graph.on_examine.get(area, ()), newly)
+        for idx in graph.on_examine_any.get(area, ()):
+            if idx not in self._any_met:
+                self._any_met.add(idx)
+                self._satisfy((idx,), newly)
+        return newly
+
+    def record_note(self, category: str) -> list:
+        """Counts a new note; returns the areas it unlocked."""
+        newly = []
+        thresholds = self.graph.on_note.get(category)
+        if thresholds is None:
+            return newly
+        count = self._note_counts[category] = self._note_counts.get(category, 0) + 1
+        self._satisfy(thresholds.get(count, ()), newly)
+        return newly
+
+    def reset(self):
+        """Back to the start of the case."""
+        self.unlocked.update(dict.fromkeys(self.unlocked, False))
+        self.examined.clear()
+        self._remaining[:] = self.graph.need
+        self._any_met.clear()
+        self._note_counts.clear()
+
+
+def announce_unlocks(graph: EvidenceGraph, areas):
+    """Console notification for newly unlocked areas."""
+    for area in areas:
+        print(f"\n🔓 New discovery unlocked: {graph.labels[area]}!\n")
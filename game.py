@@ -7,133 +7,296 @@
 # - automatic clue extraction
 # - notes system integration
 # - investigation system integration
-# - Gemini LLM calls
+# - Gemini LLM calls via llm_backend (blocking, asyncio, streaming)
+# - broadcast questions to all suspects at once
+# - per-stage tracing spans (opt-in, see tracing.py)
+# - any case pack via --case (see case_pack.py)
+# - opt-in transcript log of every turn (see transcript_log.py)
 # ============================================
 
-import os
-from dotenv import load_dotenv
+import time
 
-from suspects import SUSPECTS
+import tracing
+import transcript_log
 from behavior_engine import detect_confrontation, update_emotional_tier, build_prompt
-from notes_engine import detect_notes, show_notes
+from notes_engine import browse_notes, detect_notes, fired_rules
 from investigation_engine import investigate
+from llm_backend import call_gemini, call_gemini_async, stream_gemini_async  # noqa: F401
+from session import DEFAULT_SESSION
 
-# --------------------------------------------
-# Load API KEY
-# --------------------------------------------
-load_dotenv()
-from google import genai
-client = genai.Client(api_key=os.environ["GOOGLE_API_KEY"])
+# The Gemini client is created lazily by llm_backend on the first call
+# (reads .env / GOOGLE_API_KEY then); nothing here touches the SDK.
+# asyncio is imported inside the functions that need it, here and in
+# llm_backend / resilience / conversation_memory: it is ~50 ms of the
+# ~100 ms time-to-menu (target 150 ms, benchmarks/bench_startup.py), and
+# the menu, notes and investigation never use it. Inside a coroutine the
+# import is a sys.modules lookup.
+
+# Print suspect replies as they are generated instead of all at once.
+STREAM_REPLIES = True
 
 
 # --------------------------------------------
-# Gemini call function
+# Game state (emotional tiers)
 # --------------------------------------------
-def call_gemini(prompt: str) -> str:
-    """Sends the prompt to Gemini and returns text response."""
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=prompt
-    )
-    return response.text
+# Per-player state lives on a session.GameSession; this is the console
+# game's tier table, kept as a module alias.
+suspect_state = DEFAULT_SESSION.tiers
 
 
 # --------------------------------------------
-# Game state (emotional tiers)
+# One interrogation turn (shared by all loops)
 # --------------------------------------------
-suspect_state = {
-    "Nisha": 0,
-    "Kabir": 0,
-    "Rohit": 0
-}
+def prepare_turn(name: str, player_message: str, session=None) -> tuple:
+    """Detects confrontation, escalates the suspect and returns (prompt, ct)."""
+    session = session or DEFAULT_SESSION
+    tiers = session.tiers
+    case = session.case
+
+    # Detect confrontation
+    with tracing.span("detect_confrontation"):
+        ct = detect_confrontation(player_message, case)
+    if tracing.ENABLED:
+        tracing.count("confrontations", ct=ct)
+
+    # Emotional escalation
+    with tracing.span("update_emotional_tier"):
+        tiers[name] = update_emotional_tier(name, tiers[name], case)
+
+    # Build LLM prompt
+    with tracing.span("build_prompt"):
+        prompt = build_prompt(
+            name,
+            emotional_tier=tiers[name],
+            ct=ct,
+            player_message=player_message,
+            memory=session.memory(name),
+            case=case
+        )
+    return prompt, ct
+
+
+def finish_turn(name: str, player_message: str, prompt: str, reply: str, ct: int, session,
+                prepare_ms: float = 0.0, llm_ms: float = 0.0) -> tuple:
+    """
+    Records a finished exchange: memory, token usage, clue notes and the
+    transcript log. The clue rules are scanned once and shared by the
+    notes and the log. Returns (fired rule indices, engine_ms), where
+    engine_ms is prepare_ms plus the time spent here.
+    """
+    t0 = time.perf_counter()
+
+    # Remember the exchange for later turns; account for its tokens
+    session.memory(name).add(player_message, reply)
+    session.usage.record_turn(name, prompt, reply)
+
+    # Auto-detect clues
+    with tracing.span("detect_notes"):
+        fired = sorted(fired_rules(reply, session.case))
+        detect_notes(name, reply, session=session, fired=fired)
+
+    engine_ms = prepare_ms + (time.perf_counter() - t0) * 1e3
+    if transcript_log.ENABLED:
+        transcript_log.log_turn(session, name, player_message, prompt, reply, ct, fired, engine_ms, llm_ms)
+    return fired, engine_ms
+
+
+async def ask_suspect_async(
+    name: str,
+    player_message: str,
+    llm=None,
+    echo: bool = False,
+    stream_source=None,
+    session=None
+) -> str:
+    """
+    Runs one full turn against a suspect and returns the reply.
+    With echo=True the reply is printed before any clue notifications.
+
+    stream_source: optional `(prompt, llm, suspect, tier, usage) -> async
+    iterator of str` (e.g. stream_gemini_async). When given together with
+    echo, text is printed chunk by chunk as it arrives.
+    """
+    session = session or DEFAULT_SESSION
+    with tracing.span("turn", suspect=name):
+        t0 = time.perf_counter()
+        prompt, ct = prepare_turn(name, player_message, session)
+        tier = session.tiers[name]
+        t1 = time.perf_counter()
+
+        # AI reply
+        with tracing.span("llm"):
+            if echo and stream_source is not None:
+                print(f"\n{name}: ", end="", flush=True)
+                parts = []
+                async for chunk in stream_source(prompt, llm, name, tier, session.usage):
+                    print(chunk, end="", flush=True)
+                    parts.append(chunk)
+                print("\n")
+                # Clues are scanned once on the finished reply, not per chunk.
+                reply = "".join(parts)
+            else:
+                reply = await call_gemini_async(prompt, llm=llm, suspect=name, tier=tier, usage=session.usage)
+                if echo:
+                    print(f"\n{name}: {reply}\n")
+        t2 = time.perf_counter()
+
+        finish_turn(name, player_message, prompt, reply, ct, session, (t1 - t0) * 1e3, (t2 - t1) * 1e3)
+
+    return reply
+
+
+async def broadcast_question(player_message: str, names=None, llm=None, session=None) -> dict:
+    """
+    Asks every suspect in `names` (default: all of the case's suspects)
+    the same question concurrently and prints each reply as soon as it
+    arrives. Wall-clock time is the slowest reply, not the sum.
+    Returns {name: reply}.
+    """
+    import asyncio
+
+    names = names or suspect_names(session)
+
+    async def ask(name):
+        return name, await ask_suspect_async(name, player_message, llm=llm, echo=True, session=session)
+
+    replies = {}
+    for finished in asyncio.as_completed([ask(n) for n in names]):
+        name, reply = await finished
+        replies[name] = reply
+
+    return replies
 
 
 # --------------------------------------------
 # Suspect selection
 # --------------------------------------------
-def list_suspects():
+def suspect_names(session=None) -> list:
+    """Suspects in menu order."""
+    case = (session or DEFAULT_SESSION).case
+    if case is None:
+        return ["Nisha", "Rohit", "Kabir"]
+    return [name for name, _, _ in case.menu]
+
+
+def _numbered(names) -> str:
+    return "/".join(str(i) for i in range(1, len(names) + 1))
+
+
+def list_suspects(session=None):
+    case = (session or DEFAULT_SESSION).case
     print("\nSuspects:")
-    print("1. Nisha Mehta – Victim's wife")
-    print("2. Rohit Sharma – Junior doctor")
-    print("3. Kabir Rao – Hospital administrator\n")
+    if case is None:
+        print("1. Nisha Mehta – Victim's wife")
+        print("2. Rohit Sharma – Junior doctor")
+        print("3. Kabir Rao – Hospital administrator\n")
+        return
+    for i, (_, full_name, label) in enumerate(case.menu, start=1):
+        print(f"{i}. {full_name} – {label}")
+    print()
 
 
-def choose_suspect():
+def choose_suspect(session=None):
     """Menu for selecting a suspect to interrogate."""
+    names = suspect_names(session)
     while True:
-        list_suspects()
-        choice = input("Talk to which suspect? (1/2/3, 'n' for notes, 'q' to stop questioning): ").strip().lower()
+        list_suspects(session)
+        choice = input(f"Talk to which suspect? ({_numbered(names)}, 'b' to ask everyone, 'n' for notes, 'q' to stop questioning): ").strip().lower()
 
         if choice == "q":
             return None
 
+        if choice in ["b", "broadcast"]:
+            ask_everyone(session)
+            continue
+
         if choice in ["n", "notes"]:
-            show_notes()
+            browse_notes(session)
             continue
 
-        mapping = {"1": "Nisha", "2": "Rohit", "3": "Kabir"}
+        mapping = {str(i): name for i, name in enumerate(names, start=1)}
         if choice in mapping:
             return mapping[choice]
 
         print("Invalid choice. Try again.\n")
 
 
+# --------------------------------------------
+# Broadcast question
+# --------------------------------------------
+def ask_everyone(session=None):
+    """Asks one question to every suspect at the same time."""
+    player_message = input("\nQuestion for everyone: ").strip()
+    if not player_message:
+        return
+    import asyncio
+
+    try:
+        asyncio.run(broadcast_question(player_message, session=session))
+    except RuntimeError as exc:  # e.g. no API key configured
+        print(f"\n⚠️  {exc}\n")
+
+
 # --------------------------------------------
 # Interrogation loop
 # --------------------------------------------
-def question_suspect(name: str):
-    """Handles full conversation flow with a suspect."""
+async def question_suspect_async(name: str, llm=None, session=None):
+    """Handles full conversation flow with a suspect on the event loop."""
     print(f"\nYou are now talking to {name}.")
     print("Type your questions below.")
     print("Type 'back' to stop. Type 'n' to view notes.\n")
 
+    import asyncio
+
     while True:
-        player_message = input("You: ").strip()
+        # input() blocks, so read it off-loop
+        player_message = (await asyncio.to_thread(input, "You: ")).strip()
 
         # Notes access
         if player_message.lower() in ["n", "notes"]:
-            show_notes()
+            await asyncio.to_thread(browse_notes, session)
             continue
 
         if player_message.lower() == "back":
             print(f"\nLeaving {name}.\n")
             break
 
-        # Detect confrontation
-        ct = detect_confrontation(player_message)
-
-        # Emotional escalation
-        suspect_state[name] = update_emotional_tier(name, suspect_state[name])
-
-        # Build LLM prompt
-        prompt = build_prompt(
+        await ask_suspect_async(
             name,
-            emotional_tier=suspect_state[name],
-            ct=ct,
-            player_message=player_message
+            player_message,
+            llm=llm,
+            echo=True,
+            stream_source=stream_gemini_async if STREAM_REPLIES else None,
+            session=session
         )
 
-        # AI reply
-        reply = call_gemini(prompt)
-        print(f"\n{name}: {reply}\n")
 
-        # Auto-detect clues
-        detect_notes(name, reply)
+def question_suspect(name: str, session=None):
+    """Handles full conversation flow with a suspect."""
+    import asyncio
+
+    try:
+        asyncio.run(question_suspect_async(name, session=session))
+    except RuntimeError as exc:  # e.g. no API key configured
+        print(f"\n⚠️  {exc}\n")
 
 
 # --------------------------------------------
 # Accuse mechanic
 # --------------------------------------------
-def accuse():
+def accuse(session=None):
     """Allows the player to accuse a suspect."""
+    session = session or DEFAULT_SESSION
+    names = suspect_names(session)
+
     print("\nTime to make your accusation!")
     print("Who do you think is the killer?\n")
-    print("1. Nisha")
-    print("2. Rohit")
-    print("3. Kabir\n")
+    for i, name in enumerate(names, start=1):
+        print(f"{i}. {name}")
+    print()
 
-    choice = input("Your accusation (1/2/3): ").strip()
-    mapping = {"1": "Nisha", "2": "Rohit", "3": "Kabir"}
+    choice = input(f"Your accusation ({_numbered(names)}): ").strip()
+    mapping = {str(i): name for i, name in enumerate(names, start=1)}
 
     if choice not in mapping:
         print("Invalid choice. Returning to menu.\n")
@@ -142,7 +305,7 @@ def accuse():
     accused = mapping[choice]
 
     # Identify killer
-    killer = next(s for s in SUSPECTS if SUSPECTS[s]["is_killer"])
+    killer = session.killer
 
     print("\n=== VERDICT ===")
     if accused == killer:
@@ -156,13 +319,21 @@ def accuse():
 # --------------------------------------------
 # Main Game Loop
 # --------------------------------------------
-def main():
+def main(session=None):
     """Main game controller."""
-    print("=== Murder Mystery: The Clinic Case ===\n")
-    print("CASE BRIEF:")
-    print("- Victim: Dr. Arjun Mehta, 42, cardiologist at Silverline Hospital.")
-    print("- Scene: Found dead late at night. Blunt force trauma.")
-    print("- Evidence: Footprints, laptop activity, CCTV outage, missing USB.\n")
+    case = (session or DEFAULT_SESSION).case
+    if case is None:
+        print("=== Murder Mystery: The Clinic Case ===\n")
+        print("CASE BRIEF:")
+        print("- Victim: Dr. Arjun Mehta, 42, cardiologist at Silverline Hospital.")
+        print("- Scene: Found dead late at night. Blunt force trauma.")
+        print("- Evidence: Footprints, laptop activity, CCTV outage, missing USB.\n")
+    else:
+        print(f"=== {case.title} ===\n")
+        print("CASE BRIEF:")
+        for line in case.brief:
+            print(f"- {line}")
+        print()
 
     while True:
         print("Choose an option:")
@@ -175,18 +346,18 @@ def main():
         choice = input("Enter choice: ").strip().lower()
 
         if choice == "1":
-            suspect = choose_suspect()
+            suspect = choose_suspect(session)
             if suspect:
-                question_suspect(suspect)
+                question_suspect(suspect, session)
 
         elif choice in ["2", "n", "notes"]:
-            show_notes()
+            browse_notes(session)
 
         elif choice == "3":
-            investigate()
+            investigate(session)
 
         elif choice == "4":
-            accuse()
+            accuse(session)
             break
 
         elif choice in ["5", "q"]:
@@ -201,4 +372,13 @@ def main():
 # Start game
 # --------------------------------------------
 if __name__ == "__main__":
-    main()
+    import sys
+
+    # python game.py --case <id or pack path>
+    if len(sys.argv) == 3 and sys.argv[1] == "--case":
+        from case_pack import load_case
+        from session import GameSession
+
+        main(GameSession("console", case=load_case(sys.argv[2])))
+    else:
+        main()
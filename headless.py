@@ -0,0 +1,155 @@
+# ============================================
+# headless.py
+# Handles:
+# - Running the interrogation pipeline without input()/print()
+# - Pluggable LLM backends (deterministic stub or Gemini)
+# - Scripted sessions: ask / investigate / accuse steps
+# - Transcript + notes output per session
+# - Any case pack (case_pack.py) in place of the built-in case
+# - Turns appended to the transcript log when it is on (transcript_log.py)
+# ============================================
+
+import time
+
+import investigation_engine
+import tracing
+from game import finish_turn, prepare_turn
+from llm_backend import MODEL, call_gemini
+from session import GameSession
+from stub_llm import StubClient
+
+
+# --------------------------------------------
+# LLM backends
+# --------------------------------------------
+class StubBackend:
+    """Deterministic local replies via stub_llm; optional fixed latency."""
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0):
+        self.client = StubClient(latency=latency)
+
+    def reply(self, prompt: str, suspect: str, tier: int = None, usage=None) -> str:
+        response = self.client.models.generate_content(model=MODEL, contents=prompt)
+        if usage is not None:
+            usage.record_usage(response.usage_metadata)
+        return response.text
+
+
+class GeminiBackend:
+    """Real Gemini calls through llm_backend.call_gemini (needs GOOGLE_API_KEY)."""
+
+    name = "gemini"
+
+    def reply(self, prompt: str, suspect: str, tier: int = None, usage=None) -> str:
+        return call_gemini(prompt, suspect=suspect, tier=tier, usage=usage)
+
+
+BACKENDS = {
+    "stub": StubBackend,
+    "gemini": GeminiBackend,
+}
+
+
+def make_backend(name: str = "stub", **options):
+    """Builds a backend by name ('stub' or 'gemini')."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; choose from {sorted(BACKENDS)}")
+    return BACKENDS[name](**options)
+
+
+# --------------------------------------------
+# Headless session
+# --------------------------------------------
+class HeadlessSession:
+    """
+    One scripted game. Steps are dicts:
+      {"suspect": "Rohit", "message": "Where were you at 11?"}
+      {"investigate": "laptop"}
+      {"accuse": "Rohit"}
+
+    Game state lives on its own silent GameSession, so any number of
+    headless sessions can run side by side in one process.
+    case: a case_pack.CasePack to play instead of the built-in case.
+    """
+
+    def __init__(self, backend, session_id: str = "", case=None):
+        self.backend = backend
+        self.session_id = session_id
+        self.state = GameSession(session_id, announce=False, case=case)
+        self.transcript = []
+        self.verdict = None
+
+    def reset(self):
+        self.state.reset()
+        self.transcript = []
+        self.verdict = None
+
+    # ---- steps ----
+    def ask(self, suspect: str, message: str) -> dict:
+        """One interrogation turn; returns its transcript entry."""
+        with tracing.span("turn", suspect=suspect):
+            t0 = time.perf_counter()
+            prompt, ct = prepare_turn(suspect, message, self.state)
+            tier = self.state.tiers[suspect]
+            t1 = time.perf_counter()
+
+            with tracing.span("llm"):
+                reply = self.backend.reply(prompt, suspect, tier, self.state.usage)
+            t2 = time.perf_counter()
+            fired, engine_ms = finish_turn(
+                suspect, message, prompt, reply, ct, self.state, (t1 - t0) * 1e3, (t2 - t1) * 1e3
+            )
+
+        entry = {
+            "type": "ask",
+            "suspect": suspect,
+            "message": message,
+            "ct": ct,
+            "tier": tier,
+            "reply": reply,
+            "fired_rules": fired,
+            "engine_ms": round(engine_ms, 3),
+            "llm_ms": round((t2 - t1) * 1e3, 3),
+        }
+        self.transcript.append(entry)
+        return entry
+
+    def investigate(self, area: str) -> dict:
+        ok = investigation_engine.examine(area, session=self.state)
+        entry = {"type": "investigate", "area": area, "ok": ok}
+        self.transcript.append(entry)
+        return entry
+
+    def accuse(self, suspect: str) -> dict:
+        self.verdict = {"accused": suspect, "correct": suspect == self.state.killer}
+        entry = {"type": "accuse", **self.verdict}
+        self.transcript.append(entry)
+        return entry
+
+    # ---- whole script ----
+    def run(self, steps) -> dict:
+        """Plays every step from a clean state and returns the session result."""
+        self.reset()
+        t0 = time.perf_counter()
+
+        for step in steps:
+            if "suspect" in step:
+                self.ask(step["suspect"], step["message"])
+            elif "investigate" in step:
+                self.investigate(step["investigate"])
+            elif "accuse" in step:
+                self.accuse(step["accuse"])
+                break
+            else:
+                raise ValueError(f"Unknown step: {step!r}")
+
+        return {
+            "session_id": self.session_id,
+            "transcript": self.transcript,
+            "notes": [{"text": n.text, "category": n.category} for n in self.state.notes],
+            "verdict": self.verdict,
+            "usage": self.state.usage.report(),
+            "elapsed_ms": round((time.perf_counter() - t0) * 1e3, 3),
+        }
@@ -3,18 +3,21 @@
 # Handles:
 # - Evidence investigation system
 # - Discovery of clues
-# - Chain-unlocked discoveries
-# - Integration with notes_engine
+# - Chain-unlocked discoveries (declared in an evidence_graph.EvidenceGraph)
+# - Integration with notes_engine (findings are also checked against
+#   suspects' claims when contradictions.ENABLED)
+# - Evidence areas from case packs (case_pack.py)
+# - Investigation menu generated from the evidence graph
 # ============================================
 
-from notes_engine import add_note
+import contradictions
+from evidence_graph import announce_unlocks
+from notes_engine import add_note, note_contradictions
+from session import DEFAULT_SESSION
 
-# Track unlocked investigation areas
-UNLOCKED = {
-    "drawer": False,
-    "usb_port": False,
-    "corridor_camera": False
-}
+# Investigation progress lives on the GameSession (session.evidence);
+# UNLOCKED is the console game's {locked area: bool}, kept as a module alias.
+UNLOCKED = DEFAULT_SESSION.unlocked
 
 
 # --------------------------------------------
@@ -26,11 +29,37 @@ def print_header(title):
     print("============================================\n")
 
 
+# --------------------------------------------
+# Helpers shared by every check_* function
+# --------------------------------------------
+def _report(session, title, clues, area):
+    """Shows the findings (if the session announces) and records them as notes from `area`."""
+    if session.announce:
+        print_header(title)
+
+    for text, cat in clues:
+        if session.announce:
+            print(f"• {text}")
+        add_note(text, category=cat, session=session, source=area)
+    if contradictions.ENABLED:
+        note_contradictions(session.contradictions.observe_evidence(area, [text for text, _ in clues]), session)
+
+    return clues
+
+
+def _examined(session, area):
+    """Records the investigation; the evidence graph decides what it unlocks."""
+    newly = session.evidence.mark_examined(area)
+    if newly and session.announce:
+        announce_unlocks(session.evidence.graph, newly)
+
+
 # --------------------------------------------
 # Footprints Investigation
 # --------------------------------------------
-def check_footprints():
-    print_header("FOOTPRINT ANALYSIS")
+def check_footprints(session=None):
+    session = session or DEFAULT_SESSION
+    title = "FOOTPRINT ANALYSIS"
 
     clues = [
         ("Two distinct sets of footprints were found — confirming multiple people were present.",
@@ -43,22 +72,16 @@ def check_footprints():
          "Location"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
-
-
-    # Unlock: Window + footprints imply escape route
-    if not UNLOCKED["corridor_camera"]:
-        UNLOCKED["corridor_camera"] = True
-        print("\n🔓 New discovery unlocked: Corridor Camera Check!\n")
+    _report(session, title, clues, "footprints")
+    _examined(session, "footprints")
 
 
 # --------------------------------------------
 # Laptop Investigation
 # --------------------------------------------
-def check_laptop():
-    print_header("LAPTOP INVESTIGATION")
+def check_laptop(session=None):
+    session = session or DEFAULT_SESSION
+    title = "LAPTOP INVESTIGATION"
 
     clues = [
         ("Laptop was last accessed at 11:14 PM — very close to the estimated time of death.",
@@ -71,20 +94,16 @@ def check_laptop():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
-
-    if not UNLOCKED["usb_port"]:
-        UNLOCKED["usb_port"] = True
-        print("\n🔓 New discovery unlocked: USB Port Examination!\n")
+    _report(session, title, clues, "laptop")
+    _examined(session, "laptop")
 
 
 # --------------------------------------------
 # Window Investigation
 # --------------------------------------------
-def check_window():
-    print_header("WINDOW EXAMINATION")
+def check_window(session=None):
+    session = session or DEFAULT_SESSION
+    title = "WINDOW EXAMINATION"
 
     clues = [
         ("The window was open during the estimated time of death.",
@@ -95,18 +114,16 @@ def check_window():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
-
-    # Connection to footprints is purely conceptual in notes; no new unlock.
+    _report(session, title, clues, "window")
+    _examined(session, "window")
 
 
 # --------------------------------------------
 # Coffee Mug Investigation
 # --------------------------------------------
-def check_coffee_mug():
-    print_header("COFFEE MUG ANALYSIS")
+def check_coffee_mug(session=None):
+    session = session or DEFAULT_SESSION
+    title = "COFFEE MUG ANALYSIS"
 
     clues = [
         ("Coffee mug contains black coffee — no milk.",
@@ -117,16 +134,16 @@ def check_coffee_mug():
          "Elimination"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
+    _report(session, title, clues, "coffee_mug")
+    _examined(session, "coffee_mug")
 
 
 # --------------------------------------------
 # Photo Frame Investigation
 # --------------------------------------------
-def check_photo_frame():
-    print_header("PHOTO FRAME EXAMINATION")
+def check_photo_frame(session=None):
+    session = session or DEFAULT_SESSION
+    title = "PHOTO FRAME EXAMINATION"
 
     clues = [
         ("The frame was not dropped — it appears thrown during a struggle.",
@@ -137,20 +154,16 @@ def check_photo_frame():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
-
-    if not UNLOCKED["drawer"]:
-        UNLOCKED["drawer"] = True
-        print("\n🔓 New discovery unlocked: Office Drawer!\n")
+    _report(session, title, clues, "photo_frame")
+    _examined(session, "photo_frame")
 
 
 # --------------------------------------------
 # Clinic Room General Sweep
 # --------------------------------------------
-def check_clinic_room():
-    print_header("CLINIC ROOM EXAMINATION")
+def check_clinic_room(session=None):
+    session = session or DEFAULT_SESSION
+    title = "CLINIC ROOM EXAMINATION"
 
     clues = [
         ("Overturned chair indicates a physical struggle occurred.",
@@ -161,16 +174,16 @@ def check_clinic_room():
          "Contradiction"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
+    _report(session, title, clues, "clinic_room")
+    _examined(session, "clinic_room")
 
 
 # --------------------------------------------
 # UNLOCKED DISCOVERY: Drawer
 # --------------------------------------------
-def check_drawer():
-    print_header("OFFICE DRAWER EXAMINATION")
+def check_drawer(session=None):
+    session = session or DEFAULT_SESSION
+    title = "OFFICE DRAWER EXAMINATION"
 
     clues = [
         ("Financial audit documents reveal ongoing tension between Kabir and the victim.",
@@ -181,16 +194,16 @@ def check_drawer():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
+    _report(session, title, clues, "drawer")
+    _examined(session, "drawer")
 
 
 # --------------------------------------------
 # UNLOCKED DISCOVERY: USB Port
 # --------------------------------------------
-def check_usb_port():
-    print_header("USB PORT CHECK")
+def check_usb_port(session=None):
+    session = session or DEFAULT_SESSION
+    title = "USB PORT CHECK"
 
     clues = [
         ("Port shows heavy scratch marks — indicates frequent USB insertion.",
@@ -199,16 +212,16 @@ def check_usb_port():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
+    _report(session, title, clues, "usb_port")
+    _examined(session, "usb_port")
 
 
 # --------------------------------------------
 # UNLOCKED DISCOVERY: Corridor Camera
 # --------------------------------------------
-def check_corridor_camera():
-    print_header("CORRIDOR CAMERA CHECK")
+def check_corridor_camera(session=None):
+    session = session or DEFAULT_SESSION
+    title = "CORRIDOR CAMERA CHECK"
 
     clues = [
         ("Backup corridor camera captured a shadow entering the clinic around 11:12 PM.",
@@ -219,74 +232,81 @@ def check_corridor_camera():
          "Evidence"),
     ]
 
-    for text, cat in clues:
-        print(f"• {text}")
-        add_note(text, category=cat)
+    _report(session, title, clues, "corridor_camera")
+    _examined(session, "corridor_camera")
 
 
 # --------------------------------------------
-# INVESTIGATION MENU
+# Evidence areas by name (menus, scripted runs)
 # --------------------------------------------
-def investigate():
-    while True:
-        print("\n========== 🔍 INVESTIGATION MENU ==========\n")
-        print("MAIN EVIDENCE AREAS:")
-        print("1. Footprints")
-        print("2. Laptop")
-        print("3. Window")
-        print("4. Coffee Mug")
-        print("5. Photo Frame")
-        print("6. Clinic Room Sweep")
+# name -> check function; which ones are open is up to the evidence graph
+# (session.EVIDENCE_GRAPH for this case).
+EVIDENCE_AREAS = {
+    "footprints": check_footprints,
+    "laptop": check_laptop,
+    "window": check_window,
+    "coffee_mug": check_coffee_mug,
+    "photo_frame": check_photo_frame,
+    "clinic_room": check_clinic_room,
+    "drawer": check_drawer,
+    "usb_port": check_usb_port,
+    "corridor_camera": check_corridor_camera,
+}
 
-        print("\nUNLOCKED DISCOVERIES:")
 
-        counter = 7
-        option_map = {}
+def examine(area: str, session=None) -> bool:
+    """Investigates an area by name; returns False if unknown or still locked."""
+    session = session or DEFAULT_SESSION
+    if not session.evidence.is_available(area):
+        return False
+    if session.case is not None:
+        spec = session.case.evidence[area]
+        _report(session, spec["title"], spec["clues"], area)
+        _examined(session, area)
+    else:
+        EVIDENCE_AREAS[area](session)
+    return True
 
-        if UNLOCKED["drawer"]:
-            print(f"{counter}. Office Drawer")
-            option_map[str(counter)] = "drawer"
-            counter += 1
 
-        if UNLOCKED["usb_port"]:
-            print(f"{counter}. USB Port Examination")
-            option_map[str(counter)] = "usb_port"
-            counter += 1
+def area_names(session=None) -> list:
+    """Every investigation area of the session's case, in menu order."""
+    return list((session or DEFAULT_SESSION).evidence.graph.areas)
 
-        if UNLOCKED["corridor_camera"]:
-            print(f"{counter}. Corridor Camera Check")
-            option_map[str(counter)] = "corridor_camera"
-            counter += 1
 
-        print(f"{counter}. Back\n")
-        option_map[str(counter)] = "back"
+def reset_unlocks(session=None):
+    """Locks every chain-unlocked area again (new game)."""
+    (session or DEFAULT_SESSION).evidence.reset()
 
-        choice = input("Choose an area to investigate: ").strip()
 
-        # Base options
-        if choice == "1":
-            check_footprints()
-        elif choice == "2":
-            check_laptop()
-        elif choice == "3":
-            check_window()
-        elif choice == "4":
-            check_coffee_mug()
-        elif choice == "5":
-            check_photo_frame()
-        elif choice == "6":
-            check_clinic_room()
-
-        # Unlocked options
-        elif choice in option_map:
-            if option_map[choice] == "drawer":
-                check_drawer()
-            elif option_map[choice] == "usb_port":
-                check_usb_port()
-            elif option_map[choice] == "corridor_camera":
-                check_corridor_camera()
-            elif option_map[choice] == "back":
-                return
+# --------------------------------------------
+# INVESTIGATION MENU
+# --------------------------------------------
+def investigate(session=None):
+    """Menu generated from the case's evidence graph."""
+    session = session or DEFAULT_SESSION
+    evidence = session.evidence
+    graph = evidence.graph
+
+    while True:
+        print("\n========== 🔍 INVESTIGATION MENU ==========\n")
+        print("MAIN EVIDENCE AREAS:")
+        option_map = {}
+        for area in graph.base:
+            option_map[str(len(option_map) + 1)] = area
+            print(f"{len(option_map)}. {graph.labels[area]}")
+
+        print("\nUNLOCKED DISCOVERIES:")
+        for area in evidence.available():
+            option_map[str(len(option_map) + 1)] = area
+            print(f"{len(option_map)}. {graph.labels[area]}")
 
+        back = str(len(option_map) + 1)
+        print(f"{back}. Back\n")
+
+        choice = input("Choose an area to investigate: ").strip()
+        if choice == back:
+            return
+        if choice in option_map:
+            examine(option_map[choice], session)
         else:
             print("Invalid option. Try again.\n")
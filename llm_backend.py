@@ -0,0 +1,403 @@
+# ============================================
+# llm_backend.py
+# Handles:
+# - Lazy creation of the LLM client (first use, not import)
+# - Backend factory: "gemini" (google-genai) or "stub" (local, offline)
+# - Gemini call functions (blocking, asyncio and streaming)
+# - Response cache (keyed by client and prompt) in front of every call
+# - Context caching of the static per-suspect prompt prefix
+# - Optional request scheduler (single-flight, micro-batching,
+#   rate limit, priorities) for the async path
+# - Timeouts, retries and a circuit breaker around every call, with an
+#   in-character fallback reply and latency/error metrics
+# - Token usage metadata passed to the caller's UsageLedger
+# ============================================
+#
+# Nothing here touches the network, .env or the google-genai SDK until
+# the first call, so importing the game (or any engine module) stays fast
+# and works without GOOGLE_API_KEY. asyncio too is imported only by the
+# async paths (see game.py).
+
+import os
+import time
+
+from behavior_engine import SUSPECT_PREFIXES
+from resilience import CannedReply, ResilientCaller
+from response_cache import cache_from_env, cache_key
+
+MODEL = "gemini-2.0-flash"
+
+# Backend used by get_client(); overridable with LLM_BACKEND=stub|gemini.
+DEFAULT_BACKEND = "gemini"
+
+CONTEXT_CACHE_TTL = 3600  # seconds
+
+# Send each suspect's static prefix (case background + profile) once as a
+# Gemini cached context, then only the per-turn suffix. If the SDK or model
+# rejects it (e.g. below the minimum cacheable size) we fall back to the
+# full prompt for that suspect. None = read GEMINI_CONTEXT_CACHE on first use.
+CONTEXT_CACHING = None
+
+_UNSET = object()
+
+# Repeated prompts are answered from here instead of a Gemini round trip.
+# Built from the environment on first use; set to None to disable.
+RESPONSE_CACHE = _UNSET
+
+# Optional llm_scheduler.LLMScheduler used by call_gemini_async; see
+# enable_scheduler(). None = every call goes straight to the backend.
+SCHEDULER = None
+
+# resilience.ResilientCaller guarding every backend call (timeouts, retries,
+# circuit breaker, canned fallback). Built from LLM_TIMEOUT / LLM_DEADLINE /
+# LLM_RETRIES on first use; set to None to call the backend unguarded.
+RESILIENCE = _UNSET
+
+_client = None
+_env_loaded = False
+
+# (id(llm), suspect) -> (cached content name or None, created_at)
+_prefix_contexts = {}
+
+
+# --------------------------------------------
+# Environment (.env) — loaded once, on demand
+# --------------------------------------------
+def load_env():
+    """Loads .env into os.environ the first time it is needed."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+# --------------------------------------------
+# Backend factory
+# --------------------------------------------
+def _make_gemini_client():
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "GOOGLE_API_KEY is not set. Add it to .env (see .env.example) "
+            "or run with LLM_BACKEND=stub to play offline."
+        )
+    from google import genai  # heavy import, deferred to first call
+    return genai.Client(api_key=api_key)
+
+
+def _make_stub_client():
+    from stub_llm import StubClient
+    return StubClient(latency=float(os.environ.get("STUB_LATENCY", "0")))
+
+
+BACKEND_FACTORIES = {
+    "gemini": _make_gemini_client,
+    "stub": _make_stub_client,
+}
+
+
+def make_client(backend: str = None):
+    """Builds a new client for `backend` (default: LLM_BACKEND or gemini)."""
+    load_env()
+    backend = backend or os.environ.get("LLM_BACKEND", DEFAULT_BACKEND)
+    if backend not in BACKEND_FACTORIES:
+        raise ValueError(f"Unknown LLM backend {backend!r}; choose from {sorted(BACKEND_FACTORIES)}")
+    return BACKEND_FACTORIES[backend]()
+
+
+def get_client():
+    """The shared client, created on first use."""
+    global _client
+    if _client is None:
+        _client = make_client()
+    return _client
+
+
+def set_client(client):
+    """Replaces the shared client (e.g. with a StubClient in tests)."""
+    global _client
+    _client = client
+
+
+# --------------------------------------------
+# Lazily resolved settings
+# --------------------------------------------
+def response_cache():
+    """The shared ResponseCache, or None when caching is disabled."""
+    global RESPONSE_CACHE
+    if RESPONSE_CACHE is _UNSET:
+        load_env()
+        RESPONSE_CACHE = cache_from_env()
+    return RESPONSE_CACHE
+
+
+def resilience():
+    """The shared ResilientCaller, or None when calls are unguarded."""
+    global RESILIENCE
+    if RESILIENCE is _UNSET:
+        load_env()
+        RESILIENCE = ResilientCaller(
+            timeout=float(os.environ.get("LLM_TIMEOUT", "20")),
+            deadline=float(os.environ.get("LLM_DEADLINE", "45")),
+            attempts=int(os.environ.get("LLM_RETRIES", "2")) + 1,
+        )
+    return RESILIENCE
+
+
+def context_caching() -> bool:
+    global CONTEXT_CACHING
+    if CONTEXT_CACHING is None:
+        load_env()
+        CONTEXT_CACHING = os.environ.get("GEMINI_CONTEXT_CACHE", "1") != "0"
+    return CONTEXT_CACHING
+
+
+# --------------------------------------------
+# Gemini call functions
+# --------------------------------------------
+def _backend_name(llm) -> str:
+    cls = type(llm)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _cached(prompt: str, llm):
+    """Returns (key, cached reply or None); key is None when caching is off."""
+    cache = response_cache()
+    if cache is None:
+        return None, None
+    key = cache_key(MODEL, prompt, _backend_name(llm))
+    return key, cache.get(key)
+
+
+def _stale(slot) -> bool:
+    """True if the prefix context for `slot` must be (re)created."""
+    created_at = _prefix_contexts.get(slot, (None, None))[1]
+    # Recreate shortly before the server-side TTL expires.
+    return created_at is None or time.monotonic() - created_at > CONTEXT_CACHE_TTL * 0.9
+
+
+def _prefix_config(suspect: str) -> dict:
+    return {
+        "contents": [SUSPECT_PREFIXES[suspect]],
+        "display_name": f"mystery-prefix-{suspect}",
+        "ttl": f"{CONTEXT_CACHE_TTL}s",
+    }
+
+
+def _prefix_context(llm, suspect: str):
+    """Name of the cached context holding `suspect`'s prefix, or None."""
+    slot = (id(llm), suspect)
+    if _stale(slot):
+        try:
+            name = llm.caches.create(model=MODEL, config=_prefix_config(suspect)).name
+        except Exception:
+            name = None
+        _prefix_contexts[slot] = (name, time.monotonic())
+    return _prefix_contexts[slot][0]
+
+
+async def _prefix_context_async(llm, suspect: str):
+    """_prefix_context through the async client, so a cache miss does not block the event loop."""
+    slot = (id(llm), suspect)
+    if _stale(slot):
+        try:
+            name = (await llm.aio.caches.create(model=MODEL, config=_prefix_config(suspect))).name
+        except Exception:
+            name = None
+        _prefix_contexts[slot] = (name, time.monotonic())
+    return _prefix_contexts[slot][0]
+
+
+def _prefix(prompt: str, suspect):
+    """The static prefix a prefix context can replace, or None."""
+    if not context_caching() or suspect is None:
+        return None
+    # Prefix contexts hold the built-in suspects; other case packs are sent whole.
+    prefix = SUSPECT_PREFIXES.get(suspect)
+    if prefix is None or not prompt.startswith(prefix):
+        return None
+    return prefix
+
+
+def _request(prompt: str, llm, suspect):
+    """Returns (contents, config) for a call, using the prefix context if we can."""
+    prefix = _prefix(prompt, suspect)
+    name = None if prefix is None else _prefix_context(llm, suspect)
+    if name is None:
+        return prompt, None
+    return prompt[len(prefix):], {"cached_content": name}
+
+
+async def _request_async(prompt: str, llm, suspect):
+    """_request for the async paths."""
+    prefix = _prefix(prompt, suspect)
+    name = None if prefix is None else await _prefix_context_async(llm, suspect)
+    if name is None:
+        return prompt, None
+    return prompt[len(prefix):], {"cached_content": name}
+
+
+def _store(key, reply: str):
+    """Caches a generated reply; fallback (canned) replies are never cached."""
+    if key is not None and not isinstance(reply, CannedReply):
+        response_cache().put(key, reply)
+
+
+def call_gemini(prompt: str, llm=None, suspect: str = None, tier: int = None, usage=None) -> str:
+    """
+    Sends the prompt to Gemini and returns text response.
+    Passing `suspect` lets the static prompt prefix come from a cached context;
+    `suspect` and `tier` also pick the fallback reply if Gemini is unavailable.
+    `usage` (a prompt_profiler.UsageLedger) receives the response's token counts.
+    """
+    llm = llm or get_client()
+    key, reply = _cached(prompt, llm)
+    if reply is not None:
+        return reply
+
+    def generate():
+        contents, config = _request(prompt, llm, suspect)
+        response = llm.models.generate_content(
+            model=MODEL,
+            contents=contents,
+            config=config
+        )
+        if usage is not None:
+            usage.record_usage(getattr(response, "usage_metadata", None))
+        return response.text
+
+    guard = resilience()
+    reply = guard.call(generate, suspect, tier) if guard is not None else generate()
+    _store(key, reply)
+    return reply
+
+
+async def _generate_async(prompt: str, llm, suspect, usage=None) -> str:
+    """One uncached, unscheduled async Gemini request."""
+    llm = llm or get_client()
+    contents, config = await _request_async(prompt, llm, suspect)
+    response = await llm.aio.models.generate_content(
+        model=MODEL,
+        contents=contents,
+        config=config
+    )
+    if usage is not None:
+        usage.record_usage(getattr(response, "usage_metadata", None))
+    return response.text
+
+
+async def dispatch_concurrently(batch) -> list:
+    """
+    Scheduler dispatch for Gemini: the API has no synchronous multi-prompt
+    endpoint, so a micro-batch is sent as concurrent requests in one go.
+    `batch` is a list of (prompt, (llm, suspect, usage)); a request that
+    was coalesced onto another one is billed to the first caller only.
+    A failed request (a 429, a timeout) comes back as its exception, so
+    only its own callers see it.
+    """
+    import asyncio
+
+    return await asyncio.gather(*(_generate_async(prompt, *ctx) for prompt, ctx in batch), return_exceptions=True)
+
+
+def enable_scheduler(dispatch=dispatch_concurrently, **options):
+    """Routes call_gemini_async through an LLMScheduler (options: max_batch, max_delay, rate, burst)."""
+    from llm_scheduler import LLMScheduler  # only servers need it
+
+    global SCHEDULER
+    SCHEDULER = LLMScheduler(dispatch, **options)
+    return SCHEDULER
+
+
+async def call_gemini_async(
+    prompt: str,
+    llm=None,
+    suspect: str = None,
+    tier: int = None,
+    priority: int = 0,
+    usage=None
+) -> str:
+    """
+    Async variant of call_gemini; does not block the event loop.
+    With a SCHEDULER, identical in-flight prompts share one request and
+    `priority` (llm_scheduler.INTERACTIVE = 0 / BACKGROUND = 1) orders the queue.
+    """
+    llm = llm or get_client()
+    key, reply = _cached(prompt, llm)
+    if reply is not None:
+        return reply
+    if SCHEDULER is not None:
+        def generate():
+            return SCHEDULER.submit(prompt, priority, context=(llm, suspect, usage))
+    else:
+        def generate():
+            return _generate_async(prompt, llm, suspect, usage)
+
+    guard = resilience()
+    reply = await (guard.call_async(generate, suspect, tier) if guard is not None else generate())
+    _store(key, reply)
+    return reply
+
+
+async def stream_gemini_async(prompt: str, llm=None, suspect: str = None, tier: int = None, usage=None):
+    """Async generator yielding reply text chunks as Gemini produces them."""
+    llm = llm or get_client()
+    key, reply = _cached(prompt, llm)
+    if reply is not None:
+        yield reply
+        return
+    guard = resilience()
+    if guard is None:
+        source = _stream_async(prompt, llm, suspect, key, usage)
+    else:
+        source = guard.stream_async(lambda: _stream_async(prompt, llm, suspect, key, usage), suspect, tier)
+    async for chunk in source:
+        yield chunk
+
+
+async def _stream_async(prompt: str, llm, suspect, key, usage=None):
+    """One unguarded Gemini stream; caches the reply only if it completes."""
+    if SCHEDULER is not None:
+        await SCHEDULER.admit()  # every attempt is a request: retries pay too
+    contents, config = await _request_async(prompt, llm, suspect)
+    stream = llm.aio.models.generate_content_stream(
+        model=MODEL,
+        contents=contents,
+        config=config
+    )
+    # Older SDKs return the iterator directly, newer ones a coroutine.
+    if hasattr(stream, "__await__"):
+        stream = await stream
+
+    parts = []
+    metadata = None
+    async for chunk in stream:
+        # Running totals; the last chunk carries the final counts.
+        metadata = getattr(chunk, "usage_metadata", None) or metadata
+        if chunk.text:
+            parts.append(chunk.text)
+            yield chunk.text
+
+    if usage is not None:
+        usage.record_usage(metadata)
+    _store(key, "".join(parts))
+
+
+# --------------------------------------------
+# Metrics
+# --------------------------------------------
+def llm_metrics() -> dict:
+    """Latency histograms, error counters, breaker state and cache/scheduler stats."""
+    guard = RESILIENCE if RESILIENCE is not _UNSET else None
+    cache = RESPONSE_CACHE if RESPONSE_CACHE is not _UNSET else None
+    return {
+        "calls": guard.stats.snapshot() if guard is not None else None,
+        "breaker": guard.breaker.state if guard is not None else None,
+        "response_cache": cache.stats() if cache is not None else None,
+        "scheduler": SCHEDULER.stats() if SCHEDULER is not None else None,
+    }
@@ -0,0 +1,196 @@
+# ============================================
+# llm_scheduler.py
+# Handles:
+# - Request scheduling in front of the LLM backend
+#   * single-flight: identical in-flight prompts share one call
+#   * micro-batching: independent prompts dispatched together,
+#     up to a batch size or a short deadline
+#   * global rate limit (token bucket)
+#   * priority queue: interactive turns before background work
+#   * streamed replies pay the same rate limit (admit()); they are not
+#     coalesced or batched
+# ============================================
+
+import asyncio
+import itertools
+import time
+
+# Priorities (lower runs first)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class TokenBucket:
+    """Allows `rate` requests/second on average, bursts up to `burst` (at least 1)."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = max(1.0, rate if burst is None else burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self, n: int = 1):
+        if n > self.capacity:
+            raise ValueError(f"cannot take {n} tokens from a bucket of {self.capacity:g}")
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            await asyncio.sleep((n - self.tokens) / self.rate)
+
+
+class _Request:
+    __slots__ = ("prompt", "context", "future")
+
+    def __init__(self, prompt, context, future):
+        self.prompt = prompt
+        self.context = context
+        self.future = future
+
+
+class LLMScheduler:
+    """
+    Coalesces and batches LLM requests.
+
+    dispatch:  async callable(list of (prompt, context)) -> list of replies,
+               in the same order. One call = one backend batch. An
+               exception in the list fails only that request's callers;
+               one raised fails the whole batch.
+    max_batch: most requests per dispatch; with a rate limit, at most the
+               bucket's burst, or a full batch could never be paid for
+    max_delay: seconds to wait for more requests before dispatching
+    rate:      dispatched requests per second (None = unlimited)
+
+    Lives on one event loop; if used from a new loop it starts afresh.
+    """
+
+    def __init__(self, dispatch, max_batch: int = 8, max_delay: float = 0.002, rate: float = None, burst: float = None):
+        self.dispatch = dispatch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        if self.bucket is not None:
+            self.max_batch = max(1, min(max_batch, int(self.bucket.capacity)))
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.dispatched = 0
+        self.streams = 0
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._inflight = {}
+        self._waiters = {}  # in-flight future -> callers awaiting it
+        self._seq = itertools.count()
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            # Futures of the old loop can never resolve here: forget them
+            # and their callers together.
+            self._inflight = {}
+            self._waiters = {}
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, prompt: str, priority: int = INTERACTIVE, context=None, key=None) -> str:
+        """Schedules a prompt and returns its reply."""
+        self._bind()
+        self.submitted += 1
+        key = prompt if key is None else key
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await self._wait(future)
+
+        future = self._loop.create_future()
+        self._inflight[key] = future
+        future.add_done_callback(lambda f, k=key: self._inflight.pop(k, None) if self._inflight.get(k) is f else None)
+
+        self._queue.put_nowait((priority, next(self._seq), _Request(prompt, context, future)))
+        return await self._wait(future)
+
+    async def _wait(self, future):
+        """
+        Awaits a shared request. When its last caller stops waiting (timed
+        out or cancelled), the request is dropped, so a retry of the same
+        prompt is sent afresh instead of joining a hung one.
+        """
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            left = self._waiters.pop(future, 1) - 1  # absent: dropped by _bind
+            if left:
+                self._waiters[future] = left
+            elif not future.done():
+                future.cancel()
+
+    async def admit(self):
+        """
+        Waits for a rate-limit token before a streamed request is opened.
+        A stream has its own connection and consumer, so it cannot share
+        a batch; it still counts against `rate` like a dispatched request.
+        """
+        self.streams += 1
+        if self.bucket is not None:
+            await self.bucket.acquire()
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait()[2])
+
+    async def _run(self):
+        while True:
+            batch = [(await self._queue.get())[2]]
+            self._drain(batch)
+            if len(batch) < self.max_batch and self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            # Requests every caller gave up on are not sent.
+            batch = [r for r in batch if not r.future.done()]
+            if not batch:
+                continue
+
+            if self.bucket is not None:
+                await self.bucket.acquire(len(batch))
+
+            self.batches += 1
+            self.dispatched += len(batch)
+            # Don't wait for the backend: keep collecting the next batch.
+            self._loop.create_task(self._send(batch))
+
+    async def _send(self, batch):
+        try:
+            replies = await self.dispatch([(r.prompt, r.context) for r in batch])
+        except Exception as exc:
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(exc)
+            return
+        for r, reply in zip(batch, replies):
+            if r.future.done():
+                continue
+            if isinstance(reply, BaseException):
+                r.future.set_exception(reply)
+            else:
+                r.future.set_result(reply)
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "dispatched": self.dispatched,
+            "batches": self.batches,
+            "streams": self.streams,
+            "avg_batch": self.dispatched / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,274 @@
+# ============================================
+# near_duplicates.py
+# Handles:
+# - Near-duplicate detection for notes (paraphrases of the same clue)
+#   * word shingles, MinHash signatures, LSH banding
+#   * exact Jaccard check on the few LSH candidates
+# - "Anchor" tokens (suspect names, times, numbers) that must match
+#   exactly, so "Rohit ..." never merges with "Kabir ..." and 11:12
+#   never merges with 11:14
+#
+# Off by default: shingling and hashing every new note costs several
+# times an exact-duplicate check. NOTE_DEDUP_THRESHOLD=<0..1> turns it
+# on with that similarity threshold (0.5 is a good start).
+# ============================================
+#
+# How it works:
+# A note becomes the set of its words minus stopwords, plus its anchors.
+# NUM_PERM salted hashes of the words give a MinHash signature; the
+# signature is cut into bands and each band (plus the exact anchor set) is
+# hashed to an int bucket key. Anchors only enter through the key, so the
+# word hashes repeat across notes and are cached. Notes whose
+# Jaccard similarity is at least the threshold share a bucket with high
+# probability, so a lookup only verifies the notes in its own buckets:
+# insertion cost depends on how many similar notes exist, not on the
+# notebook size.
+#
+# Memory: a text's tokens and bucket keys are computed once per process
+# and shared by every session's index (the same clue texts recur across
+# sessions). A session stores one reference per note, and only builds a
+# bucket table once its notebook outgrows LINEAR_MAX; smaller notebooks
+# compare bucket keys note by note.
+
+import os
+import re
+import zlib
+
+NUM_PERM = 16
+_MERSENNE = (1 << 61) - 1
+# Fixed (seeded) permutations: signatures are the same in every process.
+_PERMS = [
+    ((zlib.crc32(b"a%d" % i) << 29 | 1) % _MERSENNE, zlib.crc32(b"b%d" % i) << 17)
+    for i in range(NUM_PERM)
+]
+
+
+def _threshold_from_env():
+    value = os.environ.get("NOTE_DEDUP_THRESHOLD", "off")
+    return None if value.lower() in ("off", "none", "") else float(value)
+
+
+THRESHOLD = _threshold_from_env()
+
+STOPWORDS = frozenset(
+    "a an the of to and or in on at by is was were be been it its that this as for with from "
+    "has have had he she they his her their".split()
+)
+# Clock times stay whole ("11:14"); everything else splits on non-alphanumerics.
+_WORD = re.compile(r"\d{1,2}:\d{2}|[a-z0-9]+")
+
+# token -> its NUM_PERM permuted hashes; tokens repeat across notes, so
+# most signatures are a column-wise min over cached rows. Whole word sets
+# repeat too (the same clue about a different suspect or time), so
+# signatures are cached by word set as well.
+_TOKEN_HASHES = {}
+_SIGNATURES = {}
+_CACHE_MAX = 1 << 16
+
+# (anchor words, bands) -> (anchor words, {text: (tokens, bucket keys)}),
+# shared by the indexes of every session playing the same case.
+_PREPARED = {}
+_PREPARED_MAX = 1 << 14
+
+# Notes an index holds before it builds its bucket table.
+LINEAR_MAX = 16
+
+
+# --------------------------------------------
+# Shingles and signatures
+# --------------------------------------------
+def shingles(text: str, anchor_words=frozenset()) -> tuple:
+    """(words, anchors) of a note; anchors are names and anything with a digit."""
+    words = set()
+    anchors = set()
+    for w in _WORD.findall(text.casefold()):
+        if not w.isalpha() or w in anchor_words:
+            anchors.add(w)
+        elif len(w) > 1 and w not in STOPWORDS:
+            words.add(w)
+    return frozenset(words), frozenset(anchors)
+
+
+def _token_hashes(token: str) -> tuple:
+    row = _TOKEN_HASHES.get(token)
+    if row is None:
+        if len(_TOKEN_HASHES) >= _CACHE_MAX:
+            _TOKEN_HASHES.clear()
+        h = zlib.crc32(token.encode())
+        row = _TOKEN_HASHES[token] = tuple((a * h + b) % _MERSENNE for a, b in _PERMS)
+    return row
+
+
+def signature(tokens: frozenset) -> tuple:
+    """MinHash signature (NUM_PERM values) of a token set."""
+    sig = _SIGNATURES.get(tokens)
+    if sig is None:
+        if not tokens:
+            return (0,) * NUM_PERM
+        if len(_SIGNATURES) >= _CACHE_MAX:
+            _SIGNATURES.clear()
+        sig = _SIGNATURES[tokens] = tuple(map(min, zip(*map(_token_hashes, tokens))))
+    return sig
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_bands(threshold: float) -> int:
+    """
+    Number of bands (of NUM_PERM // bands rows) whose LSH cut-off,
+    (1/b)^(1/r), sits safely below `threshold` — favouring recall, since
+    candidates are verified exactly anyway.
+    """
+    best = NUM_PERM
+    for bands in (16, 8, 4, 2):
+        rows = NUM_PERM // bands
+        if (1 / bands) ** (1 / rows) <= threshold * 0.8:
+            best = bands
+    return best
+
+
+# --------------------------------------------
+# Index
+# --------------------------------------------
+class NearDuplicateIndex:
+    """
+    LSH index over note texts. find(text) returns the id of a stored
+    near-duplicate (Jaccard >= threshold, same anchors) or None;
+    add(text, note_id) stores a text under an id, replacing the id's
+    earlier wording (e.g. after a merge); extend() queues many texts,
+    indexed on the next lookup (restored sessions that are never played
+    again never pay for it).
+
+    anchor_words: lowercase words that must match exactly (suspect names).
+    """
+
+    __slots__ = ("threshold", "anchor_words", "bands", "rows", "_prepared", "_buckets", "_entries", "_pending")
+
+    def __init__(self, threshold: float = None, anchor_words=()):
+        self.threshold = THRESHOLD if threshold is None else threshold
+        anchor_words = frozenset(w.casefold() for w in anchor_words)
+        self.bands = lsh_bands(self.threshold) if self.threshold else NUM_PERM
+        self.rows = NUM_PERM // self.bands
+        self.anchor_words, self._prepared = _PREPARED.setdefault((anchor_words, self.bands), (anchor_words, {}))
+        self._buckets = None  # bucket key -> note_id, or [note_id, ...]; built past LINEAR_MAX
+        self._entries = {}    # note_id -> (tokens, bucket keys)
+        self._pending = []    # [(text, note_id)] not indexed yet
+
+    def _prepare(self, text: str) -> tuple:
+        """(tokens compared by Jaccard, LSH bucket keys) of a text, shared process-wide."""
+        prepared = self._prepared.get(text)
+        if prepared is None:
+            if len(self._prepared) >= _PREPARED_MAX:
+                self._prepared.clear()
+            words, anchors = shingles(text, self.anchor_words)
+            sig = signature(words)
+            r = self.rows
+            keys = tuple(hash((band, sig[band * r:(band + 1) * r], anchors)) for band in range(self.bands))
+            prepared = self._prepared[text] = (words | anchors, keys)
+        return prepared
+
+    def find(self, text: str):
+        """Id of the most similar stored note at or above the threshold, else None."""
+        if not self.threshold:
+            return None
+        return self._find(self._prepare(text))
+
+    def _find(self, prepared):
+        if self._pending:
+            self._flush()
+        tokens, keys = prepared
+        entries = self._entries
+        if self._buckets is None:
+            wanted = set(keys)
+            candidates = [note_id for note_id, (_, stored) in entries.items() if not wanted.isdisjoint(stored)]
+        else:
+            candidates = set()
+            for key in keys:
+                hit = self._buckets.get(key)
+                if hit is None:
+                    continue
+                if type(hit) is list:
+                    candidates.update(hit)
+                else:
+                    candidates.add(hit)
+        best, best_sim = None, self.threshold
+        for note_id in candidates:
+            sim = jaccard(tokens, entries[note_id][0])
+            if sim > best_sim or sim == best_sim and (best is None or note_id < best):
+                best, best_sim = note_id, sim
+        return best
+
+    def add(self, text: str, note_id):
+        if not self.threshold:
+            return
+        self._add(self._prepare(text), note_id)
+
+    def extend(self, items):
+        """Queues (text, note_id) pairs; they are indexed on the next lookup."""
+        if self.threshold:
+            self._pending.extend(items)
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        for text, note_id in pending:
+            self._add(self._prepare(text), note_id)
+
+    def _add(self, prepared, note_id):
+        old = self._entries.get(note_id)
+        if old is not None and self._buckets is not None:
+            self._unbucket(old[1], note_id)
+        self._entries[note_id] = prepared
+        if self._buckets is not None:
+            self._bucket(prepared[1], note_id)
+        elif len(self._entries) > LINEAR_MAX:
+            self._buckets = {}
+            for stored_id, (_, keys) in self._entries.items():
+                self._bucket(keys, stored_id)
+
+    def _bucket(self, keys, note_id):
+        buckets = self._buckets
+        for key in keys:
+            hit = buckets.get(key)
+            if hit is None:
+                buckets[key] = note_id
+            elif type(hit) is list:
+                hit.append(note_id)
+            else:
+                buckets[key] = [hit, note_id]
+
+    def _unbucket(self, keys, note_id):
+        buckets = self._buckets
+        for key in keys:
+            hit = buckets.get(key)
+            if type(hit) is list:
+                if note_id in hit:
+                    hit.remove(note_id)
+                    if len(hit) == 1:
+                        buckets[key] = hit[0]
+            elif hit == note_id:
+                del buckets[key]
+
+    def find_or_add(self, text: str, note_id):
+        """
+        find() and, if nothing matched, add() in one pass (one signature).
+        Returns the matching id, or None if `text` was added under note_id.
+        """
+        if not self.threshold:
+            return None
+        prepared = self._prepare(text)
+        match = self._find(prepared)
+        if match is None:
+            self._add(prepared, note_id)
+        return match
+
+    def clear(self):
+        self._buckets = None
+        self._entries.clear()
+        self._pending.clear()
+
+    def __len__(self):
+        return len(self._entries) + len(self._pending)
@@ -3,69 +3,225 @@
 # Handles:
 # - Storing discovered clues and notes
 # - Adding new notes automatically (pattern-based)
-# - Viewing notes in a formatted way with categories
+# - Merging near-duplicate notes (paraphrases, see near_duplicates.py)
+# - Viewing notes in a formatted way with categories, filtered by
+#   category / source (suspect or area) and paginated
+# - Recording contradictions between replies and findings as notes
+#   (see contradictions.py)
 # ============================================
 
-import re
-from datetime import datetime
+import sys
 
-# All collected clues/notes stored here as dicts:
-# { "text": str, "category": str, "timestamp": datetime }
-NOTES = []
+import contradictions
+import tracing
+from clues import CATEGORIES, PAGE_SIZE, SOURCES, Note, advance_timestamps, page_slice
+from evidence_graph import announce_unlocks
+from rule_engine import RuleEngine
+from session import DEFAULT_SESSION
+
+# Notes belong to a GameSession (session.notes, session.note_index).
+# NOTES is the console game's list, kept as a module alias (clues.Note
+# entries: .text, .category, .ts / .timestamp)
+NOTES = DEFAULT_SESSION.notes
+
+# What happens when a new note paraphrases an existing one
+# (similarity threshold: session.near_dups.threshold):
+#   "keep_first"   - drop the new note
+#   "keep_longest" - keep whichever wording is longer
+#   "keep_latest"  - reword the existing note with the new text
+# The existing note keeps its position, category and timestamp.
+MERGE_POLICY = "keep_first"
+MERGE_POLICIES = ("keep_first", "keep_longest", "keep_latest")
+
+
+# --------------------------------------------
+# Internal helper: normalized dedup key
+# --------------------------------------------
+def _normalize(text: str) -> str:
+    """Case- and whitespace-insensitive key for duplicate detection."""
+    return " ".join(text.split()).casefold()
 
 
 # --------------------------------------------
 # Internal helper: check if note already exists
 # --------------------------------------------
-def _note_exists(text: str) -> bool:
-    for n in NOTES:
-        if n["text"] == text:
-            return True
-    return False
+def _note_exists(text: str, session=None) -> bool:
+    session = session or DEFAULT_SESSION
+    return _normalize(text) in session.note_index
 
 
 # --------------------------------------------
 # Add a new note (with category)
 # --------------------------------------------
-def add_note(text: str, category: str = "General"):
+def add_note(text: str, category: str = "General", session=None, source: str = ""):
     """
-    Adds a unique clue/note and prints notification.
-    Notes are tagged with a category (e.g. 'Timeline', 'Location', 'Motive').
+    Adds a unique clue/note to the session and prints notification
+    (if the session announces).
+    Notes are tagged with a category (e.g. 'Timeline', 'Location', 'Motive')
+    and the source they came from (suspect name or investigation area).
     """
-    if _note_exists(text):
+    session = session or DEFAULT_SESSION
+
+    key = _normalize(text)
+    if key in session.note_index:
         return False
 
-    NOTES.append(
-        {
-            "text": text,
-            "category": category,
-            "timestamp": datetime.now(),
-        }
-    )
+    session.note_index.add(key)
+    if session.near_dups.threshold:
+        match = session.near_dups.find_or_add(text, len(session.notes))
+        if match is not None:
+            _merge(session, match, text)
+            return False
 
-    print("\n💡  New Clue Added to Notes!")
-    print(f"   [{category}] {text}\n")
+    note = Note(text, category, source=source)
+    session.notes.append(note)
+
+    if session.announce:
+        print("\n💡  New Clue Added to Notes!")
+        print(f"   [{category}] {text}\n")
+
+    # Note-based unlock conditions (evidence_graph requires_notes)
+    unlocked = session.evidence.record_note(category)
+    if unlocked and session.announce:
+        announce_unlocks(session.evidence.graph, unlocked)
     return True
 
 
+# --------------------------------------------
+# Internal helper: fold a paraphrase into an existing note
+# --------------------------------------------
+def _merge(session, note_id: int, text: str):
+    note = session.notes[note_id]
+    if MERGE_POLICY == "keep_latest" or (MERGE_POLICY == "keep_longest" and len(text) > len(note.text)):
+        note.text = sys.intern(text)
+        session.catalog.changed(note_id, note)
+        # Later paraphrases are compared with the note's new wording.
+        session.near_dups.add(text, note_id)
+
+
+# --------------------------------------------
+# Reset notebook (new game)
+# --------------------------------------------
+def clear_notes(session=None):
+    """Removes every note and its dedup index entry (unlocks are kept)."""
+    session = session or DEFAULT_SESSION
+    session.notes.clear()
+    session.note_index.clear()
+    session.near_dups.clear()
+    session.catalog.clear()
+
+
+# --------------------------------------------
+# Restore a saved notebook (snapshot.py)
+# --------------------------------------------
+def load_notes(notes, session=None):
+    """
+    Appends saved notes (clues.Note) as they are, rebuilding the
+    dedup indexes and note counts. No merging and no notifications.
+    """
+    session = session or DEFAULT_SESSION
+    start = len(session.notes)
+    session.notes.extend(notes)
+    added = session.notes[start:]
+    if added:
+        # Notes collected after these must sort after them, even if the
+        # clock is behind the saved timestamps (another host, clock step).
+        advance_timestamps(max(note.ts for note in added))
+    session.note_index.update(_normalize(note.text) for note in added)
+    session.near_dups.extend((note.text, start + i) for i, note in enumerate(added))
+    findings = {}
+    for note in added:
+        session.evidence.record_note(note.category)
+        if contradictions.ENABLED and note.source in session.evidence_graph.index:
+            findings.setdefault(note.source, []).append(note.text)
+    # Facts for later contradiction checks; their conflicts are already notes.
+    for area, texts in findings.items():
+        session.contradictions.observe_evidence(area, texts, check=False)
+
+
 # --------------------------------------------
 # Display all notes in a clean format
 # --------------------------------------------
-def show_notes():
-    """Prints all notes discovered so far."""
+def find_notes(category: str = None, source: str = None, since: int = None, until: int = None, session=None) -> list:
+    """
+    Notes matching every given filter, in discovery order, e.g.
+    find_notes("Timeline", "Rohit"). since / until: clues.Note.ts bounds
+    (µs since the epoch, until exclusive). Cost is O(log n + results).
+    """
+    session = session or DEFAULT_SESSION
+    notes = session.notes
+    return [notes[i] for i in session.catalog.query(category, source, since, until)]
+
+
+def show_notes(session=None, category: str = None, source: str = None, page: int = None, per_page: int = PAGE_SIZE):
+    """
+    Prints the notes discovered so far: all of them, or those matching
+    category / source, or one page (1-based, -1 = last). Lines come from
+    the session's rendered-line cache; nothing is reformatted.
+    Returns the number of pages.
+    """
+    catalog = (session or DEFAULT_SESSION).catalog
+    filtered = category is not None or source is not None
+    positions = catalog.query(category, source) if filtered else None
+    total = len(catalog) if positions is None else len(positions)
+    pages = max(1, -(-total // per_page))
+
     print("\n============ 📝 DETECTIVE NOTES ============\n")
+    if filtered:
+        print("Showing: " + ", ".join(f for f in (source, category) if f) + "\n")
 
-    if not NOTES:
-        print("No notes have been discovered yet.\n")
+    if not total:
+        print("No notes have been discovered yet.\n" if not filtered else "No matching notes.\n")
         print("============================================\n")
-        return
+        return pages
 
-    for i, note in enumerate(NOTES, start=1):
-        category = note["category"]
-        text = note["text"]
-        print(f"{i}. [{category}] {text}")
+    print("\n".join(catalog.render(positions, page, per_page)))
+    if page is not None:
+        shown = page_slice(total, page, per_page)
+        print(f"\n(notes {shown.start + 1}-{min(shown.stop, total)} of {total}, page {shown.start // per_page + 1}/{pages})")
 
     print("\n============================================\n")
+    return pages
+
+
+def _known(name: str, names) -> str:
+    """`name` spelled as a known category / source (case-insensitive), else as typed."""
+    key = name.strip().casefold()
+    return next((n for n in names if n.casefold() == key), name.strip())
+
+
+def browse_notes(session=None):
+    """
+    Console notes view: one page at a time, newest page first, with
+    filters ('c <category>', 's <suspect or area>', 'all').
+    """
+    session = session or DEFAULT_SESSION
+    category = source = None
+    page = -1
+    while True:
+        pages = show_notes(session, category, source, page)
+        if not session.notes:
+            return
+        if page < 0:
+            page += pages + 1
+        choice = input("Notes: [n]ext, [p]rev, c <category>, s <source>, all, Enter to go back: ").strip()
+        command, _, arg = choice.partition(" ")
+        command = command.lower()
+        if command in ("", "q", "quit", "back"):
+            return
+        if command in ("n", "next"):
+            page = min(page + 1, pages)
+        elif command in ("p", "prev"):
+            page = max(page - 1, 1)
+        elif command == "c" and arg:
+            category, page = _known(arg, CATEGORIES.names), -1
+        elif command == "s" and arg:
+            source, page = _known(arg, SOURCES.names), -1
+        elif command == "all":
+            category = source = None
+            page = -1
+        else:
+            print("Invalid option.\n")
 
 
 # --------------------------------------------
@@ -200,29 +356,72 @@ CLUE_RULES = [
 ]
 
 
+# Compiled once at import: one keyword pass per reply, then only the
+# rules whose literals appeared are verified. Call rebuild_clue_engine()
+# after editing CLUE_RULES at runtime.
+_CLUE_ENGINE = RuleEngine([rule["patterns"] for rule in CLUE_RULES])
+
+
+def rebuild_clue_engine():
+    """Recompiles the clue matcher from the current CLUE_RULES."""
+    global _CLUE_ENGINE
+    _CLUE_ENGINE = RuleEngine([rule["patterns"] for rule in CLUE_RULES])
+
+
+# --------------------------------------------
+# Helper: which rules fire on a reply
+# --------------------------------------------
+def fired_rules(reply: str, case=None) -> set:
+    """
+    Returns the indices into CLUE_RULES (or the case pack's clue_rules)
+    of every rule matching `reply`.
+    """
+    engine = _CLUE_ENGINE if case is None else case.clue_engine
+    return engine.scan(reply.lower())
+
+
 # --------------------------------------------
 # Helper: run all rules against reply text
 # --------------------------------------------
-def detect_notes(suspect_name: str, reply: str) -> bool:
+def detect_notes(suspect_name: str, reply: str, session=None, fired=None) -> bool:
     """
     Automatically detects important clues from suspect replies.
-    Uses regex-based CLUE_RULES to add meaningful notes.
+    Uses regex-based CLUE_RULES to add meaningful notes; each fired
+    rule adds its note at most once per reply. fired: the reply's
+    fired_rules() when the caller already has them.
 
     Returns True if at least one new note was added.
     """
-    reply_low = reply.lower()
     added_any = False
+    case = (session or DEFAULT_SESSION).case
+    rules = CLUE_RULES if case is None else case.clue_rules
+
+    # Same reply can trigger multiple rules; keep CLUE_RULES order.
+    if fired is None:
+        fired = fired_rules(reply, case)
+    for idx in sorted(fired):
+        rule = rules[idx]
+        if tracing.ENABLED:
+            tracing.count("clue_rules", rule=idx, category=rule["category"])
+        note_text = rule["note_template"].format(suspect=suspect_name)
+        if add_note(note_text, category=rule["category"], session=session, source=suspect_name):
+            added_any = True
 
-    for rule in CLUE_RULES:
-        category = rule["category"]
-        note_template = rule["note_template"]
+    if contradictions.ENABLED:
+        with tracing.span("contradictions"):
+            conflicts = (session or DEFAULT_SESSION).contradictions.observe_reply(suspect_name, reply)
+        if note_contradictions(conflicts, session):
+            added_any = True
+
+    return added_any
 
-        for pattern in rule["patterns"]:
-            if re.search(pattern, reply_low):
-                note_text = note_template.format(suspect=suspect_name)
-                added = add_note(note_text, category=category)
-                if added:
-                    added_any = True
-                # We don't break here; same reply can trigger multiple rules.
 
+def note_contradictions(conflicts, session=None) -> bool:
+    """Adds each contradictions.Conflict as a "Contradiction" note from its suspect. True if any was new."""
+    added_any = False
+    for conflict in conflicts:
+        if tracing.ENABLED:
+            tracing.count("contradictions", kind=conflict.kind)
+        if add_note(conflict.text, category="Contradiction", session=session, source=conflict.suspect):
+            added_any = True
     return added_any
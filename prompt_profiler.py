@@ -0,0 +1,192 @@
+# ============================================
+# prompt_profiler.py
+# Handles:
+# - Token estimates per MASTER_TEMPLATE section
+# - Prompt size for every suspect / tier / CT combination
+# - Per-session token ledger (estimates + actual usage metadata)
+# - Cost reports
+# - CLI listing the most expensive sections and combinations
+#
+# Usage:
+#   python prompt_profiler.py              # top sections + combinations
+#   python prompt_profiler.py --top 5 --question "Where were you at 11?"
+# ============================================
+
+import re
+
+from conversation_memory import estimate_tokens
+
+# USD per million tokens for llm_backend.MODEL (gemini-2.0-flash list
+# prices); update when the model or pricing changes.
+PRICE_PER_M_INPUT = 0.10
+PRICE_PER_M_CACHED_INPUT = 0.025
+PRICE_PER_M_OUTPUT = 0.40
+
+# Every section in MASTER_TEMPLATE is introduced by a ===== / TITLE / ===== block.
+_SECTION_RE = re.compile(r"^=+\n([A-Z][A-Z ]*)\n=+\n", re.M)
+PREAMBLE = "PREAMBLE"
+
+
+# --------------------------------------------
+# Section profile
+# --------------------------------------------
+def split_sections(prompt: str) -> list:
+    """[(section title, text)] in prompt order; headers belong to their section."""
+    sections = []
+    starts = [(m.start(), m.group(1)) for m in _SECTION_RE.finditer(prompt)]
+    first = starts[0][0] if starts else len(prompt)
+    if prompt[:first].strip():
+        sections.append((PREAMBLE, prompt[:first]))
+    for i, (start, title) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(prompt)
+        sections.append((title, prompt[start:end]))
+    return sections
+
+
+def profile_prompt(prompt: str) -> dict:
+    """{section title: estimated tokens} for one rendered prompt."""
+    return {title: estimate_tokens(text) for title, text in split_sections(prompt)}
+
+
+def profile_combinations(player_message: str = "Where were you at 11:10?", memory=None) -> list:
+    """
+    Builds the prompt for every suspect / tier / CT and profiles it.
+    Returns [{"suspect", "tier", "ct", "tokens", "sections"}].
+    """
+    from behavior_engine import build_prompt
+    from suspects import CT_EFFECTS, SUSPECTS
+
+    rows = []
+    for name, suspect in SUSPECTS.items():
+        for tier in suspect["tiers"]:
+            for ct in [0, *CT_EFFECTS[name]]:
+                prompt = build_prompt(name, tier, ct, player_message, memory)
+                rows.append({
+                    "suspect": name,
+                    "tier": tier,
+                    "ct": ct,
+                    "tokens": estimate_tokens(prompt),
+                    "sections": profile_prompt(prompt),
+                })
+    return rows
+
+
+def section_totals(rows: list) -> list:
+    """[(section, mean tokens, max tokens, share of all prompt tokens)], largest first."""
+    sums, peaks = {}, {}
+    for row in rows:
+        for title, tokens in row["sections"].items():
+            sums[title] = sums.get(title, 0) + tokens
+            peaks[title] = max(peaks.get(title, 0), tokens)
+    total = sum(sums.values()) or 1
+    return sorted(
+        ((title, sums[title] / len(rows), peaks[title], sums[title] / total) for title in sums),
+        key=lambda item: -item[1],
+    )
+
+
+# --------------------------------------------
+# Per-session ledger
+# --------------------------------------------
+def usage_counts(usage_metadata) -> tuple:
+    """(prompt, cached, output) token counts from a response's usage_metadata."""
+    def count(name):
+        return getattr(usage_metadata, name, None) or 0
+    return count("prompt_token_count"), count("cached_content_token_count"), count("candidates_token_count")
+
+
+class UsageLedger:
+    """
+    Token accounting for one session.
+
+    Estimated counts cover every turn. Actual counts come from the
+    backend's usage_metadata and only cover requests that reached it
+    (response-cache hits and coalesced requests cost nothing).
+    """
+
+    __slots__ = ("turns", "est_prompt", "est_output", "requests", "prompt", "cached", "output", "by_suspect")
+
+    def __init__(self):
+        self.turns = 0
+        self.est_prompt = 0
+        self.est_output = 0
+        self.requests = 0
+        self.prompt = 0
+        self.cached = 0
+        self.output = 0
+        self.by_suspect = {}  # suspect -> [turns, estimated prompt tokens]
+
+    def record_turn(self, suspect: str, prompt: str, reply: str):
+        """Estimated cost of one turn."""
+        tokens = estimate_tokens(prompt)
+        self.turns += 1
+        self.est_prompt += tokens
+        self.est_output += estimate_tokens(reply)
+        entry = self.by_suspect.setdefault(suspect, [0, 0])
+        entry[0] += 1
+        entry[1] += tokens
+
+    def record_usage(self, usage_metadata):
+        """Actual counts reported by the backend for one request."""
+        if usage_metadata is None:
+            return
+        prompt, cached, output = usage_counts(usage_metadata)
+        self.requests += 1
+        self.prompt += prompt
+        self.cached += cached
+        self.output += output
+
+    def clear(self):
+        self.__init__()
+
+    def report(self) -> dict:
+        """Per-session cost report (USD at the PRICE_PER_M_* rates)."""
+        if self.requests:
+            fresh = max(self.prompt - self.cached, 0)
+            cost = (fresh * PRICE_PER_M_INPUT + self.cached * PRICE_PER_M_CACHED_INPUT
+                    + self.output * PRICE_PER_M_OUTPUT) / 1e6
+        else:
+            cost = (self.est_prompt * PRICE_PER_M_INPUT + self.est_output * PRICE_PER_M_OUTPUT) / 1e6
+        return {
+            "turns": self.turns,
+            "estimated": {"prompt_tokens": self.est_prompt, "output_tokens": self.est_output},
+            "actual": {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt,
+                "cached_tokens": self.cached,
+                "output_tokens": self.output,
+            } if self.requests else None,
+            "by_suspect": {
+                name: {"turns": turns, "avg_prompt_tokens": round(tokens / turns)}
+                for name, (turns, tokens) in self.by_suspect.items()
+            },
+            "cost_usd": round(cost, 6),
+            "cost_basis": "actual" if self.requests else "estimated",
+        }
+
+
+# --------------------------------------------
+# CLI
+# --------------------------------------------
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate prompt tokens per template section.")
+    parser.add_argument("--top", type=int, default=10, help="rows to show per table")
+    parser.add_argument("--question", default="Where were you at 11:10?", help="player message used for every prompt")
+    args = parser.parse_args()
+
+    rows = profile_combinations(args.question)
+    print(f"{len(rows)} suspect/tier/CT combinations, ~4 chars per token\n")
+
+    print(f"{'section':<36} {'mean':>6} {'max':>6} {'share':>6}")
+    for title, mean, peak, share in section_totals(rows)[:args.top]:
+        print(f"{title:<36} {mean:>6.0f} {peak:>6d} {share:>6.1%}")
+
+    print(f"\n{'suspect':<8} {'tier':>4} {'ct':>3} {'tokens':>7}")
+    for row in sorted(rows, key=lambda r: -r["tokens"])[:args.top]:
+        print(f"{row['suspect']:<8} {row['tier']:>4} {row['ct']:>3} {row['tokens']:>7}")
+
+
+if __name__ == "__main__":
+    main()
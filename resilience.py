@@ -0,0 +1,426 @@
+# ============================================
+# resilience.py
+# Handles:
+# - Per-attempt timeouts and an overall deadline for LLM calls
+# - Retries with jittered exponential backoff
+# - Circuit breaker (closed -> open -> half-open)
+# - In-character canned replies when the backend is unavailable
+# - Latency histograms and error counters
+# ============================================
+
+import random
+import time
+
+from suspects import SUSPECTS
+
+# --------------------------------------------
+# Fallback replies (suspect -> tier -> line)
+# --------------------------------------------
+# Said instead of a generated reply when the breaker is open or every
+# retry failed. One line per tier in SUSPECTS[...]["tiers"], in the same mood.
+CANNED_REPLIES = {
+    "Nisha": {
+        0: "I... I'm sorry, I need a moment. Could you ask me that again?",
+        1: "Why do you keep pushing me? I've already told you everything I can!",
+        2: "Please, stop. I can't think straight right now. I just can't.",
+    },
+    "Kabir": {
+        0: "Let me check my schedule and get back to you on that, detective.",
+        1: "I don't see why I have to answer that. Ask Rohit where he was!",
+        2: "I... no, wait, that's not what I meant. Give me a second.",
+        3: "I've made mistakes with the accounts, fine! But I didn't kill anyone!",
+    },
+    "Rohit": {
+        0: "I'd rather think that through before answering. Go on, next question.",
+        1: "I've answered that already.",
+        2: "It's... complicated. You're twisting the timeline.",
+        3: "I don't have time for this. Ask something that matters.",
+        4: "I... no. You don't understand what he was like. I'm done talking.",
+    },
+}
+
+_GENERIC_REPLY = "I have nothing more to say about that."
+
+
+class CannedReply(str):
+    """A fallback reply; callers can tell it apart (e.g. to skip caching)."""
+
+
+def canned_reply(suspect: str = None, tier: int = None) -> CannedReply:
+    """Cheap in-character reply for `suspect` at emotional `tier`."""
+    lines = CANNED_REPLIES.get(suspect)
+    if not lines:
+        return CannedReply(_GENERIC_REPLY)
+    top = max(SUSPECTS[suspect]["tiers"]) if suspect in SUSPECTS else max(lines)
+    tier = min(max(tier or 0, 0), top)
+    while tier not in lines and tier > 0:
+        tier -= 1
+    return CannedReply(lines.get(tier, _GENERIC_REPLY))
+
+
+# --------------------------------------------
+# Metrics
+# --------------------------------------------
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (bucket upper bounds in seconds)."""
+
+    BOUNDS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+    def __init__(self, bounds: tuple = None):
+        if bounds is not None:
+            self.BOUNDS = bounds
+        self.counts = [0] * len(self.BOUNDS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.BOUNDS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.BOUNDS[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.total,
+            "mean": self.sum / self.total if self.total else 0.0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "buckets": {str(b): c for b, c in zip(self.BOUNDS, self.counts)},
+        }
+
+
+class CallStats:
+    """Error counters plus latency of successful and of all calls."""
+
+    COUNTERS = ("calls", "attempts", "successes", "retries", "timeouts", "errors", "short_circuits", "fallbacks")
+
+    def __init__(self):
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.attempt_latency = LatencyHistogram()
+        self.call_latency = LatencyHistogram()
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def snapshot(self) -> dict:
+        return {
+            **self.counters,
+            "attempt_latency": self.attempt_latency.snapshot(),
+            "call_latency": self.call_latency.snapshot(),
+        }
+
+
+# --------------------------------------------
+# Circuit breaker
+# --------------------------------------------
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls; while open,
+    calls are refused for `reset_timeout` seconds. Then one trial call is
+    let through (half-open): success closes the breaker, failure reopens it,
+    and a trial abandoned midway (cancelled, stream closed early) reopens
+    it too, so the next trial can go out after another reset_timeout.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            return True
+        # Closed, or half-open with the trial call still out: only one trial.
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """A call ended with neither outcome; frees the half-open trial slot."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+# --------------------------------------------
+# Retry policy
+# --------------------------------------------
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Timeouts, connection problems, 408, 429 and 5xx are worth retrying;
+    nothing else is (bad request, auth, and bugs such as AttributeError).
+    google-genai errors carry the HTTP status as `.code`.
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and (code in (408, 429) or code >= 500)
+
+
+# Marker ResilientCaller._stream_async yields once the breaker has the outcome.
+_SETTLED = object()
+
+
+class ResilientCaller:
+    """
+    Wraps one LLM call with a per-attempt timeout, an overall deadline,
+    jittered exponential backoff and a circuit breaker. When the breaker
+    is open or every attempt failed, the call returns canned_reply() instead
+    of raising, so a player's turn never hangs. Errors that retrying cannot
+    fix (see is_retryable) are raised, not hidden behind a canned reply.
+
+    timeout:    seconds allowed per attempt
+    deadline:   seconds allowed for the whole call, backoff included
+    attempts:   most tries per call
+    base_delay: first backoff; doubles per retry up to max_delay, and the
+                actual sleep is uniform in [0, that] ("full jitter")
+    """
+
+    def __init__(
+        self,
+        timeout: float = 20.0,
+        deadline: float = 45.0,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        breaker: CircuitBreaker = None
+    ):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = CallStats()
+        self._pool = None
+
+    def backoff(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def _budget(self, started: float) -> float:
+        """Time the next attempt may take, or <= 0 if the deadline passed."""
+        return min(self.timeout, self.deadline - (time.monotonic() - started))
+
+    def _fallback(self, suspect, tier) -> str:
+        self.stats.count("fallbacks")
+        return canned_reply(suspect, tier)
+
+    def _failed(self, exc: BaseException):
+        self.stats.count("timeouts" if isinstance(exc, TimeoutError) else "errors")
+
+    # ---- blocking calls ----
+    def call(self, fn, suspect: str = None, tier: int = None) -> str:
+        """Runs fn() (blocking) under the policy."""
+        self.stats.count("calls")
+        if not self.breaker.allow():
+            self.stats.count("short_circuits")
+            return self._fallback(suspect, tier)
+
+        if self._pool is None:
+            # A worker thread lets us stop waiting on a hung request;
+            # the abandoned request finishes (or fails) in the background.
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-call")
+
+        started = time.monotonic()
+        for attempt in range(self.attempts):
+            budget = self._budget(started)
+            if budget <= 0:
+                break
+            if attempt:
+                self.stats.count("retries")
+            self.stats.count("attempts")
+            t0 = time.monotonic()
+            future = self._pool.submit(fn)
+            try:
+                result = future.result(timeout=budget)
+            except Exception as exc:
+                if not future.done():
+                    exc = TimeoutError(f"LLM call exceeded {budget:.1f}s")
+                self.stats.attempt_latency.observe(time.monotonic() - t0)
+                self._failed(exc)
+                if not is_retryable(exc):
+                    self.breaker.record_abandoned()
+                    raise
+                delay = self.backoff(attempt)
+                if attempt + 1 < self.attempts and delay < self._budget(started):
+                    time.sleep(delay)
+                continue
+            self.stats.attempt_latency.observe(time.monotonic() - t0)
+            self.stats.call_latency.observe(time.monotonic() - started)
+            self.stats.count("successes")
+            self.breaker.record_success()
+            return result
+
+        self.breaker.record_failure()
+        self.stats.call_latency.observe(time.monotonic() - started)
+        return self._fallback(suspect, tier)
+
+    # ---- asyncio calls ----
+    async def call_async(self, make_coro, suspect: str = None, tier: int = None) -> str:
+        """Awaits make_coro() (a fresh coroutine per attempt) under the policy."""
+        self.stats.count("calls")
+        if not self.breaker.allow():
+            self.stats.count("short_circuits")
+            return self._fallback(suspect, tier)
+        try:
+            return await self._call_async(make_coro, suspect, tier)
+        except BaseException:
+            # Cancelled, or an error retrying can't fix: no verdict on the backend.
+            self.breaker.record_abandoned()
+            raise
+
+    async def _call_async(self, make_coro, suspect, tier) -> str:
+        import asyncio  # lazy: the console game imports this module (see game.py)
+
+        started = time.monotonic()
+        for attempt in range(self.attempts):
+            budget = self._budget(started)
+            if budget <= 0:
+                break
+            if attempt:
+                self.stats.count("retries")
+            self.stats.count("attempts")
+            t0 = time.monotonic()
+            try:
+                result = await asyncio.wait_for(make_coro(), budget)
+            except Exception as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    exc = TimeoutError(f"LLM call exceeded {budget:.1f}s")
+                self.stats.attempt_latency.observe(time.monotonic() - t0)
+                self._failed(exc)
+                if not is_retryable(exc):
+                    raise
+                delay = self.backoff(attempt)
+                if attempt + 1 < self.attempts and delay < self._budget(started):
+                    await asyncio.sleep(delay)
+                continue
+            self.stats.attempt_latency.observe(time.monotonic() - t0)
+            self.stats.call_latency.observe(time.monotonic() - started)
+            self.stats.count("successes")
+            self.breaker.record_success()
+            return result
+
+        self.breaker.record_failure()
+        self.stats.call_latency.observe(time.monotonic() - started)
+        return self._fallback(suspect, tier)
+
+    async def stream_async(self, open_stream, suspect: str = None, tier: int = None):
+        """
+        Async generator over open_stream() (a fresh async iterator per attempt).
+        Attempts are retried only until the first chunk arrives; after that
+        each chunk must arrive within `timeout`, and a stall ends the reply
+        early rather than repeating text the player already saw.
+        """
+        self.stats.count("calls")
+        if not self.breaker.allow():
+            self.stats.count("short_circuits")
+            yield self._fallback(suspect, tier)
+            return
+        settled = False
+        attempts = self._stream_async(open_stream, suspect, tier)
+        try:
+            async for chunk in attempts:
+                if chunk is _SETTLED:
+                    settled = True
+                else:
+                    yield chunk
+        finally:
+            await attempts.aclose()
+            # Cancelled, closed early (aclose(), a client disconnecting)
+            # or a non-retryable error: no verdict on the backend.
+            if not settled:
+                self.breaker.record_abandoned()
+
+    async def _stream_async(self, open_stream, suspect, tier):
+        """stream_async's attempts; yields _SETTLED once the breaker has the outcome."""
+        import asyncio
+
+        started = time.monotonic()
+        stream = first = None
+        for attempt in range(self.attempts):
+            budget = self._budget(started)
+            if budget <= 0:
+                break
+            if attempt:
+                self.stats.count("retries")
+            self.stats.count("attempts")
+            t0 = time.monotonic()
+            stream = open_stream()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), budget)
+            except StopAsyncIteration:
+                first = ""
+            except Exception as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    exc = TimeoutError(f"LLM stream exceeded {budget:.1f}s")
+                self.stats.attempt_latency.observe(time.monotonic() - t0)
+                self._failed(exc)
+                stream = None
+                if not is_retryable(exc):
+                    raise
+                delay = self.backoff(attempt)
+                if attempt + 1 < self.attempts and delay < self._budget(started):
+                    await asyncio.sleep(delay)
+                continue
+            break
+
+        if stream is None:
+            self.breaker.record_failure()
+            self.stats.call_latency.observe(time.monotonic() - started)
+            yield _SETTLED
+            yield self._fallback(suspect, tier)
+            return
+
+        if first:
+            yield first
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                exc = TimeoutError(f"LLM stream stalled for {self.timeout:.1f}s")
+            self._failed(exc)
+            self.breaker.record_failure()
+            self.stats.call_latency.observe(time.monotonic() - started)
+            yield _SETTLED
+            return
+
+        self.stats.attempt_latency.observe(time.monotonic() - t0)
+        self.stats.call_latency.observe(time.monotonic() - started)
+        self.stats.count("successes")
+        self.breaker.record_success()
+        yield _SETTLED
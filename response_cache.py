@@ -0,0 +1,168 @@
+# ============================================
+# response_cache.py
+# Handles:
+# - Prompt-keyed cache for LLM replies
+# - In-memory LRU eviction with optional TTL
+# - Optional on-disk (sqlite) backend that survives restarts
+# - Hit/miss counters
+# ============================================
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from suspects import MASTER_TEMPLATE
+
+# Any edit to the template changes this hash, which changes every key,
+# so replies generated from an older template are never served.
+TEMPLATE_HASH = hashlib.sha256(MASTER_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
+
+# --------------------------------------------
+# Cache key
+# --------------------------------------------
+def cache_key(model: str, prompt: str, backend: str = "") -> str:
+    """
+    Key for one LLM call. build_prompt is deterministic for a given
+    (suspect, tier, CT, question), so hashing the prompt covers all four.
+    `backend` names the client class, so stub replies never answer a
+    Gemini call (and the other way round).
+    """
+    h = hashlib.sha256()
+    for part in (backend, model, TEMPLATE_HASH, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# --------------------------------------------
+# Cache
+# --------------------------------------------
+class ResponseCache:
+    """
+    LRU cache of LLM replies.
+
+    max_entries: in-memory (and on-disk) capacity
+    ttl:         seconds an entry stays valid, None = forever
+    path:        sqlite file for persistence, None = memory only
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = None, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (stored_at, reply)
+        self._db = None
+
+    # ---- disk backend (opened on first use) ----
+    def _conn(self):
+        if self._db is None and self.path:
+            import sqlite3  # only needed once something is cached
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS replies ("
+                " key TEXT PRIMARY KEY, reply TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    # ---- public API ----
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached reply or None; counts a hit or a miss."""
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._memory[key]
+
+        db = self._conn()
+        if db is not None:
+            row = db.execute("SELECT reply, stored_at FROM replies WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                reply, stored_at = row
+                if not self._expired(stored_at, now):
+                    db.execute("UPDATE replies SET used_at = ? WHERE key = ?", (now, key))
+                    db.commit()
+                    self._remember(key, stored_at, reply)
+                    self.hits += 1
+                    return reply
+                db.execute("DELETE FROM replies WHERE key = ?", (key,))
+                db.commit()
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, reply: str):
+        """Stores a reply in memory and, if configured, on disk."""
+        now = time.time()
+        self._remember(key, now, reply)
+
+        db = self._conn()
+        if db is not None:
+            db.execute(
+                "INSERT OR REPLACE INTO replies (key, reply, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, reply, now, now),
+            )
+            # Evict least recently used rows beyond capacity
+            db.execute(
+                "DELETE FROM replies WHERE key IN ("
+                " SELECT key FROM replies ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+
+    def _remember(self, key: str, stored_at: float, reply: str):
+        self._memory[key] = (stored_at, reply)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drops every entry (memory and disk) and resets counters."""
+        self._memory.clear()
+        db = self._conn()
+        if db is not None:
+            db.execute("DELETE FROM replies")
+            db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._memory),
+        }
+
+
+# --------------------------------------------
+# Default cache, configured from the environment
+# --------------------------------------------
+def cache_from_env() -> Optional[ResponseCache]:
+    """
+    RESPONSE_CACHE=0 disables caching. The cache is in memory unless
+    RESPONSE_CACHE_PATH names a sqlite file to persist it in.
+    RESPONSE_CACHE_TTL / RESPONSE_CACHE_SIZE tune it.
+    """
+    if os.environ.get("RESPONSE_CACHE", "1") == "0":
+        return None
+    ttl = os.environ.get("RESPONSE_CACHE_TTL")
+    return ResponseCache(
+        max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "512")),
+        ttl=float(ttl) if ttl else None,
+        path=os.environ.get("RESPONSE_CACHE_PATH") or None,
+    )
@@ -0,0 +1,179 @@
+# ============================================
+# rule_engine.py
+# Handles:
+# - Compiling regex rule packs (e.g. CLUE_RULES) once
+# - Single-pass keyword prefilter over a reply
+# - Verifying only the candidate rules that could fire
+# - Plain-data matcher plans (stored precompiled in case packs)
+# ============================================
+#
+# How it works:
+# Every rule pattern contributes one "required literal" — a run of plain
+# characters that must appear in any text the pattern matches. All literals
+# are merged into a trie-shaped regex, so one finditer over the reply finds
+# every literal that occurs in it, at a cost that depends on the reply length
+# rather than the number of rules. Only patterns whose literal showed up are
+# then checked with their own compiled regex. Patterns without a usable
+# literal are always checked.
+
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+_LITERAL = sre_parse.LITERAL
+_MIN_LITERAL_LEN = 2
+
+
+# --------------------------------------------
+# Literal extraction
+# --------------------------------------------
+def required_literal(pattern: str) -> str:
+    """
+    Returns the longest run of literal characters that every match of
+    `pattern` must contain, or "" when there is none worth indexing.
+    Only top-level literals count; anything inside groups, classes,
+    repeats or alternations is treated as a gap.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return ""
+
+    best, run = "", []
+    for op, arg in parsed:
+        if op is _LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    if len(run) > len(best):
+        best = "".join(run)
+
+    return best if len(best) >= _MIN_LITERAL_LEN else ""
+
+
+# --------------------------------------------
+# Trie regex for a literal set
+# --------------------------------------------
+def _trie_pattern(words) -> str:
+    """
+    Builds a regex matching any of `words`, shaped as a trie so each
+    position costs at most one branch per character. Greedy optionals
+    make it report the LONGEST word starting at a position.
+    """
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+# --------------------------------------------
+# Matcher layout (plain data)
+# --------------------------------------------
+def build_plan(rule_patterns) -> dict:
+    """
+    Works out the matcher layout for a list of rules (each a list of regex
+    strings) as plain data — strings, ints, lists and dicts only — so it
+    can be stored precompiled (see case_pack.py) and loaded with
+    RuleEngine.from_plan() without redoing the literal analysis.
+    """
+    always = []            # [rule_idx, pattern] with no literal
+    by_literal = {}        # literal -> [[rule_idx, pattern]]
+
+    for idx, patterns in enumerate(rule_patterns):
+        for pat in patterns:
+            lit = required_literal(pat)
+            if lit:
+                by_literal.setdefault(lit, []).append([idx, pat])
+            else:
+                always.append([idx, pat])
+
+    literals = list(by_literal)
+
+    # Two literals can only match at the same position if one is a
+    # prefix of the other, and the trie reports the longest — so each
+    # hit also implies every literal that is a prefix of it.
+    implied = {
+        lit: [other for other in literals if lit.startswith(other)]
+        for lit in literals
+    }
+
+    return {
+        "rule_count": len(rule_patterns),
+        "always": always,
+        "by_literal": by_literal,
+        "implied": implied,
+        "scanner": "(?=(" + _trie_pattern(literals) + "))" if literals else None,
+    }
+
+
+# --------------------------------------------
+# Compiled rule engine
+# --------------------------------------------
+class RuleEngine:
+    """
+    Compiled matcher for a list of rules, each rule being a list of regex
+    strings. scan(text) returns the indices of rules with at least one
+    matching pattern.
+    """
+
+    def __init__(self, rule_patterns):
+        self._load(build_plan(rule_patterns))
+
+    @classmethod
+    def from_plan(cls, plan: dict):
+        """Builds the engine from a build_plan() result."""
+        engine = cls.__new__(cls)
+        engine._load(plan)
+        return engine
+
+    def _load(self, plan: dict):
+        self.rule_count = plan["rule_count"]
+        self._always = [(idx, re.compile(pat)) for idx, pat in plan["always"]]
+        self._by_literal = {
+            lit: [(idx, re.compile(pat)) for idx, pat in entries]
+            for lit, entries in plan["by_literal"].items()
+        }
+        self._implied = plan["implied"]
+        self._scanner = re.compile(plan["scanner"]) if plan["scanner"] else None
+
+    def scan(self, text: str) -> set:
+        """Returns the set of rule indices that fire on `text`."""
+        fired = set()
+
+        for idx, compiled in self._always:
+            if idx not in fired and compiled.search(text):
+                fired.add(idx)
+
+        if self._scanner is None:
+            return fired
+
+        checked = set()
+        for m in self._scanner.finditer(text):
+            for lit in self._implied[m.group(1)]:
+                if lit in checked:
+                    continue
+                checked.add(lit)
+                for idx, compiled in self._by_literal[lit]:
+                    if idx not in fired and compiled.search(text):
+                        fired.add(idx)
+
+        return fired
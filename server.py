@@ -0,0 +1,634 @@
+# ============================================
+# server.py
+# Handles:
+# - asyncio HTTP/1.1 (keep-alive) + WebSocket game server
+# - One GameSession per player, many players per process
+# - Many cases per process: each session plays the built-in case or a
+#   case pack (case_pack.py), loaded once and shared
+# - Menu actions as endpoints: interrogate, investigate, notes, accuse
+# - Streaming suspect replies over a WebSocket
+# - One shared LLM client for every session, with a global in-flight
+#   limit and a per-session concurrency limit
+# - Optional checkpoints (snapshot.py): with --snapshot-dir every session
+#   is saved after each turn / investigation (written by a background
+#   task, off the event loop) and restored on first use after a restart
+# - Optional transcript log of every turn (transcript_log.py,
+#   --transcript-log)
+#
+# Usage:
+#   python server.py --port 8080                 # Gemini (GOOGLE_API_KEY)
+#   LLM_BACKEND=stub python server.py --port 8080
+#   python server.py --batch 8 --rate-limit 50   # scheduled LLM calls
+#   python server.py --snapshot-dir snapshots    # survive restarts
+#   python server.py --transcript-log logs       # record every turn
+#
+# HTTP (JSON bodies):
+#   GET  /cases                                  -> available case packs
+#   POST /sessions                   {"case"?}   -> {"session_id", "case"}
+#   POST /sessions/<id>/interrogate  {"suspect", "message"}
+#   POST /sessions/<id>/investigate  {"area"}
+#   GET  /sessions/<id>/notes   ?category=&source=&since=&until=&page=&per_page=
+#   GET  /sessions/<id>/usage                    -> token/cost report
+#   POST /sessions/<id>/accuse       {"suspect"}
+#   GET  /metrics                                -> LLM latency/error stats
+#   GET  /metrics/prometheus                     -> stage timings + counters (--trace)
+# WebSocket:
+#   GET  /sessions/<id>/ws  then send {"action": "interrogate", ...} etc.
+#   Interrogations stream {"type": "chunk", "text"} frames, then
+#   {"type": "done", ...}.
+# ============================================
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import time
+import traceback
+import uuid
+
+import llm_backend
+import snapshot
+import tracing
+import transcript_log
+from game import finish_turn, prepare_turn
+from case_pack import available_cases, load_case
+from clues import PAGE_SIZE, page_slice
+from investigation_engine import area_names, examine
+from session import GameSession
+
+MAX_BODY = 64 * 1024
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+
+_REASONS = {
+    200: "OK", 101: "Switching Protocols", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 502: "Bad Gateway",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --------------------------------------------
+# Sessions
+# --------------------------------------------
+class ServerSession:
+    """A GameSession plus the server-side bits: limits and bookkeeping."""
+
+    __slots__ = ("state", "limit", "last_seen")
+
+    def __init__(self, session_id: str, per_session_limit: int, case=None, state=None):
+        self.state = state or GameSession(session_id, announce=False, case=case)
+        # Turns change the emotional tier, so by default a session runs
+        # one LLM turn at a time.
+        self.limit = asyncio.Semaphore(per_session_limit)
+        self.last_seen = time.monotonic()
+
+
+class GameServer:
+    """
+    Owns the session table and the shared LLM client.
+
+    max_inflight:      LLM calls in flight across all sessions
+    per_session_limit: LLM calls in flight per session
+    snapshot_dir:      directory for per-session checkpoints (None = off)
+    """
+
+    def __init__(self, llm=None, max_inflight: int = 64, per_session_limit: int = 1, snapshot_dir: str = None):
+        self.llm = llm
+        self.sessions = {}
+        self.per_session_limit = per_session_limit
+        self.inflight = asyncio.Semaphore(max_inflight)
+        self.snapshot_dir = snapshot_dir
+        self._unsaved = {}  # snapshot path -> encoded session, until written
+        self._writer = None
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    # ---- session table ----
+    def create_session(self, case_id: str = None) -> ServerSession:
+        """New session; case_id names a case pack under cases/ (None = built-in case)."""
+        case = None
+        if case_id:
+            # Only the installed packs: a client must not name files on the server.
+            if not isinstance(case_id, str) or case_id not in available_cases():
+                raise HTTPError(400, f"unknown case {case_id!r}; available: {available_cases()}")
+            try:
+                case = load_case(case_id)
+            except ValueError as exc:
+                raise HTTPError(400, str(exc).split("\n", 1)[0])
+        session_id = uuid.uuid4().hex
+        sess = ServerSession(session_id, self.per_session_limit, case)
+        self.sessions[session_id] = sess
+        self.checkpoint(sess)
+        return sess
+
+    def get_session(self, session_id: str) -> ServerSession:
+        sess = self.sessions.get(session_id) or self._restore(session_id)
+        if sess is None:
+            raise HTTPError(404, f"unknown session {session_id}")
+        sess.last_seen = time.monotonic()
+        return sess
+
+    # ---- checkpoints ----
+    def _snapshot_path(self, session_id: str):
+        # Session ids are uuid hex; anything else never reaches the disk.
+        if not self.snapshot_dir or not session_id.isalnum():
+            return None
+        return os.path.join(self.snapshot_dir, f"{session_id}.snap")
+
+    def checkpoint(self, sess: ServerSession):
+        """
+        Saves the session's state (no-op without a snapshot_dir). The
+        state is encoded here, where no turn can change it halfway; the
+        file is written by a background task in a worker thread so the
+        event loop does not wait on the disk. A session changed again
+        before its write starts is written once, with the latest state.
+        """
+        path = self._snapshot_path(sess.state.session_id)
+        if not path:
+            return
+        with tracing.span("checkpoint"):
+            data = snapshot.dumps(sess.state)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no event loop (scripts, tools): write it now
+            snapshot.write(path, data)
+            return
+        self._unsaved[path] = data
+        if self._writer is None:
+            self._writer = loop.create_task(self._write_checkpoints())
+
+    async def _write_checkpoints(self):
+        try:
+            while self._unsaved:
+                path, data = next(iter(self._unsaved.items()))
+                try:
+                    await asyncio.to_thread(snapshot.write, path, data)
+                except OSError:
+                    traceback.print_exc()
+                # Kept until written so _restore never reads a stale file.
+                if self._unsaved.get(path) is data:
+                    del self._unsaved[path]
+        finally:
+            self._writer = None
+
+    async def flush_checkpoints(self):
+        """Waits until every checkpoint taken so far is on disk."""
+        while self._writer is not None:
+            await asyncio.shield(self._writer)
+
+    def _restore(self, session_id: str):
+        """A session saved by an earlier run of the server, or None."""
+        path = self._snapshot_path(session_id)
+        if not path:
+            return None
+        try:
+            if path in self._unsaved:
+                state = snapshot.loads(self._unsaved[path])
+            elif os.path.exists(path):
+                state = snapshot.load(path)
+            else:
+                return None
+        except (OSError, ValueError):
+            return None
+        sess = self.sessions[session_id] = ServerSession(session_id, self.per_session_limit, state=state)
+        return sess
+
+    def expire_idle(self, max_idle: float) -> int:
+        """Drops sessions idle for more than max_idle seconds."""
+        cutoff = time.monotonic() - max_idle
+        stale = [sid for sid, s in self.sessions.items() if s.last_seen < cutoff]
+        for sid in stale:
+            del self.sessions[sid]
+        return len(stale)
+
+    # ---- actions ----
+    async def interrogate(self, sess: ServerSession, suspect: str, message: str, on_chunk=None) -> dict:
+        """
+        One interrogation turn. With on_chunk (an async callable) the reply
+        is streamed through it as it is generated.
+        """
+        state = sess.state
+        if suspect not in state.suspects:
+            raise HTTPError(400, f"unknown suspect {suspect!r}")
+        if not message:
+            raise HTTPError(400, "empty message")
+
+        async with sess.limit:
+            with tracing.span("turn", suspect=suspect):
+                t0 = time.perf_counter()
+                prompt, ct = prepare_turn(suspect, message, state)
+                tier = state.tiers[suspect]
+                before = len(state.notes)
+                t1 = time.perf_counter()
+
+                async with self.inflight:
+                    with tracing.span("llm"):
+                        if on_chunk is None:
+                            reply = await llm_backend.call_gemini_async(
+                                prompt, llm=self.llm, suspect=suspect, tier=tier, usage=state.usage
+                            )
+                        else:
+                            parts = []
+                            async for chunk in llm_backend.stream_gemini_async(
+                                prompt, llm=self.llm, suspect=suspect, tier=tier, usage=state.usage
+                            ):
+                                parts.append(chunk)
+                                await on_chunk(chunk)
+                            reply = "".join(parts)
+                t2 = time.perf_counter()
+
+                finish_turn(suspect, message, prompt, reply, ct, state, (t1 - t0) * 1e3, (t2 - t1) * 1e3)
+                self.checkpoint(sess)
+
+        return {
+            "suspect": suspect,
+            "ct": ct,
+            "tier": state.tiers[suspect],
+            "reply": reply,
+            "new_notes": _notes_json(state.notes[before:]),
+        }
+
+    def investigate(self, sess: ServerSession, area: str) -> dict:
+        state = sess.state
+        if area not in area_names(state):
+            raise HTTPError(400, f"unknown area {area!r}")
+        before = len(state.notes)
+        ok = examine(area, session=state)
+        self.checkpoint(sess)
+        return {
+            "area": area,
+            "ok": ok,
+            "new_notes": _notes_json(state.notes[before:]),
+            "unlocked": [a for a, on in state.unlocked.items() if on],
+        }
+
+    def notes(self, sess: ServerSession, query: dict = None) -> dict:
+        """
+        Notes, optionally filtered by category / source (suspect or area)
+        / since-until (µs timestamps) and paginated (page is 1-based).
+        """
+        query = query or {}
+        state = sess.state
+        category, source = _string(query, "category"), _string(query, "source")
+        try:
+            since, until, page, per_page = (
+                None if query.get(k) in (None, "") else int(query[k]) for k in ("since", "until", "page", "per_page")
+            )
+        except (TypeError, ValueError):
+            raise HTTPError(400, "since, until, page and per_page must be integers")
+        positions = state.catalog.query(category, source, since, until)
+        result = {"total": len(positions)}
+        if page is not None:
+            per_page = per_page or PAGE_SIZE
+            positions = positions[page_slice(len(positions), page, per_page)]
+            result.update(page=page, per_page=per_page)
+        result["notes"] = _notes_json(state.notes[i] for i in positions)
+        return result
+
+    def usage(self, sess: ServerSession) -> dict:
+        return sess.state.usage.report()
+
+    def accuse(self, sess: ServerSession, suspect: str) -> dict:
+        if suspect not in sess.state.suspects:
+            raise HTTPError(400, f"unknown suspect {suspect!r}")
+        killer = sess.state.killer
+        return {"accused": suspect, "correct": suspect == killer, "killer": killer}
+
+    async def dispatch(self, sess: ServerSession, action: str, body: dict, on_chunk=None) -> dict:
+        """Runs one menu action for a session."""
+        if action == "interrogate":
+            message = (_string(body, "message") or "").strip()
+            return await self.interrogate(sess, _string(body, "suspect"), message, on_chunk)
+        if action == "investigate":
+            return self.investigate(sess, _string(body, "area"))
+        if action == "notes":
+            return self.notes(sess, body)
+        if action == "usage":
+            return self.usage(sess)
+        if action == "accuse":
+            return self.accuse(sess, _string(body, "suspect"))
+        raise HTTPError(404, f"unknown action {action!r}")
+
+    # ---- connections ----
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as exc:  # malformed request: answer, then drop the connection
+                    _write_json(writer, exc.status, {"error": exc.message}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, path, headers)
+                    break
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_json(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, raw: bytes):
+        try:
+            parts = [p for p in path.split("?", 1)[0].split("/") if p]
+
+            if parts == ["metrics"]:
+                if method != "GET":
+                    raise HTTPError(405, "use GET")
+                return 200, {"sessions": len(self.sessions), **llm_backend.llm_metrics(), "trace": tracing.snapshot()}
+
+            if parts == ["metrics", "prometheus"]:
+                if method != "GET":
+                    raise HTTPError(405, "use GET")
+                return 200, tracing.render_prometheus()
+
+            if parts == ["cases"]:
+                if method != "GET":
+                    raise HTTPError(405, "use GET")
+                return 200, {"cases": available_cases()}
+
+            if parts == ["sessions"]:
+                if method != "POST":
+                    raise HTTPError(405, "use POST")
+                state = self.create_session(_parse_json(raw).get("case")).state
+                return 200, {"session_id": state.session_id, "case": state.case.case_id if state.case else None}
+
+            if len(parts) == 3 and parts[0] == "sessions":
+                sess = self.get_session(parts[1])
+                action = parts[2]
+                if (action in ("notes", "usage")) != (method == "GET"):
+                    raise HTTPError(405, "GET for notes/usage, POST for actions")
+                body = _query(path) if method == "GET" else _parse_json(raw)
+                return 200, await self.dispatch(sess, action, body)
+
+            raise HTTPError(404, "not found")
+        except HTTPError as exc:
+            return exc.status, {"error": exc.message}
+        except RuntimeError as exc:  # LLM backend not configured / failed
+            return 502, {"error": str(exc)}
+        except Exception:  # a bug: log it and answer, the server keeps going
+            traceback.print_exc()
+            return 500, {"error": "internal server error"}
+
+    async def _websocket(self, reader, writer, path: str, headers: dict):
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        key = headers.get("sec-websocket-key")
+        if len(parts) != 3 or parts[0] != "sessions" or parts[2] != "ws" or not key:
+            _write_json(writer, 400, {"error": "bad websocket request"}, keep_alive=False)
+            return
+        try:
+            sess = self.get_session(parts[1])
+        except HTTPError as exc:
+            _write_json(writer, exc.status, {"error": exc.message}, keep_alive=False)
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        async def send(obj):
+            writer.write(ws_frame(json.dumps(obj).encode("utf-8")))
+            await writer.drain()
+
+        async def on_chunk(text):
+            await send({"type": "chunk", "text": text})
+
+        while True:
+            opcode, payload = await ws_read_frame(reader)
+            if opcode == 0x8:  # close
+                writer.write(ws_frame(b"", opcode=0x8))
+                await writer.drain()
+                return
+            if opcode == 0x9:  # ping
+                writer.write(ws_frame(payload, opcode=0xA))
+                await writer.drain()
+                continue
+            if opcode != 0x1:
+                continue
+
+            try:
+                msg = _parse_json(payload)
+                result = await self.dispatch(sess, _string(msg, "action") or "", msg, on_chunk)
+                await send({"type": "done", **result})
+            except HTTPError as exc:
+                await send({"type": "error", "status": exc.status, "error": exc.message})
+            except RuntimeError as exc:
+                await send({"type": "error", "status": 502, "error": str(exc)})
+            except Exception:  # a bug: log it, tell the client and close (1011 = internal error)
+                traceback.print_exc()
+                await send({"type": "error", "status": 500, "error": "internal server error"})
+                writer.write(ws_frame(struct.pack("!H", 1011), opcode=0x8))
+                await writer.drain()
+                return
+
+
+# --------------------------------------------
+# HTTP helpers
+# --------------------------------------------
+def _notes_json(notes) -> list:
+    return [{"text": n.text, "category": n.category, "source": n.source, "ts": n.ts} for n in notes]
+
+
+def _query(path: str) -> dict:
+    from urllib.parse import parse_qsl
+
+    return dict(parse_qsl(path.partition("?")[2]))
+
+
+def _string(body: dict, key: str):
+    """body[key] if it is a string (or missing: None); otherwise a 400."""
+    value = body.get(key)
+    if value is not None and not isinstance(value, str):
+        raise HTTPError(400, f"{key} must be a string")
+    return value
+
+
+def _parse_json(raw: bytes) -> dict:
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise HTTPError(400, "body is not valid JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return data
+
+
+async def _read_request(reader):
+    """
+    Returns (method, path, headers, body) or None at end of stream.
+    Raises HTTPError for a malformed or oversized request.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    request_line = lines[0].split(" ")
+    if len(request_line) != 3 or not request_line[1].startswith("/"):
+        raise HTTPError(400, "malformed request line")
+    method, path, _ = request_line
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length")
+    if length < 0:
+        raise HTTPError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _write_json(writer, status: int, payload, keep_alive: bool = True):
+    """Writes a JSON response; a str payload (Prometheus text) is sent as plain text."""
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+        + body
+    )
+
+
+# --------------------------------------------
+# WebSocket framing (RFC 6455, no extensions)
+# --------------------------------------------
+def ws_frame(payload: bytes, opcode: int = 0x1, mask: bool = False) -> bytes:
+    """One FIN frame. Servers send unmasked frames, clients masked ones."""
+    head = bytes([0x80 | opcode])
+    n = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([mask_bit | n])
+    elif n < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", n)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", n)
+
+    if not mask:
+        return head + payload
+    key = uuid.uuid4().bytes[:4]
+    return head + key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+
+async def ws_read_frame(reader):
+    """Reads one frame; returns (opcode, payload). Fragments are joined."""
+    payload = b""
+    while True:
+        b0, b1 = await reader.readexactly(2)
+        opcode = b0 & 0x0F
+        n = b1 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if n > MAX_BODY:
+            raise ConnectionError("websocket frame too large")
+        key = await reader.readexactly(4) if b1 & 0x80 else None
+        data = await reader.readexactly(n)
+        if key:
+            data = bytes(b ^ key[i % 4] for i, b in enumerate(data))
+        payload += data
+        if b0 & 0x80:
+            return opcode, payload
+
+
+# --------------------------------------------
+# Entry point
+# --------------------------------------------
+async def serve(host: str = "127.0.0.1", port: int = 8080, server: GameServer = None, idle_timeout: float = 3600):
+    """Runs the server until cancelled."""
+    server = server or GameServer()
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+
+    async def reap():
+        while True:
+            await asyncio.sleep(60)
+            server.expire_idle(idle_timeout)
+
+    reaper = asyncio.create_task(reap())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        reaper.cancel()
+        await server.flush_checkpoints()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Murder mystery game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-inflight", type=int, default=64, help="LLM calls in flight, all sessions")
+    parser.add_argument("--per-session", type=int, default=1, help="LLM calls in flight per session")
+    parser.add_argument("--batch", type=int, default=0, help="micro-batch size for the LLM scheduler (0 = off)")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="seconds to wait while filling a batch")
+    parser.add_argument("--rate-limit", type=float, default=None, help="LLM requests per second, all sessions")
+    parser.add_argument("--trace", action="store_true", help="collect per-stage timings and counters")
+    parser.add_argument("--trace-jsonl", help="also append every span to this JSONL file (implies --trace)")
+    parser.add_argument("--snapshot-dir", help="checkpoint every session here and restore them after a restart")
+    parser.add_argument("--transcript-log", help="append every turn to a transcript log in this directory")
+    args = parser.parse_args(argv)
+
+    if args.transcript_log:
+        transcript_log.enable(args.transcript_log)
+
+    if args.trace or args.trace_jsonl:
+        tracing.enable(args.trace_jsonl)
+    if args.batch or args.rate_limit:
+        llm_backend.enable_scheduler(max_batch=args.batch or 1, max_delay=args.batch_delay, rate=args.rate_limit)
+
+    async def run():
+        server = GameServer(
+            max_inflight=args.max_inflight, per_session_limit=args.per_session, snapshot_dir=args.snapshot_dir
+        )
+        print(f"Serving on http://{args.host}:{args.port}")
+        await serve(args.host, args.port, server)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# ============================================
+# session.py
+# Handles:
+# - Per-player game state (one object per session)
+#   * emotional tier per suspect
+#   * collected notes + dedup indexes (exact and near-duplicate) and
+#     query indexes (category, source, time; clues.NoteCatalog)
+#   * investigation progress (evidence_graph.EvidenceState)
+#   * claims made by suspects and contradictions found in them
+#     (contradictions.ContradictionDetector)
+#   * conversation memory per suspect
+#   * token usage ledger
+#   * the case being played (a case_pack.CasePack, or the built-in case)
+# - The default session used by the console game
+# ============================================
+
+from clues import NoteCatalog
+from contradictions import ContradictionDetector
+from conversation_memory import ConversationMemory
+from evidence_graph import EvidenceGraph, EvidenceState
+from near_duplicates import NearDuplicateIndex
+from prompt_profiler import UsageLedger
+from suspects import SUSPECTS
+
+# The built-in case's investigation areas (menu order) and what unlocks
+# them; case packs carry their own graph.
+EVIDENCE_GRAPH = EvidenceGraph({
+    "footprints": {"label": "Footprints"},
+    "laptop": {"label": "Laptop"},
+    "window": {"label": "Window"},
+    "coffee_mug": {"label": "Coffee Mug"},
+    "photo_frame": {"label": "Photo Frame"},
+    "clinic_room": {"label": "Clinic Room Sweep"},
+    "drawer": {"label": "Office Drawer", "requires": ["photo_frame"]},
+    "usb_port": {"label": "USB Port Examination", "requires": ["laptop"]},
+    "corridor_camera": {"label": "Corridor Camera Check", "requires": ["footprints"]},
+})
+
+# Investigation areas that start locked and are unlocked by other evidence.
+LOCKED_AREAS = EVIDENCE_GRAPH.locked
+
+
+class GameSession:
+    """
+    Everything that changes while one player plays. The engines take a
+    `session` argument and fall back to DEFAULT_SESSION (the console game)
+    when none is given, so one process can host many sessions.
+
+    announce: print clue / unlock notifications (off for servers and
+    headless runs).
+    case: a case_pack.CasePack; None plays the built-in clinic case.
+    """
+
+    __slots__ = (
+        "session_id", "tiers", "notes", "note_index", "near_dups", "catalog", "evidence", "unlocked", "memories",
+        "usage", "announce", "case", "contradictions"
+    )
+
+    def __init__(self, session_id: str = "", announce: bool = True, case=None):
+        self.session_id = session_id
+        self.case = case
+        self.tiers = dict.fromkeys(self.suspects, 0)
+        # clues.Note entries (text, category, integer timestamp)
+        self.notes = []
+        # Normalized note texts, kept in sync with `notes` by notes_engine
+        self.note_index = set()
+        # Paraphrase detection; ids are positions in `notes`
+        self.near_dups = NearDuplicateIndex(anchor_words=self.suspects)
+        # Category / source / time indexes and rendered lines of `notes`
+        self.catalog = NoteCatalog(self.notes)
+        self.evidence = EvidenceState(self.evidence_graph)
+        # {locked area: bool}, maintained by `evidence`
+        self.unlocked = self.evidence.unlocked
+        # suspect -> ConversationMemory, created on the first question
+        self.memories = {}
+        # Claims from replies and facts from findings, indexed by time
+        self.contradictions = ContradictionDetector(self.suspects)
+        self.usage = UsageLedger()
+        self.announce = announce
+
+    @property
+    def suspects(self) -> dict:
+        """Suspect profiles of the case being played."""
+        return SUSPECTS if self.case is None else self.case.suspects
+
+    @property
+    def evidence_graph(self) -> EvidenceGraph:
+        """Investigation areas and unlock conditions of the case."""
+        return EVIDENCE_GRAPH if self.case is None else self.case.evidence_graph
+
+    @property
+    def killer(self) -> str:
+        if self.case is not None:
+            return self.case.killer
+        return next(s for s in SUSPECTS if SUSPECTS[s]["is_killer"])
+
+    def memory(self, suspect: str) -> ConversationMemory:
+        """What `suspect` remembers of this interrogation."""
+        mem = self.memories.get(suspect)
+        if mem is None:
+            mem = self.memories[suspect] = ConversationMemory()
+        return mem
+
+    def reset(self):
+        """Back to a fresh game, keeping the same id (and object identities)."""
+        self.tiers.update(dict.fromkeys(self.suspects, 0))
+        self.notes.clear()
+        self.note_index.clear()
+        self.near_dups.clear()
+        self.catalog.clear()
+        self.evidence.reset()
+        self.memories.clear()
+        self.contradictions.clear()
+        self.usage.clear()
+
+    def __repr__(self):
+        return f"GameSession({self.session_id!r}, notes={len(self.notes)})"
+
+
+# The console game's session; module-level aliases (game.suspect_state,
+# notes_engine.NOTES, investigation_engine.UNLOCKED) point into it.
+DEFAULT_SESSION = GameSession("console")
@@ -0,0 +1,274 @@
+# ============================================
+# snapshot.py
+# Handles:
+# - Saving GameSessions to bytes / files and restoring them
+#   * emotional tiers, notes, investigation progress, conversation
+#     memory, token ledger, the case being played
+# - A compact, versioned binary format
+#   * every string (note texts, categories, names, areas) stored once in
+#     a string table and referenced by index
+#   * notes stored as columns (text, category, timestamp, source arrays)
+#   * suspects' claims (contradictions.Claim) stored as one integer array
+# - Bulk files holding many sessions with one shared string table
+#
+# Usage:
+#   data = snapshot.dumps(session); session = snapshot.loads(data)
+#   snapshot.save(session, "s.snap"); snapshot.load("s.snap")
+#   snapshot.write("s.snap", snapshot.dumps(session))  # encode now, write later
+#   snapshot.save_many(sessions, "all.snap"); snapshot.load_many("all.snap")
+# ============================================
+#
+# File layout:
+#   b"GSNAP" | version (1 byte) | flags (1 byte) | body
+# body is marshal.dumps((strings, records)), zlib-compressed if flags & 1.
+# marshal only ever sees tuples, ints, str and bytes (the integer arrays),
+# so loading a snapshot cannot run code. Restoring rebuilds the derived
+# state (dedup indexes, near-duplicate index, unlock counters, evidence
+# facts) from the saved notes and examined areas instead of storing it.
+# Version 2 added note sources, version 3 claims.
+
+import marshal
+import os
+import sys
+import zlib
+from array import array
+
+from clues import Note
+from contradictions import Claim
+from conversation_memory import ConversationMemory
+from notes_engine import load_notes
+from session import GameSession
+
+# 2 added the note source column; version 1 snapshots still load (notes
+# without a source).
+FORMAT_VERSION = 3
+_READABLE_VERSIONS = (1, 2, 3)
+_MAGIC = b"GSNAP"
+_COMPRESSED = 1
+
+# Compression costs ~10-20% more time per write and roughly halves the
+# size; on by default.
+COMPRESS = True
+
+# UsageLedger counters, in record order.
+_USAGE_FIELDS = ("turns", "est_prompt", "est_output", "requests", "prompt", "cached", "output")
+
+
+# --------------------------------------------
+# Integer arrays (little-endian on disk)
+# --------------------------------------------
+def _pack(typecode: str, values) -> bytes:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+# --------------------------------------------
+# Encoding
+# --------------------------------------------
+class _StringTable:
+    """Assigns each distinct string an index, in first-seen order."""
+
+    __slots__ = ("index",)
+
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, text: str) -> int:
+        i = self.index.get(text)
+        if i is None:
+            i = self.index[text] = len(self.index)
+        return i
+
+    def strings(self) -> tuple:
+        return tuple(self.index)
+
+
+def _record(session: GameSession, intern) -> tuple:
+    notes = session.notes
+    evidence = session.evidence
+
+    memories = []
+    for name, mem in session.memories.items():
+        recent = [intern(text) for turn in mem.recent for text in turn]
+        memories.append((intern(name), intern(mem.current_summary()), mem.turns, _pack("I", recent)))
+
+    usage = session.usage
+    by_suspect = [v for name, (turns, tokens) in usage.by_suspect.items() for v in (intern(name), turns, tokens)]
+
+    return (
+        session.session_id,
+        None if session.case is None else session.case.case_id,
+        _pack("I", [v for name, tier in session.tiers.items() for v in (intern(name), tier)]),
+        _pack("I", [intern(n.text) for n in notes]),
+        _pack("I", [intern(n.category) for n in notes]),
+        _pack("q", [n.ts for n in notes]),
+        _pack("I", [intern(area) for area in evidence.graph.areas if area in evidence.examined]),
+        tuple(memories),
+        _pack("q", [getattr(usage, field) for field in _USAGE_FIELDS]),
+        _pack("q", by_suspect),
+        _pack("I", [intern(n.source) for n in notes]),
+        _pack("q", [v for claim in session.contradictions.export_claims() for v in _claim_row(claim, intern)]),
+    )
+
+
+def _claim_row(claim: Claim, intern) -> tuple:
+    return (
+        intern(claim.suspect), intern(claim.subject), claim.present, intern(claim.place or ""),
+        intern(claim.obj or ""), claim.start, claim.end, claim.timed, intern(claim.quote),
+    )
+
+
+def dumps_many(sessions, compress: bool = None) -> bytes:
+    """Snapshot of several sessions sharing one string table."""
+    compress = COMPRESS if compress is None else compress
+    intern = _StringTable()
+    records = tuple(_record(s, intern) for s in sessions)
+    body = marshal.dumps((intern.strings(), records))
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= _COMPRESSED
+    return _MAGIC + bytes((FORMAT_VERSION, flags)) + body
+
+
+def dumps(session: GameSession, compress: bool = None) -> bytes:
+    """Snapshot of one session."""
+    return dumps_many((session,), compress)
+
+
+# --------------------------------------------
+# Decoding
+# --------------------------------------------
+def _restore(record: tuple, strings: tuple, announce: bool, cases: dict) -> GameSession:
+    (session_id, case_id, tiers, note_texts, note_cats, note_times,
+     examined, memories, usage_values, by_suspect, *rest) = record
+    note_sources = _unpack("I", rest[0]) if rest else None  # version 1: no sources
+    claims = _unpack("q", rest[1]) if len(rest) > 1 else ()  # version 3
+
+    case = None
+    if case_id is not None:
+        case = cases.get(case_id)
+        if case is None:
+            from case_pack import load_case
+            case = cases[case_id] = load_case(case_id)
+
+    session = GameSession(session_id, announce=announce, case=case)
+
+    tiers = _unpack("I", tiers)
+    for i in range(0, len(tiers), 2):
+        name = strings[tiers[i]]
+        if name not in session.tiers:
+            raise ValueError(f"snapshot of {session_id!r}: unknown suspect {name!r} for this case")
+        session.tiers[name] = tiers[i + 1]
+
+    note_texts = _unpack("I", note_texts)
+    sources = [strings[i] for i in note_sources] if note_sources is not None else [""] * len(note_texts)
+    load_notes(
+        (
+            Note(strings[t], strings[c], ts, src)
+            for t, c, ts, src in zip(note_texts, _unpack("I", note_cats), _unpack("q", note_times), sources)
+        ),
+        session=session,
+    )
+
+    for i in _unpack("I", examined):
+        area = strings[i]
+        if area not in session.evidence_graph.index:
+            raise ValueError(f"snapshot of {session_id!r}: unknown area {area!r} for this case")
+        session.evidence.mark_examined(area)
+
+    for name, summary, turns, recent in memories:
+        mem = session.memories[strings[name]] = ConversationMemory()
+        texts = [strings[i] for i in _unpack("I", recent)]
+        mem.recent.extend(zip(texts[::2], texts[1::2]))
+        mem.summary = strings[summary]
+        mem.turns = turns
+
+    usage = session.usage
+    for field, value in zip(_USAGE_FIELDS, _unpack("q", usage_values)):
+        setattr(usage, field, value)
+    by_suspect = _unpack("q", by_suspect)
+    for i in range(0, len(by_suspect), 3):
+        usage.by_suspect[strings[by_suspect[i]]] = [by_suspect[i + 1], by_suspect[i + 2]]
+
+    session.contradictions.add_claims(
+        (
+            Claim(strings[claims[i]], strings[claims[i + 1]], bool(claims[i + 2]), strings[claims[i + 3]] or None,
+                  strings[claims[i + 4]] or None, claims[i + 5], claims[i + 6], bool(claims[i + 7]),
+                  strings[claims[i + 8]])
+            for i in range(0, len(claims), 9)
+        ),
+        check=False,
+    )
+    return session
+
+
+def loads_many(data: bytes, announce: bool = False) -> list:
+    """Sessions from a dumps_many() snapshot. Raises ValueError if it is not one."""
+    header = len(_MAGIC) + 2
+    if data[:len(_MAGIC)] != _MAGIC or len(data) < header:
+        raise ValueError("not a session snapshot")
+    version, flags = data[len(_MAGIC)], data[len(_MAGIC) + 1]
+    if version not in _READABLE_VERSIONS:
+        raise ValueError(f"unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+    body = data[header:]
+    try:
+        if flags & _COMPRESSED:
+            body = zlib.decompress(body)
+        strings, records = marshal.loads(body)
+    except (zlib.error, EOFError, ValueError, TypeError) as exc:
+        raise ValueError(f"corrupt session snapshot: {exc}")
+    cases = {}
+    return [_restore(record, strings, announce, cases) for record in records]
+
+
+def loads(data: bytes, announce: bool = False) -> GameSession:
+    """One session from a dumps() snapshot."""
+    sessions = loads_many(data, announce)
+    if len(sessions) != 1:
+        raise ValueError(f"expected one session, snapshot holds {len(sessions)}")
+    return sessions[0]
+
+
+# --------------------------------------------
+# Files
+# --------------------------------------------
+def _write(path, data: bytes):
+    """Atomic write: readers see the old snapshot or the new one, never half."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def save(session: GameSession, path):
+    _write(path, dumps(session))
+
+
+def write(path, data: bytes):
+    """Writes a snapshot encoded by dumps() / dumps_many() to path."""
+    _write(path, data)
+
+
+def load(path, announce: bool = False) -> GameSession:
+    with open(path, "rb") as fh:
+        return loads(fh.read(), announce)
+
+
+def save_many(sessions, path):
+    _write(path, dumps_many(sessions))
+
+
+def load_many(path, announce: bool = False) -> list:
+    with open(path, "rb") as fh:
+        return loads_many(fh.read(), announce)
@@ -0,0 +1,212 @@
+# ============================================
+# stub_llm.py
+# Local stand-in for the google-genai client:
+# - same call surface as genai.Client (models / aio.models)
+# - deterministic in-character replies, no network
+# - streaming (chunked) replies like generate_content_stream
+# - context caching (caches.create / aio.caches.create + cached_content config)
+# - usage_metadata with estimated token counts
+# - injectable latency for concurrency and load testing
+# ============================================
+
+import asyncio
+import hashlib
+import re
+import time
+
+from conversation_memory import estimate_tokens
+
+# Canned lines per suspect; the prompt hash picks one so the same prompt
+# always gets the same reply.
+STUB_LINES = {
+    "Nisha": [
+        "I was at home that night, I swear. I only drove past near the clinic once.",
+        "Arjun and I argued, yes, but I loved him. Please stop asking me that.",
+        "I panicked when I heard. I didn't tell the truth about the loan papers.",
+    ],
+    "Kabir": [
+        "I left at ten. Well, I went back to the clinic around 11:25, but he was already on the floor.",
+        "The CCTV was down that night, everyone in admin knew it.",
+        "The audit was routine. We argued, but that's not a reason to kill a man.",
+    ],
+    "Rohit": [
+        "I was in the ward until 11:00 and then I went home. It's all in the duty log.",
+        "I never touched his laptop. Someone must have used my login.",
+        "That's not what I said. You misunderstood me, detective.",
+    ],
+}
+
+_DEFAULT_LINES = ["I have nothing more to say about that."]
+_NAME_RE = re.compile(r"Now respond as (\w+)")
+
+
+def stub_reply(prompt: str) -> str:
+    """Deterministic reply for a prompt, chosen by suspect and prompt hash."""
+    m = _NAME_RE.search(prompt)
+    lines = STUB_LINES.get(m.group(1), _DEFAULT_LINES) if m else _DEFAULT_LINES
+    digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=4).digest()
+    return lines[int.from_bytes(digest, "big") % len(lines)]
+
+
+def stub_chunks(text: str, words_per_chunk: int = 3) -> list:
+    """Splits a reply into word-group chunks, the way a stream arrives."""
+    words = text.split(" ")
+    return [
+        " ".join(words[i:i + words_per_chunk]) + (" " if i + words_per_chunk < len(words) else "")
+        for i in range(0, len(words), words_per_chunk)
+    ]
+
+
+def _config_value(config, name: str):
+    """Reads a field from a dict or a typed SDK config object."""
+    if config is None:
+        return None
+    if isinstance(config, dict):
+        return config.get(name)
+    return getattr(config, name, None)
+
+
+class StubUsage:
+    """Mimics genai usage_metadata, with estimated token counts."""
+
+    def __init__(self, prompt: str, cached: int, output: str):
+        self.prompt_token_count = estimate_tokens(prompt)
+        self.cached_content_token_count = estimate_tokens(prompt[:cached]) if cached else None
+        self.candidates_token_count = estimate_tokens(output)
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class StubResponse:
+    """Mimics `.text` and `.usage_metadata` of a genai GenerateContentResponse."""
+
+    def __init__(self, text: str, usage_metadata: StubUsage = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _cached_chars(contents, prompt: str) -> int:
+    """How much of the full prompt came from a cached context."""
+    return len(prompt) - len(str(contents))
+
+
+class StubCachedContent:
+    """Mimics the `.name` of a genai CachedContent."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _StubCaches:
+    """client.caches.create(...) — remembers contents under a name."""
+
+    def __init__(self, owner):
+        self._owner = owner
+        self.store = {}
+
+    def create(self, model: str, config=None) -> StubCachedContent:
+        contents = _config_value(config, "contents") or []
+        name = f"cachedContents/stub-{len(self.store) + 1}"
+        self.store[name] = "".join(str(c) for c in contents)
+        return StubCachedContent(name)
+
+
+class _StubAsyncCaches:
+    """client.aio.caches.create(...) — same store as client.caches."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def create(self, model: str, config=None) -> StubCachedContent:
+        return self._owner.caches.create(model, config)
+
+
+class _StubModels:
+    """Blocking surface: client.models.generate_content(...)."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model: str, contents, config=None) -> StubResponse:
+        prompt = self._owner.receive(contents, config)
+        text = stub_reply(prompt)
+        delay = self._owner.total_delay(text)
+        if delay:
+            time.sleep(delay)
+        return StubResponse(text, StubUsage(prompt, _cached_chars(contents, prompt), text))
+
+    def generate_content_stream(self, model: str, contents, config=None):
+        prompt = self._owner.receive(contents, config)
+        text = stub_reply(prompt)
+        if self._owner.latency:
+            time.sleep(self._owner.latency)
+        chunks = stub_chunks(text)
+        for i, chunk in enumerate(chunks):
+            if self._owner.chunk_delay:
+                time.sleep(self._owner.chunk_delay)
+            last = i == len(chunks) - 1
+            yield StubResponse(chunk, StubUsage(prompt, _cached_chars(contents, prompt), text) if last else None)
+
+
+class _StubAsyncModels:
+    """Async surface: await client.aio.models.generate_content(...)."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model: str, contents, config=None) -> StubResponse:
+        prompt = self._owner.receive(contents, config)
+        text = stub_reply(prompt)
+        delay = self._owner.total_delay(text)
+        if delay:
+            await asyncio.sleep(delay)
+        return StubResponse(text, StubUsage(prompt, _cached_chars(contents, prompt), text))
+
+    async def generate_content_stream(self, model: str, contents, config=None):
+        prompt = self._owner.receive(contents, config)
+        text = stub_reply(prompt)
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        chunks = stub_chunks(text)
+        for i, chunk in enumerate(chunks):
+            if self._owner.chunk_delay:
+                await asyncio.sleep(self._owner.chunk_delay)
+            last = i == len(chunks) - 1
+            yield StubResponse(chunk, StubUsage(prompt, _cached_chars(contents, prompt), text) if last else None)
+
+
+class _StubAio:
+    def __init__(self, owner):
+        self.models = _StubAsyncModels(owner)
+        self.caches = _StubAsyncCaches(owner)
+
+
+class StubClient:
+    """
+    Drop-in replacement for genai.Client in tests and benchmarks.
+    `latency` is the simulated seconds before the first token and
+    `chunk_delay` the seconds per streamed chunk; a non-streaming call
+    waits for the whole reply.
+    """
+
+    def __init__(self, latency: float = 0.0, chunk_delay: float = 0.0):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.sent_chars = 0  # prompt characters billed as input
+        self.caches = _StubCaches(self)
+        self.models = _StubModels(self)
+        self.aio = _StubAio(self)
+
+    def receive(self, contents, config) -> str:
+        """Counts one request and returns the full prompt it stands for."""
+        self.calls += 1
+        text = str(contents)
+        self.sent_chars += len(text)
+        cached = _config_value(config, "cached_content")
+        if cached:
+            text = self.caches.store[cached] + text
+        return text
+
+    def total_delay(self, text: str) -> float:
+        """Seconds a non-streaming call takes to produce `text`."""
+        return self.latency + self.chunk_delay * len(stub_chunks(text))
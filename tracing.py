@@ -0,0 +1,212 @@
+# ============================================
+# tracing.py
+# Handles:
+# - Opt-in instrumentation of the turn pipeline
+#   * spans with durations per stage (nested, asyncio-safe)
+#   * counters (confrontation types, fired clue rules, ...)
+# - Exporters: JSONL span log, Prometheus text format
+#
+# Off by default. TRACE=1 turns it on at startup (TRACE_JSONL=<path>
+# also writes every span to a file); enable()/disable() at runtime.
+# ============================================
+#
+# When disabled, span() returns one shared no-op context manager and the
+# call sites guard counters with `if tracing.ENABLED:`, so the pipeline
+# pays a function call per stage and nothing else
+# (see benchmarks/bench_tracing.py).
+
+import contextvars
+import itertools
+import os
+import time
+
+from resilience import LatencyHistogram
+
+ENABLED = os.environ.get("TRACE", "0") == "1"
+
+# Finer than the LLM latency buckets: engine stages take microseconds.
+STAGE_BOUNDS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+_current = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+
+STAGES = {}     # span name -> LatencyHistogram
+COUNTERS = {}   # (metric, ((label, value), ...)) -> int
+EXPORTERS = []  # callables receiving each finished Span
+
+
+# --------------------------------------------
+# Spans
+# --------------------------------------------
+class Span:
+    """One timed stage; `parent` is the enclosing span's id (0 = root)."""
+
+    __slots__ = ("name", "span_id", "trace_id", "parent", "start", "duration", "attrs", "_token", "_t0")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_ids)
+        self.duration = 0.0
+
+    def __enter__(self):
+        parent = _current.get()
+        self.parent = parent.span_id if parent else 0
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.start = time.time()
+        self._token = _current.set(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _finish(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "ms": round(self.duration * 1e3, 4),
+            **self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs):
+    """`with span("build_prompt"):` times a stage when tracing is on."""
+    if not ENABLED:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def _finish(s: Span):
+    hist = STAGES.get(s.name)
+    if hist is None:
+        hist = STAGES[s.name] = LatencyHistogram(STAGE_BOUNDS)
+    hist.observe(s.duration)
+    for export in EXPORTERS:
+        export(s)
+
+
+# --------------------------------------------
+# Counters
+# --------------------------------------------
+def count(metric: str, n: int = 1, **labels):
+    """Adds n to a counter; call sites check ENABLED first."""
+    key = (metric, tuple(sorted(labels.items())))
+    COUNTERS[key] = COUNTERS.get(key, 0) + n
+
+
+# --------------------------------------------
+# Exporters
+# --------------------------------------------
+class JsonlExporter:
+    """Appends one JSON object per finished span to `path`."""
+
+    def __init__(self, path: str):
+        import json
+
+        self._dumps = json.dumps
+        # Line-buffered so spans survive the process being killed.
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def __call__(self, s: Span):
+        self._file.write(self._dumps(s.to_dict()) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render_prometheus() -> str:
+    """Stage histograms and counters in the Prometheus text exposition format."""
+    lines = [
+        "# HELP mystery_stage_seconds Duration of turn pipeline stages.",
+        "# TYPE mystery_stage_seconds histogram",
+    ]
+    for name, hist in sorted(STAGES.items()):
+        cumulative = 0
+        for bound, n in zip(hist.BOUNDS, hist.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'mystery_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'mystery_stage_seconds_sum{{stage="{name}"}} {hist.sum:.9f}')
+        lines.append(f'mystery_stage_seconds_count{{stage="{name}"}} {hist.total}')
+
+    declared = set()
+    for (metric, labels), value in sorted(COUNTERS.items()):
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f"# TYPE mystery_{metric}_total counter")
+        lines.append(f"mystery_{metric}_total{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> dict:
+    """Stage latency summaries and counters as plain data."""
+    return {
+        "stages": {name: hist.snapshot() for name, hist in STAGES.items()},
+        "counters": {metric + _labels(labels): value for (metric, labels), value in COUNTERS.items()},
+    }
+
+
+# --------------------------------------------
+# On / off
+# --------------------------------------------
+def enable(jsonl_path: str = None):
+    """Turns tracing on; optionally logs every span to a JSONL file."""
+    global ENABLED
+    ENABLED = True
+    if jsonl_path:
+        EXPORTERS.append(JsonlExporter(jsonl_path))
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+    for export in EXPORTERS:
+        if hasattr(export, "close"):
+            export.close()
+    EXPORTERS.clear()
+
+
+def reset():
+    """Forgets collected stage timings and counters."""
+    STAGES.clear()
+    COUNTERS.clear()
+
+
+if ENABLED and os.environ.get("TRACE_JSONL"):
+    EXPORTERS.append(JsonlExporter(os.environ["TRACE_JSONL"]))
@@ -0,0 +1,554 @@
+# ============================================
+# transcript_log.py
+# Handles:
+# - An append-only log of interrogation turns
+#   * session, suspect, case, tier, CT, prompt hash, question, reply,
+#     fired clue rules, engine / LLM timings
+# - Segment files, rolled over at SEGMENT_BYTES, one writer per process
+# - Index by session and suspect (saved next to each sealed segment)
+# - Memory-mapped replay: records are decoded one at a time straight
+#   from the mapped segment, so a scan never loads the log into RAM
+# - CLI: stats / show / replay (re-runs detect_notes over logged replies
+#   and reports which turns fire different rules with the current ones)
+#
+# Off by default. TRANSCRIPT_LOG=<dir> turns it on at startup;
+# enable()/disable() at runtime.
+#
+# Usage:
+#   python transcript_log.py stats logs/
+#   python transcript_log.py show logs/ --session s1 --suspect Rohit
+#   python transcript_log.py replay logs/ [--case clinic]
+# ============================================
+#
+# Segment layout (<writer>-<seq>.seg):
+#   b"TLOG" | version (1 byte) | records...
+# Record: a fixed little-endian header (_HEADER) followed by the fired
+# rule indices (uint16 each) and the UTF-8 session id, suspect, case id,
+# question and reply. The header starts with the record size, so a scan
+# hops from record to record reading headers only. A record cut short by
+# a crash ends the segment; everything before it is still readable.
+#
+# Each process appends to its own segments (writer name + sequence
+# number), so batch_runner workers never share a file. When a segment is
+# sealed (rolled over or closed) its index is written to <segment>.idx:
+# marshal'd {session: {suspect: packed uint32 offsets}} plus the segment
+# size it covers. Segments without an up-to-date index are scanned.
+
+import atexit
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+ENABLED = bool(os.environ.get("TRANSCRIPT_LOG"))
+
+FORMAT_VERSION = 1
+_MAGIC = b"TLOG"
+_SEGMENT_HEADER = _MAGIC + bytes((FORMAT_VERSION,))
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+# New segment once the current one reaches this size.
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+# size, timestamp, tier, ct, rule count, then the byte lengths of
+# session id, suspect, case id, question and reply, prompt hash,
+# engine ms, LLM ms.
+_HEADER = struct.Struct("<IdBBHHHHII16sff")
+
+# The log turns are appended to while ENABLED.
+LOG = None
+
+
+def prompt_hash(prompt: str) -> bytes:
+    """16-byte digest of a prompt (equal prompts, equal hashes)."""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+
+# --------------------------------------------
+# Turns
+# --------------------------------------------
+class Turn:
+    """One logged interrogation turn."""
+
+    __slots__ = (
+        "session_id", "suspect", "case_id", "tier", "ct", "prompt_hash", "message", "reply", "fired_rules",
+        "engine_ms", "llm_ms", "timestamp"
+    )
+
+    def __init__(self, session_id, suspect, case_id, tier, ct, prompt_hash, message, reply, fired_rules,
+                 engine_ms, llm_ms, timestamp):
+        self.session_id = session_id
+        self.suspect = suspect
+        self.case_id = case_id
+        self.tier = tier
+        self.ct = ct
+        self.prompt_hash = prompt_hash
+        self.message = message
+        self.reply = reply
+        self.fired_rules = fired_rules
+        self.engine_ms = engine_ms
+        self.llm_ms = llm_ms
+        self.timestamp = timestamp
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "suspect": self.suspect,
+            "case": self.case_id,
+            "tier": self.tier,
+            "ct": self.ct,
+            "prompt_hash": self.prompt_hash.hex(),
+            "message": self.message,
+            "reply": self.reply,
+            "fired_rules": list(self.fired_rules),
+            "engine_ms": round(self.engine_ms, 3),
+            "llm_ms": round(self.llm_ms, 3),
+            "timestamp": round(self.timestamp, 6),
+        }
+
+    def __repr__(self):
+        return f"Turn({self.session_id!r}, {self.suspect!r}, tier={self.tier}, ct={self.ct})"
+
+
+def _encode(turn: Turn) -> bytes:
+    strings = [s.encode("utf-8") for s in (turn.session_id, turn.suspect, turn.case_id, turn.message, turn.reply)]
+    rules = struct.pack(f"<{len(turn.fired_rules)}H", *turn.fired_rules)
+    size = _HEADER.size + len(rules) + sum(map(len, strings))
+    header = _HEADER.pack(
+        size, turn.timestamp, turn.tier, turn.ct, len(turn.fired_rules), *map(len, strings),
+        turn.prompt_hash, turn.engine_ms, turn.llm_ms
+    )
+    return b"".join((header, rules, *strings))
+
+
+def _decode(buf, offset: int) -> Turn:
+    (_, timestamp, tier, ct, n_rules, *lengths, digest, engine_ms, llm_ms) = _HEADER.unpack_from(buf, offset)
+    pos = offset + _HEADER.size
+    rules = struct.unpack_from(f"<{n_rules}H", buf, pos)
+    pos += 2 * n_rules
+    fields = []
+    for n in lengths:
+        fields.append(str(buf[pos:pos + n], "utf-8"))
+        pos += n
+    session_id, suspect, case_id, message, reply = fields
+    return Turn(session_id, suspect, case_id, tier, ct, digest, message, reply, rules, engine_ms, llm_ms, timestamp)
+
+
+def _key(buf, offset: int) -> tuple:
+    """(session id, suspect) of the record at offset, without decoding the rest."""
+    _, _, _, _, n_rules, session_len, suspect_len, *_ = _HEADER.unpack_from(buf, offset)
+    pos = offset + _HEADER.size + 2 * n_rules
+    return str(buf[pos:pos + session_len], "utf-8"), str(buf[pos + session_len:pos + session_len + suspect_len], "utf-8")
+
+
+def _records(buf, size: int, offset: int = len(_SEGMENT_HEADER)):
+    """Offsets of the complete records in a mapped segment, from `offset` on."""
+    while offset + _HEADER.size <= size:
+        length = int.from_bytes(buf[offset:offset + 4], "little")
+        if length < _HEADER.size or offset + length > size:
+            return  # torn tail
+        yield offset
+        offset += length
+
+
+# --------------------------------------------
+# Segments
+# --------------------------------------------
+class _Segment:
+    """One segment file, mapped on first read and remapped when it grew."""
+
+    __slots__ = ("path", "_map", "_size", "_file", "_indexed", "_scanned")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._map = None
+        self._size = 0
+        self._file = None
+        self._indexed = None  # index of the records before _scanned
+        self._scanned = 0
+
+    def view(self) -> tuple:
+        """(buffer, size) of the segment as it is now."""
+        size = self.path.stat().st_size
+        if size != self._size or self._map is None:
+            self.close()
+            self._size = size
+            if size > len(_SEGMENT_HEADER):
+                self._file = open(self.path, "rb")
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b""
+            if self._map[:len(_MAGIC)] not in (_MAGIC, b""):
+                raise ValueError(f"{self.path} is not a transcript segment")
+        return self._map, self._size
+
+    def index(self) -> dict:
+        """
+        {session: {suspect: array of record offsets}}: from <segment>.idx
+        when it covers the whole segment, else by scanning record headers
+        (picking up where the last scan stopped if the segment grew).
+        """
+        buf, size = self.view()
+        if self._indexed is None:
+            self._indexed, self._scanned = self._load_index(size), len(_SEGMENT_HEADER)
+            if self._indexed is not None:
+                self._scanned = size
+            else:
+                self._indexed = {}
+        if self._scanned < size:
+            offset = self._scanned
+            for offset in _records(buf, size, self._scanned):
+                session, suspect = _key(buf, offset)
+                _add(self._indexed, session, suspect, offset)
+                offset += int.from_bytes(buf[offset:offset + 4], "little")
+            self._scanned = offset
+        return self._indexed
+
+    def _load_index(self, size: int):
+        try:
+            with open(self.path.with_suffix(INDEX_SUFFIX), "rb") as fh:
+                covered, saved = marshal.loads(fh.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if covered != size:
+            return None
+        return {
+            session: {suspect: _unpack(offsets) for suspect, offsets in by_suspect.items()}
+            for session, by_suspect in saved.items()
+        }
+
+    def save_index(self, index: dict):
+        _, size = self.view()
+        saved = {
+            session: {suspect: _pack(offsets) for suspect, offsets in by_suspect.items()}
+            for session, by_suspect in index.items()
+        }
+        with open(self.path.with_suffix(INDEX_SUFFIX), "wb") as fh:
+            fh.write(marshal.dumps((size, saved)))
+
+    def close(self):
+        if self._map:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+
+def _add(index: dict, session: str, suspect: str, offset: int):
+    by_suspect = index.get(session)
+    if by_suspect is None:
+        by_suspect = index[session] = {}
+    offsets = by_suspect.get(suspect)
+    if offsets is None:
+        offsets = by_suspect[suspect] = array("I")
+    offsets.append(offset)
+
+
+def _pack(offsets: array) -> bytes:
+    if sys.byteorder == "big":
+        offsets = array("I", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    offsets = array("I")
+    offsets.frombytes(data)
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+# --------------------------------------------
+# The log
+# --------------------------------------------
+class TranscriptLog:
+    """
+    A directory of transcript segments. append() writes to this process's
+    own segment (named after `writer`); turns() / sessions() read every
+    writer's segments through memory maps.
+
+    writer:        segment name prefix; give each process its own
+    segment_bytes: roll over to a new segment at this size
+    flush:         flush after every record (survives the process being
+                   killed; off for bulk writers that close() at the end)
+    """
+
+    def __init__(self, directory, writer: str = "main", segment_bytes: int = None, flush: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.writer = writer
+        self.segment_bytes = segment_bytes or SEGMENT_BYTES
+        self.flush = flush
+        self._segments = {}    # path -> _Segment
+        self._out = None       # open segment of this writer
+        self._out_index = None
+        self._out_size = 0
+
+    # ---- writing ----
+    def append(self, turn: Turn):
+        data = _encode(turn)
+        if self._out is None or self._out_size + len(data) > self.segment_bytes:
+            self._roll()
+        _add(self._out_index, turn.session_id, turn.suspect, self._out_size)
+        self._out.write(data)
+        self._out_size += len(data)
+        if self.flush:
+            self._out.flush()
+
+    def _roll(self):
+        self._seal()
+        seq = 1 + max(
+            (int(p.stem.rsplit("-", 1)[1]) for p in self.directory.glob(f"{self.writer}-*{SEGMENT_SUFFIX}")),
+            default=0,
+        )
+        path = self.directory / f"{self.writer}-{seq:06d}{SEGMENT_SUFFIX}"
+        self._out = open(path, "xb")
+        self._out.write(_SEGMENT_HEADER)
+        self._out_size = len(_SEGMENT_HEADER)
+        self._out_index = {}
+
+    def _seal(self):
+        """Closes this writer's segment and saves its index."""
+        if self._out is None:
+            return
+        path = Path(self._out.name)
+        self._out.close()
+        self._out = None
+        self._segment(path).save_index(self._out_index)
+
+    def close(self):
+        self._seal()
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+    # ---- reading ----
+    def _segment(self, path: Path) -> _Segment:
+        segment = self._segments.get(path)
+        if segment is None:
+            segment = self._segments[path] = _Segment(path)
+        return segment
+
+    def segments(self) -> list:
+        if self._out is not None:
+            self._out.flush()
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _index(self, path: Path) -> dict:
+        if self._out is not None and path == Path(self._out.name):
+            return self._out_index
+        return self._segment(path).index()
+
+    def sessions(self) -> dict:
+        """{session id: {suspect: turn count}} across every segment."""
+        counts = {}
+        for path in self.segments():
+            for session, by_suspect in self._index(path).items():
+                mine = counts.setdefault(session, {})
+                for suspect, offsets in by_suspect.items():
+                    mine[suspect] = mine.get(suspect, 0) + len(offsets)
+        return counts
+
+    def turns(self, session_id: str = None, suspect: str = None):
+        """
+        Yields logged turns in write order (per segment), optionally only
+        one session's and/or one suspect's. Filtered reads jump straight
+        to the indexed records.
+        """
+        for path in self.segments():
+            buf, size = self._segment(path).view()
+            if session_id is None and suspect is None:
+                for offset in _records(buf, size):
+                    yield _decode(buf, offset)
+                continue
+            index = self._index(path)
+            groups = [index.get(session_id, {})] if session_id is not None else index.values()
+            offsets = []
+            for by_suspect in groups:
+                if suspect is None:
+                    for found in by_suspect.values():
+                        offsets.extend(found)
+                elif suspect in by_suspect:
+                    offsets.extend(by_suspect[suspect])
+            for offset in sorted(offsets):
+                yield _decode(buf, offset)
+
+    def __len__(self):
+        return sum(n for by_suspect in self.sessions().values() for n in by_suspect.values())
+
+
+# --------------------------------------------
+# Recording turns
+# --------------------------------------------
+def log_turn(session, suspect: str, message: str, prompt: str, reply: str, ct: int = None, fired=None,
+             engine_ms: float = 0.0, llm_ms: float = 0.0):
+    """
+    Appends one turn of `session` (a GameSession) to LOG. Call sites
+    check ENABLED first; ct and fired rules are recomputed when not given.
+    """
+    case = session.case
+    if ct is None:
+        from behavior_engine import detect_confrontation
+        ct = detect_confrontation(message, case)
+    if fired is None:
+        from notes_engine import fired_rules
+        fired = sorted(fired_rules(reply, case))
+    LOG.append(Turn(
+        session.session_id, suspect, "" if case is None else case.case_id, session.tiers[suspect], ct,
+        prompt_hash(prompt), message, reply, tuple(fired), engine_ms, llm_ms, time.time()
+    ))
+
+
+# --------------------------------------------
+# On / off
+# --------------------------------------------
+def enable(directory, **options):
+    """Starts logging turns to `directory` (options: see TranscriptLog)."""
+    global ENABLED, LOG
+    disable()
+    LOG = TranscriptLog(directory, **options)
+    ENABLED = True
+
+
+def disable():
+    global ENABLED, LOG
+    ENABLED = False
+    if LOG is not None:
+        LOG.close()
+        LOG = None
+
+
+atexit.register(disable)
+
+if ENABLED:
+    LOG = TranscriptLog(os.environ["TRANSCRIPT_LOG"])
+
+
+# --------------------------------------------
+# Replay
+# --------------------------------------------
+def replay_sessions(log: TranscriptLog, session_ids=None, case=None, stats: dict = None):
+    """
+    Re-runs detect_notes over logged replies with the current clue rules,
+    one logged session at a time (read through the index), and yields
+    (session id, fresh silent GameSession holding the replayed notes).
+    Only one replayed session is alive at a time.
+
+    case: a case_pack.CasePack used for every turn; by default each
+    turn's logged case (or the built-in one).
+    stats: dict updated with "turns", "changed" (turns whose fired rules
+    differ from the logged ones) and "gained"/"lost" {rule index: turns}.
+    """
+    from case_pack import load_case
+    from notes_engine import detect_notes, fired_rules
+    from session import GameSession
+
+    if stats is None:
+        stats = {}
+    for key in ("turns", "changed"):
+        stats.setdefault(key, 0)
+    gained, lost = stats.setdefault("gained", {}), stats.setdefault("lost", {})
+    cases = {}
+
+    for session_id in (log.sessions() if session_ids is None else session_ids):
+        state = None
+        for turn in log.turns(session_id):
+            if state is None:
+                turn_case = case
+                if turn_case is None and turn.case_id:
+                    turn_case = cases.get(turn.case_id)
+                    if turn_case is None:
+                        turn_case = cases[turn.case_id] = load_case(turn.case_id)
+                state = GameSession(session_id, announce=False, case=turn_case)
+
+            now = fired_rules(turn.reply, state.case)
+            before = set(turn.fired_rules)
+            stats["turns"] += 1
+            if now != before:
+                stats["changed"] += 1
+                for idx in now - before:
+                    gained[idx] = gained.get(idx, 0) + 1
+                for idx in before - now:
+                    lost[idx] = lost.get(idx, 0) + 1
+            detect_notes(turn.suspect, turn.reply, session=state, fired=now)
+        if state is not None:
+            yield session_id, state
+
+
+def replay(log: TranscriptLog, session_id: str = None, case=None) -> dict:
+    """
+    replay_sessions() over the whole log (or one session), summarized:
+    {"turns", "changed", "gained", "lost", "sessions", "notes"}.
+    """
+    stats = {"sessions": 0, "notes": 0}
+    for _, state in replay_sessions(log, None if session_id is None else (session_id,), case, stats):
+        stats["sessions"] += 1
+        stats["notes"] += len(state.notes)
+    return stats
+
+
+# --------------------------------------------
+# CLI
+# --------------------------------------------
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect and replay transcript logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats = sub.add_parser("stats", help="turn counts and timings")
+    stats.add_argument("directory")
+    show = sub.add_parser("show", help="print logged turns as JSONL")
+    show.add_argument("directory")
+    show.add_argument("--session")
+    show.add_argument("--suspect")
+    rerun = sub.add_parser("replay", help="re-run detect_notes over logged replies")
+    rerun.add_argument("directory")
+    rerun.add_argument("--session")
+    rerun.add_argument("--case", help="case pack id or path for every turn (default: each turn's own)")
+    args = parser.parse_args(argv)
+
+    log = TranscriptLog(args.directory)
+    try:
+        if args.command == "stats":
+            turns, engine_ms, llm_ms = 0, 0.0, 0.0
+            by_suspect = {}
+            for turn in log.turns():
+                turns += 1
+                engine_ms += turn.engine_ms
+                llm_ms += turn.llm_ms
+                by_suspect[turn.suspect] = by_suspect.get(turn.suspect, 0) + 1
+            print(f"{turns:,} turns, {len(log.sessions()):,} sessions, {len(log.segments())} segments")
+            if turns:
+                print(f"mean engine {engine_ms / turns:.3f} ms, mean LLM {llm_ms / turns:.3f} ms")
+            for suspect, n in sorted(by_suspect.items()):
+                print(f"  {suspect:<12}{n:>10,}")
+
+        elif args.command == "show":
+            for turn in log.turns(args.session, args.suspect):
+                print(json.dumps(turn.to_dict(), ensure_ascii=False))
+
+        else:
+            case = None
+            if args.case:
+                from case_pack import load_case
+                case = load_case(args.case)
+            result = replay(log, args.session, case)
+            print(f"{result['turns']:,} turns replayed, {result['notes']:,} notes in {result['sessions']:,} sessions")
+            print(f"{result['changed']:,} turns fire different rules than when logged")
+            for label in ("gained", "lost"):
+                for idx, n in sorted(result[label].items()):
+                    print(f"  rule {idx} {label} on {n:,} turns")
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    main()